@@ -0,0 +1,378 @@
+import argparse
+import csv
+import glob
+import html
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from outliers import numeric_columns
+from plotting import EXACT_POINT_LIMIT, decimate_minmax
+from stats_engine import box_summary, column_values, compute_statistics, histogram
+from streaming import StreamingTableStats
+
+STATISTIC_KEYS = ("count", "mean", "variance", "range", "max", "min", "geometric_mean", "harmonic_mean",
+                  "quadratic_mean", "median", "std_dev", "mode", "outliers")
+STREAM_CHUNKSIZE = 100_000
+PLOT_SIZE = (12, 3.5)
+PLOT_DPI = 100
+PLOT_KINDS = ("scatter", "box", "histogram")
+EXPORT_FORMATS = ("png", "svg")
+EXPORT_PLOT_SIZE = (6, 4)
+
+
+def expand_inputs(patterns):
+    # Шаблоны раскрываются glob (с поддержкой **), повторы убираются, порядок сохраняется
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or ([pattern] if os.path.isfile(pattern) else [])
+        paths.extend(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return list(dict.fromkeys(paths))
+
+
+def output_names(paths):
+    # Папка графиков для каждого файла; одинаковые имена из разных каталогов получают суффикс
+    return dict(zip(paths, unique_names(os.path.splitext(os.path.basename(path))[0] for path in paths)))
+
+
+def unique_names(names):
+    # Имена для файловой системы; совпавшие после safe_name получают суффикс
+    result, used = [], set()
+    for stem in map(safe_name, names):
+        name, suffix = stem, 1
+        while name in used:
+            suffix += 1
+            name = f"{stem}_{suffix}"
+        used.add(name)
+        result.append(name)
+    return result
+
+
+def safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("._") or "column"
+
+
+def json_value(value):
+    # numpy-скаляры в обычные числа, NaN и бесконечности - в null
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def column_report(stats):
+    box = stats["box"]
+    stats = dict(stats, outliers=box["flier_count"] if box is not None else 0)
+    report = {key: json_value(stats.get(key)) for key in STATISTIC_KEYS}
+    if "approximate" in stats:
+        report["approximate"] = list(stats["approximate"])
+    return report
+
+
+def plot_scatter(ax, column, x, y, color=None):
+    if len(y) > EXACT_POINT_LIMIT:
+        x, y = decimate_minmax(x, y, ax.bbox.width, ax.bbox.height)
+    ax.scatter(x, y, s=8, color=color, edgecolors="w", linewidths=0.5)
+    ax.set_title(f"Scatter Plot ({column})")
+    ax.set_xlabel("Index")
+    ax.set_ylabel("Value")
+
+
+def plot_box(ax, column, box, color=None):
+    if box is not None:
+        boxprops = {"edgecolor": ".25"} if color is None else {"edgecolor": ".25", "facecolor": color}
+        ax.bxp([box], widths=0.5, patch_artist=True, showfliers=True,
+               boxprops=boxprops, medianprops={"color": ".25"},
+               whiskerprops={"color": ".25"}, capprops={"color": ".25"},
+               flierprops={"marker": "d", "markerfacecolor": ".25", "markeredgecolor": ".25", "markersize": 4})
+    ax.set_xticks([])
+    ax.set_title(f"Box Plot ({column})")
+
+
+def plot_histogram(ax, column, counts, edges, color=None):
+    if len(counts):
+        ax.stairs(counts, edges, fill=True, color=color)
+    ax.set_title(f"Histogram ({column})")
+    ax.set_xlabel("Value")
+    ax.set_ylabel("Frequency")
+
+
+def save_column_plot(file_path, column, box, counts, edges, points=None):
+    # График расхождений, ящик с усами и гистограмма одного столбца в одном PNG;
+    # в потоковом режиме (points=None) графика расхождений нет.
+    # Figure без pyplot рисуется через Agg и не требует дисплея.
+    fig = Figure(figsize=PLOT_SIZE)
+    FigureCanvasAgg(fig)
+    if points is not None:
+        ax_scatter, ax_box, ax_hist = fig.subplots(1, 3, gridspec_kw={"width_ratios": [3, 1, 2]})
+        plot_scatter(ax_scatter, column, *points)
+    else:
+        ax_box, ax_hist = fig.subplots(1, 2, gridspec_kw={"width_ratios": [1, 2]})
+    plot_box(ax_box, column, box)
+    plot_histogram(ax_hist, column, counts, edges)
+    fig.tight_layout()
+    fig.savefig(file_path, dpi=PLOT_DPI)
+
+
+def profile_file(path, plot_dir=None, stream=False):
+    # Выполняется в процессе пула: ошибки возвращаются в отчёт, а не обрывают весь прогон
+    try:
+        if plot_dir is not None:
+            os.makedirs(plot_dir, exist_ok=True)
+        if stream:
+            return stream_file(path, plot_dir)
+        df = pd.read_csv(path)
+        columns = []
+        plot_names = dict(zip(df.columns, unique_names(df.columns)))
+        for column in df.columns:
+            entry = {"column": str(column), "numeric": True}
+            try:
+                values = column_values(df[column])
+            except (TypeError, ValueError):
+                columns.append(dict(entry, numeric=False))
+                continue
+            # Ошибка в одном столбце отмечается в его строке отчёта, остальные столбцы считаются
+            try:
+                stats = compute_statistics(values)
+                entry.update(column_report(stats))
+                if plot_dir is not None:
+                    non_null = df[column].notna().to_numpy()
+                    x = np.arange(len(values)) if non_null.all() else np.flatnonzero(non_null)
+                    plot_path = os.path.join(plot_dir, f"{plot_names[column]}.png")
+                    save_column_plot(plot_path, column, stats["box"], *histogram(values), points=(x, values))
+                    entry["plot"] = plot_path
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            columns.append(entry)
+        return {"file": path, "rows": len(df), "columns": columns}
+    except Exception as e:
+        return {"file": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def stream_file(path, plot_dir=None):
+    # Файл читается частями, в памяти остаются только накопители и эскизы
+    table = StreamingTableStats()
+    names = None
+    with pd.read_csv(path, chunksize=STREAM_CHUNKSIZE) as reader:
+        for chunk in reader:
+            names = names or list(chunk.columns)
+            table.update(chunk)
+    results = table.result()
+    columns = []
+    names = names or []
+    plot_names = dict(zip(names, unique_names(names)))
+    for column in names:
+        entry = {"column": str(column), "numeric": column in results}
+        if column in results:
+            try:
+                stats = results[column]
+                entry.update(column_report(stats))
+                if plot_dir is not None:
+                    plot_path = os.path.join(plot_dir, f"{plot_names[column]}.png")
+                    save_column_plot(plot_path, column, stats["box"], *stats["histogram"])
+                    entry["plot"] = plot_path
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+        columns.append(entry)
+    return {"file": path, "rows": table.rows, "columns": columns}
+
+
+def run(paths, out_dir, jobs=None, plots=True, stream=False, log=None):
+    names = output_names(paths)
+    plot_dirs = {path: os.path.join(out_dir, names[path]) if plots else None for path in paths}
+    reports = {}
+    if jobs == 1 or len(paths) <= 1:
+        for path in paths:
+            reports[path] = profile_file(path, plot_dirs[path], stream)
+            _log_report(log, reports[path], len(reports), len(paths))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(profile_file, path, plot_dirs[path], stream): path for path in paths}
+            for future in as_completed(futures):
+                reports[futures[future]] = future.result()
+                _log_report(log, reports[futures[future]], len(reports), len(paths))
+    return [reports[path] for path in paths]
+
+
+def _log_report(log, report, done, total):
+    if log is None:
+        return
+    status = report.get("error") or f"{report['rows']} rows, {len(report['columns'])} columns"
+    print(f"[{done}/{total}] {report['file']}: {status}", file=log)
+
+
+def write_reports(reports, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    json_path = os.path.join(out_dir, "report.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(reports, f, ensure_ascii=False, indent=2)
+
+    # Плоская таблица: одна строка на столбец каждого файла
+    csv_path = os.path.join(out_dir, "report.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=("file", "rows", "column", "numeric") + STATISTIC_KEYS + ("approximate", "plot", "error"))
+        writer.writeheader()
+        for report in reports:
+            if "error" in report:
+                writer.writerow({"file": report["file"], "error": report["error"]})
+                continue
+            for entry in report["columns"]:
+                row = dict(entry, file=report["file"], rows=report["rows"])
+                if "approximate" in row:
+                    row["approximate"] = " ".join(row["approximate"])
+                writer.writerow(row)
+    return json_path, csv_path
+
+
+def export_column(out_dir, column, stem, values, rows=None, formats=("png",), colors=None):
+    # Выполняется в процессе пула: график расхождений, ящик и гистограмма столбца
+    # по всем строкам и, если задан фильтр (rows), по отфильтрованным - каждый в свой файл
+    colors = colors or {}
+    try:
+        present = ~np.isnan(values)
+        variants = [("original", np.flatnonzero(present))]
+        if rows is not None:
+            variants.append(("filtered", rows[present[rows]]))
+        entries = []
+        for variant, x in variants:
+            y = values[x]
+            title = column if variant == "original" else f"{column}, filtered"
+            files = {}
+            for kind in PLOT_KINDS:
+                fig = Figure(figsize=EXPORT_PLOT_SIZE)
+                FigureCanvasAgg(fig)
+                ax = fig.subplots()
+                if kind == "scatter":
+                    plot_scatter(ax, title, x, y, colors.get("scatter"))
+                elif kind == "box":
+                    plot_box(ax, title, box_summary(y), colors.get("box"))
+                else:
+                    plot_histogram(ax, title, *histogram(y), colors.get("histogram"))
+                fig.tight_layout()
+                files[kind] = {}
+                for file_format in formats:
+                    name = f"{stem}_{variant}_{kind}.{file_format}"
+                    fig.savefig(os.path.join(out_dir, name), dpi=PLOT_DPI)
+                    files[kind][file_format] = name
+            entries.append({"column": str(column), "variant": variant, "rows": len(y), "files": files})
+        return entries
+    except Exception as e:
+        return [{"column": str(column), "error": f"{type(e).__name__}: {e}"}]
+
+
+def export_plots(df, out_dir, columns=None, rows=None, formats=("png",), colors=None, jobs=None, log=None):
+    # Все графики всех числовых столбцов в out_dir плюс index.json и index.html.
+    # Столбец - задача пула процессов: в процесс уходят только его значения (и строки фильтра),
+    # а не вся таблица. Значения столбца копируются, только когда для него освобождается место
+    # в очереди, поэтому в памяти одновременно не больше двух копий на процесс - это важно
+    # для таблиц из ColumnStore, которые не помещаются в память целиком.
+    # Пул запускается через spawn: приложение вызывает экспорт из фонового потока,
+    # а fork процесса с потоками (Tk, пул пересчёта) может зависнуть.
+    columns = numeric_columns(df) if columns is None else columns
+    os.makedirs(out_dir, exist_ok=True)
+    stems = dict(zip(columns, unique_names(columns)))
+
+    def task(column):
+        return (out_dir, column, stems[column], df[column].to_numpy(dtype=np.float64, na_value=np.nan), rows, formats, colors)
+
+    results = {}
+    jobs = min(jobs or os.cpu_count() or 1, len(columns) or 1)
+    if jobs == 1:
+        for column in columns:
+            results[column] = export_column(*task(column))
+            _log_export(log, results[column], len(results), len(columns))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+            pending = iter(columns)
+            futures = {}
+            while True:
+                for column in itertools.islice(pending, 2 * jobs - len(futures)):
+                    futures[executor.submit(export_column, *task(column))] = column
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    column = futures.pop(future)
+                    results[column] = future.result()
+                    _log_export(log, results[column], len(results), len(columns))
+    entries = [entry for column in columns for entry in results[column]]
+    return entries, write_export_index(entries, out_dir, formats)
+
+
+def _log_export(log, entries, done, total):
+    if log is None:
+        return
+    status = entries[0].get("error") or ", ".join(f"{entry['variant']} {entry['rows']} rows" for entry in entries)
+    print(f"[{done}/{total}] {entries[0]['column']}: {status}", file=log)
+
+
+def write_export_index(entries, out_dir, formats):
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+
+    # Страница для просмотра: строка на столбец и вариант, картинки в первом из форматов
+    # и ссылки на остальные
+    lines = ["<!DOCTYPE html>", '<html><head><meta charset="utf-8"><title>PBDA plots</title>',
+             "<style>body{font-family:sans-serif}td{vertical-align:top;text-align:center}img{width:360px}</style>",
+             "</head><body><table>",
+             "<tr><th>Column</th>" + "".join(f"<th>{kind.capitalize()}</th>" for kind in PLOT_KINDS) + "</tr>"]
+    for entry in entries:
+        column = html.escape(entry["column"])
+        if "error" in entry:
+            lines.append(f'<tr><td>{column}</td><td colspan="{len(PLOT_KINDS)}">{html.escape(entry["error"])}</td></tr>')
+            continue
+        cells = []
+        for kind in PLOT_KINDS:
+            names = [html.escape(entry["files"][kind][file_format]) for file_format in formats]
+            links = " ".join(f'<a href="{name}">{file_format.upper()}</a>' for name, file_format in zip(names, formats))
+            cells.append(f'<td><img src="{names[0]}" alt=""><br>{links}</td>')
+        lines.append(f"<tr><td>{column}<br>{entry['variant']}, {entry['rows']} rows</td>{''.join(cells)}</tr>")
+    lines.append("</table></body></html>")
+    index_path = os.path.join(out_dir, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return index_path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute PBDA statistics and plots for CSV files without the GUI.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="examples:\n"
+               "  python batch.py data/*.csv --out report\n"
+               "  python batch.py \"exports/**/*.csv\" --jobs 8 --no-plots\n"
+               "  python batch.py huge.csv --stream")
+    parser.add_argument("inputs", nargs="+", help="CSV files or glob patterns (quote patterns with **)")
+    parser.add_argument("-o", "--out", default="pbda_report", help="output directory for plots and reports")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-plots", action="store_true", help="skip PNG plots, write only the reports")
+    parser.add_argument("--stream", action="store_true",
+                        help="read files in chunks with bounded memory; median, quartiles and mode become approximate")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print per-file progress")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No CSV files matched.", file=sys.stderr)
+        return 2
+    reports = run(paths, args.out, jobs=args.jobs, plots=not args.no_plots, stream=args.stream, log=None if args.quiet else sys.stderr)
+    json_path, csv_path = write_reports(reports, args.out)
+    print(f"Wrote {json_path} and {csv_path}", file=sys.stderr)
+    return 1 if any("error" in report for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cache import DatasetCache
+from filters import FilterSet, SortedIndex
+from loader import CSVLoader
+from plotting import EXACT_POINT_LIMIT, PlotPanel, decimate_minmax
+from stats_engine import box_summary, column_values, compute_statistics, histogram
+
+SIZES = {"170k": 170_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SIZES = ("170k", "1m")
+COLUMNS = 20  # как в примере из README
+NAN_FRACTION = 0.02
+SEED = 12345
+DATA_VERSION = 3  # меняется вместе с synthetic_frame, чтобы не читать старые файлы
+DATA_DIR = os.path.join(tempfile.gettempdir(), "pbda_benchmark")
+
+
+def synthetic_frame(rows, columns=COLUMNS, seed=SEED):
+    # Четыре вида столбцов по кругу: нормальные вокруг нуля (половина значений отрицательные,
+    # поэтому gmean/hmean всегда идут по пути "N/A"),
+    # логнормальные (только положительные), целые с нулями (gmean/hmean = 0) и
+    # целые с малым размахом (мода через bincount). Пропуски только в вещественных
+    # столбцах: целые с NaN pandas читает как float64, и целочисленные пути не замерялись бы.
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = i % 4
+        if kind == 0:
+            values = rng.normal(0.0, 25.0, rows)
+        elif kind == 1:
+            values = rng.lognormal(1.0, 0.75, rows)
+        elif kind == 2:
+            values = rng.poisson(3.0, rows).astype(np.float64)
+        else:
+            values = rng.integers(1, 50, rows).astype(np.float64)
+        if kind < 2:
+            values[rng.random(rows) < NAN_FRACTION] = np.nan
+        else:
+            values = values.astype(np.int64)
+        data[f"var_{i:02d}"] = values
+    return pd.DataFrame(data)
+
+
+def synthetic_csv(rows, data_dir=DATA_DIR, columns=COLUMNS, seed=SEED):
+    # Файл создаётся один раз на (строки, столбцы, seed) и переиспользуется между прогонами
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{rows}x{columns}_s{seed}_v{DATA_VERSION}.csv")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        synthetic_frame(rows, columns, seed).to_csv(tmp_path, index=False, float_format="%.6g")
+        os.replace(tmp_path, path)
+    return path
+
+
+def measure(function, repeat):
+    # Минимум устойчивее к шуму, медиана показывает типичное время
+    times = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": float(np.median(times)), "runs": repeat}, result
+
+
+def render_panel(values, box):
+    # Встроенная панель вкладки 2 на Agg-холсте без окна: прореживание, ящик и полная отрисовка
+    fig = Figure(figsize=(4, 4))
+    canvas = FigureCanvasAgg(fig)
+    ax_scatter, ax_box = fig.subplots(2, 1)
+    panel = PlotPanel(canvas, ax_scatter, ax_box)
+    x = np.arange(len(values))
+    if len(values) > EXACT_POINT_LIMIT:
+        x, values = decimate_minmax(x, values, ax_scatter.bbox.width, ax_scatter.bbox.height)
+    panel.set_scatter_points(x, values)
+    panel.set_box(box)
+    canvas.draw()
+
+
+def render_histogram(values):
+    fig = Figure(figsize=(6, 4))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    counts, edges = histogram(values)
+    ax.stairs(counts, edges, fill=True)
+    canvas.draw()
+
+
+def load_csv(path, **options):
+    return CSVLoader(path, **options)._read()
+
+
+def benchmark_size(name, rows, repeat=3, data_dir=DATA_DIR, log=None):
+    path = synthetic_csv(rows, data_dir)
+    results = {}
+
+    def record(key, function, runs=repeat):
+        results[key], value = measure(function, runs)
+        if log is not None:
+            print(f"  {name} {key}: {results[key]['min'] * 1000:.1f} ms", file=log)
+        return value
+
+    # Загрузка: разбор CSV, разбор со сжатием типов, повторное открытие из кэша
+    df = record("load_csv", lambda: load_csv(path), runs=1)
+    compact = record("load_csv_compact", lambda: load_csv(path, downcast_ints=True, categorize=True), runs=1)
+    # Замеры ниже рассчитаны на эти типы: вещественные с пропусками и целые без них
+    kinds = [df[c].dtype.kind for c in df.columns]
+    if kinds != ["f" if i % 4 < 2 else "i" for i in range(COLUMNS)]:
+        raise RuntimeError(f"Unexpected column dtypes in {path}:\n{df.dtypes}")
+    if compact["var_03"].dtype.itemsize >= 8:
+        raise RuntimeError(f"Compact load did not downcast integers:\n{compact.dtypes}")
+    del compact
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DatasetCache(cache_dir)
+        record("cache_store", lambda: cache.store(path, df), runs=1)
+        record("cache_load", lambda: cache.load(path))
+
+    # Статистика как в update_plots_and_stats_tab2: столбец без пропусков -> compute_statistics
+    column, second = "var_00", "var_01"
+    record("statistics_float_column", lambda: compute_statistics(column_values(df[column].dropna())))
+    record("statistics_int_column", lambda: compute_statistics(column_values(df["var_03"].dropna())))
+    record("statistics_all_columns", lambda: [compute_statistics(column_values(df[c])) for c in df.columns], runs=1)
+
+    # Фильтр как в apply_outlier_filter: построение индекса при первом фильтре,
+    # затем замена границ и пересечение со вторым столбцом
+    record("filter_index_build", lambda: SortedIndex(df[column].to_numpy()))
+    indexes = {}
+
+    def index_for(name):
+        if name not in indexes:
+            indexes[name] = SortedIndex(df[name].to_numpy())
+        return indexes[name]
+
+    filter_set = FilterSet(len(df), index_for)
+    index_for(column), index_for(second)
+
+    def apply_filter():
+        filter_set.set_range(column, -25.0, 25.0)
+        return filter_set.rows()
+
+    def apply_second_filter():
+        filter_set.set_range(second, 1.0, 10.0)
+        return filter_set.rows()
+
+    record("filter_apply", apply_filter)
+    record("filter_combine", apply_second_filter)
+    rows_kept = filter_set.rows()
+    record("statistics_filtered_column",
+           lambda: compute_statistics(column_values(df[column].iloc[rows_kept].dropna())))
+
+    # Отрисовка на Agg: графики расхождений и ящик встроенной панели, гистограмма
+    values = column_values(df[column])
+    box = box_summary(values)
+    record("render_panel", lambda: render_panel(values, box))
+    record("render_histogram", lambda: render_histogram(values))
+
+    return {"rows": rows, "columns": COLUMNS, "csv_bytes": os.path.getsize(path), "results": results}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, repeat=3, data_dir=DATA_DIR, log=None):
+    report = {"environment": environment(), "seed": SEED, "datasets": {}}
+    for name in sizes:
+        if log is not None:
+            print(f"{name}: {SIZES[name]} rows x {COLUMNS} columns", file=log)
+        report["datasets"][name] = benchmark_size(name, SIZES[name], repeat, data_dir, log)
+    return report
+
+
+def compare(before, after, file=None):
+    # Отношение минимальных времён: > 1 - стало медленнее
+    file = file or sys.stdout
+    print(f"{'dataset':<8} {'benchmark':<28} {'before ms':>10} {'after ms':>10} {'ratio':>7}", file=file)
+    for name, dataset in after["datasets"].items():
+        old = before.get("datasets", {}).get(name, {}).get("results", {})
+        for key, result in dataset["results"].items():
+            if key not in old:
+                continue
+            ratio = result["min"] / old[key]["min"] if old[key]["min"] else float("inf")
+            print(f"{name:<8} {key:<28} {old[key]['min'] * 1000:>10.1f} {result['min'] * 1000:>10.1f} {ratio:>7.2f}",
+                  file=file)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark PBDA loading, statistics, filtering and rendering.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="examples:\n"
+               "  python benchmark.py                      # 170k and 1M rows, report in benchmark.json\n"
+               "  python benchmark.py --sizes 170k 1m 10m --out after.json\n"
+               "  python benchmark.py --compare before.json after.json")
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=list(DEFAULT_SIZES),
+                        help="synthetic dataset sizes (10m needs several GB of disk and memory)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark for the fast steps")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where generated CSV files are kept between runs")
+    parser.add_argument("-o", "--out", default="benchmark.json", help="JSON report path")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two reports and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding="utf-8") as f:
+                reports.append(json.load(f))
+        compare(*reports)
+        return 0
+    report = run(args.sizes, args.repeat, args.data_dir, log=sys.stderr)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pbda_cache")
+DEFAULT_MAX_BYTES = 2 * 2**30  # 2 ГБ на весь кэш
+HASH_BLOCK_SIZE = 2**20
+
+try:
+    import fcntl  # нет на Windows
+except ImportError:
+    fcntl = None
+
+_pins = weakref.WeakSet()
+
+
+class EntryPin:
+    # Запись кэша, чьи файлы отображены в память: evict и clear её не удаляют.
+    # Живёт, пока на неё ссылаются массивы-отображения (атрибут _pin). Разделяемая
+    # блокировка flock на meta.json видна другим процессам; на Windows - только этот процесс.
+    def __init__(self, entry_dir):
+        self.entry_dir = os.path.abspath(entry_dir)
+        self._file = open(os.path.join(entry_dir, "meta.json"), "rb")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_SH)
+        _pins.add(self)
+
+    def __del__(self):
+        self._file.close()  # закрытие снимает flock
+
+
+def entry_in_use(entry_dir):
+    entry_dir = os.path.abspath(entry_dir)
+    if any(pin.entry_dir == entry_dir for pin in list(_pins)):
+        return True
+    if fcntl is None:
+        return False
+    try:
+        with open(os.path.join(entry_dir, "meta.json"), "rb") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)  # снимается при закрытии
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class DatasetCache:
+    # Дисковый кэш разобранных CSV: каждый столбец хранится в своём .npy файле
+    # и при повторном открытии читается через memory map без разбора текста.
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, file_path, variant=""):
+        # variant различает разные варианты загрузки одного файла (набор столбцов, типы)
+        stat = os.stat(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(os.path.abspath(file_path).encode("utf-8"))
+        digest.update(variant.encode("utf-8"))
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("ascii"))
+        # Хэш содержимого по началу, середине и концу файла: полное хэширование
+        # многогигабайтного файла съело бы весь выигрыш от кэша
+        with open(file_path, "rb") as f:
+            for offset in (0, stat.st_size // 2, max(stat.st_size - HASH_BLOCK_SIZE, 0)):
+                f.seek(offset)
+                digest.update(f.read(HASH_BLOCK_SIZE))
+        return digest.hexdigest()
+
+    def load(self, file_path, variant=""):
+        try:
+            entry_dir = os.path.join(self.cache_dir, self.key(file_path, variant))
+            meta_path = os.path.join(entry_dir, "meta.json")
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            columns = {}
+            pin = EntryPin(entry_dir)
+            for column in meta["columns"]:
+                # np.asarray снимает подкласс memmap, но сохраняет отображение без копии
+                # (и ссылку на pin через base)
+                mapped = np.load(os.path.join(entry_dir, column["file"]), mmap_mode="r")
+                mapped._pin = pin
+                values = np.asarray(mapped)
+                if column["kind"] == "codes":
+                    values = self._decode(values, np.load(os.path.join(entry_dir, column["uniques"])), column["dtype"])
+                columns[column["name"]] = values
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(meta_path)  # время доступа для LRU
+        except OSError:
+            pass
+        # copy=False оставляет столбцы отдельными блоками поверх memory map
+        return pd.DataFrame(columns, columns=[column["name"] for column in meta["columns"]], copy=False)
+
+    def store(self, file_path, df, variant=""):
+        if df.memory_usage(index=False).sum() > self.max_bytes:
+            return
+        key = self.key(file_path, variant)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            columns = []
+            for i, name in enumerate(df.columns):
+                series = df[name]
+                column = {"name": str(name), "file": f"{i}.npy", "dtype": str(series.dtype)}
+                if series.dtype.kind in "biufcmM":
+                    np.save(os.path.join(tmp_dir, column["file"]), series.to_numpy())
+                    column["kind"] = "values"
+                else:
+                    # Строковые столбцы: коды + словарь, чтобы обойтись без pickle
+                    codes, uniques = pd.factorize(series)
+                    if pd.api.types.infer_dtype(uniques, skipna=True) not in ("string", "empty"):
+                        # Числа и строки вперемешку: как строки их не сохранить без потери типов,
+                        # такой файл не кэшируется и при следующем открытии разбирается заново
+                        raise ValueError(f"Column {name!r} mixes types.")
+                    column["kind"] = "codes"
+                    column["uniques"] = f"{i}_uniques.npy"
+                    np.save(os.path.join(tmp_dir, column["file"]), codes.astype(np.int32))
+                    np.save(os.path.join(tmp_dir, column["uniques"]), np.asarray(uniques, dtype=str))
+                columns.append(column)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"source": os.path.abspath(file_path), "rows": len(df), "columns": columns}, f)
+            entry_dir = os.path.join(self.cache_dir, key)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except (OSError, ValueError):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict(keep=key)
+
+    def entries(self):
+        # (время последнего доступа, размер, каталог) для каждой записи
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry_dir, "meta.json")
+            if name.startswith(".") or not os.path.isfile(meta_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+            result.append((os.path.getmtime(meta_path), size, entry_dir))
+        return result
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.basename(entry_dir) == keep or entry_in_use(entry_dir):
+                continue  # открытые окнами или другими процессами записи не удаляются
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        # Записи, которые сейчас отображены в память, остаются
+        freed = 0
+        for _, size, entry_dir in self.entries():
+            if not entry_in_use(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                freed += size
+        return freed
+
+    @staticmethod
+    def _decode(codes, uniques, dtype):
+        values = np.full(len(codes), np.nan, dtype=object)
+        present = codes >= 0
+        values[present] = uniques.astype(object)[codes[present]]
+        if dtype == "object":
+            return values
+        return pd.array(values, dtype=dtype)
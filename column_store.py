@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from cache import EntryPin
+
+STORE_VARIANT = "column-store-v3"  # вариант ключа DatasetCache для хранилищ
+COPY_BLOCK_ROWS = 1 << 20
+
+
+class ColumnStore:
+    # Числовые столбцы CSV в отдельных файлах, которые отображаются в память (np.memmap):
+    # <i>.values - значения int64 или float64 подряд, <i>.nulls - битовая маска пропусков
+    # (np.packbits, бит на строку). Какие страницы держать в памяти, решает ОС, а окна
+    # и процессы, открывшие одно хранилище, делят одни и те же физические страницы.
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != STORE_VARIANT:
+            raise ValueError("Not a column store.")
+        self.rows = meta["rows"]
+        self.columns = {column["name"]: column for column in meta["columns"]}
+        self.skipped = meta["skipped"]  # нечисловые столбцы, которые в хранилище не попали
+        self.pin = EntryPin(store_dir)  # пока живы отображения, кэш не удаляет хранилище
+
+    def names(self):
+        return list(self.columns)
+
+    def values(self, name):
+        # Только чтение: запись в отображение испортила бы общий файл
+        column = self.columns[name]
+        if not self.rows:
+            return np.empty(0, dtype=column["dtype"])
+        values = np.memmap(os.path.join(self.store_dir, column["file"]), dtype=column["dtype"], mode="r", shape=(self.rows,))
+        values._pin = self.pin
+        return values
+
+    def null_count(self, name):
+        return self.columns[name]["nulls"]
+
+    def null_mask(self, name):
+        # Маска распаковывается в байт на строку; без пропусков - None, копия не нужна
+        column = self.columns[name]
+        if not column["nulls"]:
+            return None
+        bitmap = np.fromfile(os.path.join(self.store_dir, column["null_file"]), dtype=np.uint8)
+        return np.unpackbits(bitmap, count=self.rows).view(bool)
+
+    def frame(self):
+        # DataFrame поверх отображений без копирования. Целый столбец с пропусками остаётся
+        # int64: значения берутся из отображения, пропуски - из битовой маски (pandas Int64),
+        # поэтому числа больше 2**53 не округляются. У float64 пропуски уже NaN.
+        columns = {}
+        for name, column in self.columns.items():
+            values = np.asarray(self.values(name))
+            mask = self.null_mask(name) if column["dtype"] == "int64" else None
+            columns[name] = values if mask is None else pd.arrays.IntegerArray(values, mask)
+        return pd.DataFrame(columns, columns=list(self.columns), copy=False)
+
+
+def build_store(csv_path, store_dir, chunksize=100_000, usecols=None, progress=None, cancelled=None):
+    # CSV разбирается частями и дописывается в файлы столбцов, поэтому памяти нужно на одну
+    # часть, а не на весь файл. Возвращает ColumnStore или None, если сборку отменили.
+    # numpy_nullable: целые с пропусками приходят как Int64, а не как округлённый float64.
+    chunksize = max(chunksize // 8, 1) * 8  # маски частей склеиваются побайтно
+    parent = os.path.dirname(os.path.abspath(store_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    completed = False
+    try:
+        writer = _StoreWriter(tmp_dir)
+        try:
+            with open(csv_path, "rb") as f:
+                with pd.read_csv(f, chunksize=chunksize, usecols=usecols, dtype_backend="numpy_nullable") as reader:
+                    for chunk in reader:
+                        if cancelled is not None and cancelled():
+                            return None
+                        writer.append(chunk)
+                        if progress is not None:
+                            progress(writer.rows, f.tell())
+        finally:
+            # Файлы столбцов закрываются до удаления каталога (на Windows открытые не удалить)
+            writer.close()
+        writer.write_meta()
+        shutil.rmtree(store_dir, ignore_errors=True)
+        os.replace(tmp_dir, store_dir)
+        completed = True
+    finally:
+        if not completed:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return ColumnStore(store_dir)
+
+
+class _StoreWriter:
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.rows = 0
+        self.columns = None
+        self.skipped = []
+        self._files = {}
+
+    def append(self, chunk):
+        if self.columns is None:
+            # Набор столбцов определяется первой частью: текстовые столбцы пропускаются
+            self.columns = []
+            for i, name in enumerate(chunk.columns):
+                if chunk[name].dtype.kind in "biuf":
+                    self.columns.append({"name": str(name), "source": name, "file": f"{i}.values",
+                                         "null_file": f"{i}.nulls", "dtype": "int64", "nulls": 0})
+                else:
+                    self.skipped.append(str(name))
+            for column in self.columns:
+                self._files[column["name"]] = (open(os.path.join(self.store_dir, column["file"]), "wb"),
+                                               open(os.path.join(self.store_dir, column["null_file"]), "wb"))
+        for column in self.columns:
+            series = chunk[column["source"]]
+            if series.dtype.kind not in "biuf":
+                # В этой части попался текст: нечисловые значения становятся пропусками
+                series = pd.to_numeric(series, errors="coerce")
+            nulls = series.isna().to_numpy(dtype=bool)
+            if column["dtype"] == "int64" and series.dtype.kind == "f":
+                # Вещественная часть целого столбца: целые значения остаются int64,
+                # дроби или бесконечности переводят столбец во float64
+                present = series.to_numpy(dtype=np.float64, na_value=np.nan)[~nulls]
+                if not (np.isfinite(present) & (present == np.round(present))).all():
+                    self._promote(column)
+            values = series.to_numpy(dtype=column["dtype"], na_value=np.nan if column["dtype"] == "float64" else 0)
+            values_file, nulls_file = self._files[column["name"]]
+            values_file.write(np.ascontiguousarray(values).tobytes())
+            nulls_file.write(np.packbits(nulls).tobytes())
+            column["nulls"] += int(nulls.sum())
+        self.rows += len(chunk)
+
+    def _promote(self, column):
+        # Целый столбец, в котором появились дроби, переписывается во float64;
+        # прежние пропуски (записанные нулями) становятся NaN по маске
+        values_file, nulls_file = self._files[column["name"]]
+        values_file.close()
+        nulls_file.flush()
+        path = os.path.join(self.store_dir, column["file"])
+        with open(path + ".tmp", "wb") as f:
+            if self.rows:
+                # Переписывается блоками через отображение, не поднимая весь столбец в память
+                old = np.memmap(path, dtype=np.int64, mode="r", shape=(self.rows,))
+                bitmap = np.memmap(os.path.join(self.store_dir, column["null_file"]), dtype=np.uint8, mode="r")
+                for start in range(0, self.rows, COPY_BLOCK_ROWS):
+                    block = old[start:start + COPY_BLOCK_ROWS].astype(np.float64)
+                    if column["nulls"]:
+                        bits = bitmap[start // 8:(start + len(block) + 7) // 8]
+                        block[np.unpackbits(bits, count=len(block)).view(bool)] = np.nan
+                    f.write(block.tobytes())
+                del old, bitmap
+        os.replace(path + ".tmp", path)
+        self._files[column["name"]] = (open(path, "ab"), nulls_file)
+        column["dtype"] = "float64"
+
+    def close(self):
+        for values_file, nulls_file in self._files.values():
+            values_file.close()
+            nulls_file.close()
+
+    def write_meta(self):
+        columns = [{key: value for key, value in column.items() if key != "source"} for column in self.columns or []]
+        with open(os.path.join(self.store_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"format": STORE_VARIANT, "rows": self.rows, "columns": columns, "skipped": self.skipped}, f)
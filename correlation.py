@@ -0,0 +1,122 @@
+import tempfile
+
+import numpy as np
+
+from stats_engine import numeric_array
+
+METHODS = ("pearson", "spearman")
+MIN_PAIRS = 3  # меньше общих строк - коэффициент не определён (NaN)
+BLOCK_ROWS = 1 << 16  # строк в одном блоке: в памяти одновременно только блок, а не вся таблица
+RANKS_IN_MEMORY_BYTES = 256 << 20  # ранги больше этого пишутся во временный файл
+
+
+def frame_blocks(df, columns, rows=None, block_rows=BLOCK_ROWS):
+    # Блоки float64 (строки x столбцы) по выбранным строкам, пропуски - NaN.
+    # Столбцы с маской (Int64) переводятся во float64 тоже по блокам, а не целиком
+    arrays = [df[column].to_numpy() if isinstance(df[column].dtype, np.dtype) else df[column].array for column in columns]
+    total = len(df) if rows is None else len(rows)
+    for start in range(0, total, block_rows):
+        stop = min(start + block_rows, total)
+        block = np.empty((stop - start, len(arrays)), dtype=np.float64)
+        for j, values in enumerate(arrays):
+            part = values[start:stop] if rows is None else values[rows[start:stop]]
+            block[:, j] = part if isinstance(part, np.ndarray) else part.to_numpy(dtype=np.float64, na_value=np.nan)
+        yield block
+
+
+def array_blocks(matrix, block_rows=BLOCK_ROWS):
+    for start in range(0, len(matrix), block_rows):
+        yield np.asarray(matrix[start:start + block_rows], dtype=np.float64)
+
+
+def rank_column(values):
+    # Средние ранги среди непустых значений; NaN остаются NaN
+    values = np.asarray(values, dtype=np.float64)
+    ranks = np.full(len(values), np.nan)
+    present = np.flatnonzero(~np.isnan(values))
+    if not len(present):
+        return ranks
+    order = present[np.argsort(values[present], kind="stable")]
+    ordered = values[order]
+    # Границы групп одинаковых значений: ранг группы - среднее её позиций (1-based)
+    starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    ends = np.append(starts[1:], len(ordered))
+    ranks[order] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    return ranks
+
+
+def rank_matrix(df, columns, rows=None):
+    # Ранги считаются по одному столбцу; большая матрица рангов живёт во временном файле
+    total = len(df) if rows is None else len(rows)
+    shape = (total, len(columns))
+    if total * len(columns) * 8 <= RANKS_IN_MEMORY_BYTES:
+        ranks = np.empty(shape, dtype=np.float64)
+    else:
+        ranks = np.memmap(tempfile.TemporaryFile(), dtype=np.float64, mode="w+", shape=shape)
+    for j, column in enumerate(columns):
+        values = numeric_array(df[column])
+        ranks[:, j] = rank_column(values if rows is None else values[rows])
+    return ranks
+
+
+def pearson_matrix(blocks, size, min_pairs=MIN_PAIRS):
+    # Попарно полные наблюдения без цикла по парам и без всей таблицы в памяти: blocks()
+    # отдаёт блоки строк заново на каждом проходе. Первый проход - средние столбцов, второй
+    # копит по центрированным значениям C (пропуски - нули) и маске наличия M суммы
+    # по общим строкам каждой пары матричными произведениями:
+    #   n = M'M, Sx = C'M, Sxx = (C*C)'M, Sxy = C'C
+    counts = np.zeros(size)
+    totals = np.zeros(size)
+    rows = 0
+    for block in blocks():
+        present = ~np.isnan(block)
+        counts += present.sum(axis=0)
+        totals += np.where(present, block, 0.0).sum(axis=0)
+        rows += len(block)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = totals / counts
+    complete = bool((counts == rows).all())
+
+    products = np.zeros((size, size))
+    if not complete:
+        n = np.zeros((size, size))
+        sums = np.zeros((size, size))
+        squares = np.zeros((size, size))
+    for block in blocks():
+        centered = block - mean
+        present = ~np.isnan(centered)
+        centered[~present] = 0.0
+        products += centered.T @ centered
+        if not complete:
+            mask = present.astype(np.float64)
+            n += mask.T @ mask
+            sums += centered.T @ mask  # sums[i, j] - сумма c_i по строкам, где есть и i, и j
+            squares += (centered * centered).T @ mask
+
+    variance = np.diag(products).copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if complete:
+            # Без пропусков средние по общим строкам нулевые: хватает одного произведения
+            result = products / np.sqrt(np.outer(variance, variance))
+        else:
+            covariance = n * products - sums * sums.T
+            result = covariance / np.sqrt((n * squares - sums ** 2) * (n * squares.T - sums.T ** 2))
+            result[n < min_pairs] = np.nan
+
+    # Постоянный столбец не коррелирует ни с чем
+    constant = ~(variance > 0)
+    result[constant, :] = np.nan
+    result[:, constant] = np.nan
+    np.clip(result, -1.0, 1.0, out=result)
+    np.fill_diagonal(result, np.where(constant, np.nan, 1.0))
+    return result
+
+
+def correlation_matrix(df, columns, rows=None, method="pearson", block_rows=BLOCK_ROWS):
+    # Спирмен - Пирсон по рангам. Ранги считаются один раз по всем непустым
+    # значениям столбца; если пропуски в паре столбцов не совпадают, результат
+    # немного отличается от переранжирования каждой пары отдельно.
+    if method == "spearman":
+        ranks = rank_matrix(df, columns, rows)
+        return pearson_matrix(lambda: array_blocks(ranks, block_rows), len(columns))
+    return pearson_matrix(lambda: frame_blocks(df, columns, rows, block_rows), len(columns))
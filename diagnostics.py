@@ -0,0 +1,176 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+try:
+    import resource  # нет на Windows
+except ImportError:
+    resource = None
+
+MAX_SPANS = 5000  # последние интервалы в кольцевом буфере
+
+
+class Span:
+    # Один замер: имя, начало и длительность в секундах от запуска профилировщика
+    __slots__ = ("name", "start", "duration", "thread", "depth", "args")
+
+    def __init__(self, name, start, duration, thread, depth, args):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+        self.depth = depth
+        self.args = args
+
+    def as_dict(self):
+        return {"name": self.name, "start": self.start, "duration": self.duration,
+                "thread": self.thread, "depth": self.depth, "args": self.args}
+
+
+class Profiler:
+    # Лёгкие интервалы вокруг горячих участков: два вызова perf_counter и
+    # добавление в deque, поэтому они включены всегда. Память (tracemalloc)
+    # и cProfile - только по запросу из панели диагностики.
+    def __init__(self, max_spans=MAX_SPANS):
+        self.origin = time.perf_counter()
+        self.spans = deque(maxlen=max_spans)
+        self.profile_stats = None  # pstats.Stats последнего захвата cProfile
+        self.profile_name = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profile_armed = False
+
+    @property
+    def tracing_memory(self):
+        return tracemalloc.is_tracing()
+
+    def set_memory_tracing(self, enabled):
+        # tracemalloc заметно замедляет выделение памяти, поэтому включается вручную
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def profile_next_action(self):
+        # Следующий интервал верхнего уровня будет выполнен под cProfile. Интервалы,
+        # которые только ставят работу в очередь (profile=False), его не забирают
+        with self._lock:
+            self._profile_armed = True
+            self.profile_stats = None
+
+    def span(self, name, profile=True, **args):
+        return _SpanContext(self, name, args, profile)
+
+    def _claim_profile(self):
+        with self._lock:
+            armed, self._profile_armed = self._profile_armed, False
+            return armed
+
+    def record(self, name, start, duration, depth, args):
+        self.spans.append(Span(name, start - self.origin, duration, threading.current_thread().name, depth, args))
+
+    def clear(self):
+        self.spans.clear()
+
+    def summary(self):
+        # Агрегаты по имени интервала: число вызовов, сумма, среднее и максимум
+        totals = {}
+        for span in list(self.spans):
+            entry = totals.setdefault(span.name, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += span.duration
+            entry["max"] = max(entry["max"], span.duration)
+        for entry in totals.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return totals
+
+    def memory(self):
+        result = {"peak_rss_bytes": peak_rss_bytes()}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            result.update(traced_current_bytes=current, traced_peak_bytes=peak)
+        return result
+
+    def to_json(self):
+        return {"spans": [span.as_dict() for span in list(self.spans)], "summary": self.summary(), "memory": self.memory()}
+
+    def chrome_trace(self):
+        # Формат Trace Event (chrome://tracing, Perfetto): события "X" с временем в микросекундах
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for span in list(self.spans):
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            events.append({"name": span.name, "ph": "X", "ts": span.start * 1e6, "dur": span.duration * 1e6,
+                           "pid": pid, "tid": tid, "args": span.args})
+        events.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                      for name, tid in threads.items())
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, file_path, chrome=False):
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace() if chrome else self.to_json(), f, indent=None if chrome else 2, default=str)
+
+    def profile_text(self, limit=30):
+        if self.profile_stats is None:
+            return ""
+        stream = io.StringIO()
+        self.profile_stats.stream = stream
+        self.profile_stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+
+class _SpanContext:
+    __slots__ = ("profiler", "name", "args", "start", "depth", "profile", "profile_allowed", "memory_start")
+
+    def __init__(self, profiler, name, args, profile_allowed=True):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.profile_allowed = profile_allowed
+        self.profile = None
+        self.memory_start = None
+
+    def __enter__(self):
+        local = self.profiler._local
+        self.depth = getattr(local, "depth", 0)
+        local.depth = self.depth + 1
+        if self.depth == 0:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                self.memory_start = tracemalloc.get_traced_memory()[0]
+            if self.profile_allowed and self.profiler._profile_armed and self.profiler._claim_profile():
+                self.profile = cProfile.Profile()
+                self.profile.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        self.profiler._local.depth = self.depth
+        if self.profile is not None:
+            self.profile.disable()
+            self.profiler.profile_stats = pstats.Stats(self.profile)
+            self.profiler.profile_name = self.name
+        if self.memory_start is not None and tracemalloc.is_tracing():
+            # Прирост пиковой памяти Python за время интервала
+            self.args["peak_alloc_bytes"] = tracemalloc.get_traced_memory()[1] - self.memory_start
+        self.profiler.record(self.name, self.start, duration, self.depth, self.args)
+        return False
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024  # Linux отдаёт килобайты
+
+
+PROFILER = Profiler()
+span = PROFILER.span
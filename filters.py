@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class SortedIndex:
+    # Перестановка строк столбца по возрастанию значения (NaN в конце).
+    # Отсортированная копия значений не хранится: поиск идёт через sorter.
+    def __init__(self, values):
+        if values.dtype.kind == "b":
+            values = values.view(np.uint8)  # False/True - 0/1 без копии
+        if values.dtype.kind not in "iuf":
+            raise TypeError("Range filters need a numeric column.")
+        self.values = values
+        self.order = np.argsort(values, kind="stable")
+
+    def range(self, low, high):
+        # Номера строк с low <= значение <= high за O(log n + k), по возрастанию.
+        # Граница NaN ничего не пропускает: иначе searchsorted захватил бы NaN в конце сортировки
+        if np.isnan(low) or np.isnan(high):
+            return np.empty(0, dtype=np.intp)
+        low, high = self._bounds(low, high)
+        if low > high:
+            return np.empty(0, dtype=np.intp)
+        start = np.searchsorted(self.values, low, side="left", sorter=self.order)
+        stop = np.searchsorted(self.values, high, side="right", sorter=self.order)
+        return np.sort(self.order[start:stop])
+
+    def _bounds(self, low, high):
+        # Границы приводятся к типу столбца, иначе searchsorted скопирует весь столбец
+        dtype = self.values.dtype
+        if dtype.kind in "iu":
+            info = np.iinfo(dtype)
+            low = dtype.type(min(max(np.ceil(low), info.min), info.max))
+            high = dtype.type(min(max(np.floor(high), info.min), info.max))
+            return low, high
+        cast_low, cast_high = dtype.type(low), dtype.type(high)
+        # Округление до float32 не должно расширять диапазон
+        if cast_low < low:
+            cast_low = np.nextafter(cast_low, dtype.type(np.inf))
+        if cast_high > high:
+            cast_high = np.nextafter(cast_high, dtype.type(-np.inf))
+        return cast_low, cast_high
+
+
+class FilterSet:
+    # Набор фильтров: по одному диапазону на столбец. Маска каждого столбца
+    # кэшируется, поэтому изменение одной границы пересчитывает только её
+    # столбец, а остальные маски просто пересекаются заново.
+    def __init__(self, n_rows, index_for_column):
+        self.n_rows = n_rows
+        self.ranges = {}
+        self._index_for_column = index_for_column
+        self._masks = {}
+        self._rows = None
+
+    def set_range(self, column, low, high):
+        rows = self._index_for_column(column).range(low, high)
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        self.ranges[column] = (low, high)
+        self._masks[column] = mask
+        self._rows = None
+
+    def remove(self, column):
+        self.ranges.pop(column, None)
+        self._masks.pop(column, None)
+        self._rows = None
+
+    def clear(self):
+        self.ranges.clear()
+        self._masks.clear()
+        self._rows = None
+
+    def key(self):
+        # Хэшируемое описание набора для ключей кэша сводок
+        return tuple(sorted(self.ranges.items())) or None
+
+    def rows(self):
+        # Номера строк, прошедших все фильтры; None, если фильтров нет
+        if not self._masks:
+            return None
+        if self._rows is None:
+            masks = list(self._masks.values())
+            if len(masks) == 1:
+                self._rows = np.flatnonzero(masks[0])
+            else:
+                self._rows = np.flatnonzero(np.logical_and.reduce(masks))
+        return self._rows
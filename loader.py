@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+from column_store import STORE_VARIANT, ColumnStore, build_store
+from diagnostics import span
+from streaming import StreamingTableStats
+
+
+CATEGORY_MAX_RATIO = 0.5  # текст кодируется категориями, если различных значений не больше половины строк
+
+
+def downcast_frame(df, downcast_ints=False, float32=False):
+    # Целые - в наименьший подходящий тип (без потерь), вещественные - во float32 (с потерей точности)
+    for column in df.columns:
+        kind = df[column].dtype.kind
+        if downcast_ints and kind in "iu":
+            df[column] = pd.to_numeric(df[column], downcast="integer" if kind == "i" else "unsigned")
+        elif float32 and kind == "f" and df[column].dtype != np.float32:
+            df[column] = df[column].astype(np.float32)
+    return df
+
+
+def categorize_frame(df, max_ratio=CATEGORY_MAX_RATIO):
+    # Повторяющиеся строки хранятся один раз, в столбце остаются целые коды
+    for column in df.columns:
+        dtype = df[column].dtype
+        if dtype.kind == "O" and not isinstance(dtype, pd.CategoricalDtype) and df[column].nunique() <= max_ratio * len(df):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+class CSVLoader:
+    # Читает CSV по частям в фоновом потоке и сообщает о прогрессе через очередь.
+    # Сообщения: ("progress", rows, bytes_read), ("done", df, from_cache, memory), ("error", exc), ("cancelled",)
+    # memory - (байт до оптимизации типов или None, байт после)
+    def __init__(self, file_path, chunksize=100_000, cache=None, usecols=None, downcast_ints=False,
+                 float32=False, categorize=False):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.cache = cache
+        self.usecols = usecols
+        self.downcast_ints = downcast_ints
+        self.float32 = float32
+        self.categorize = categorize
+        self.memory_before = None
+        self.total_bytes = os.path.getsize(file_path)
+        self.messages = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def optimized(self):
+        return self.downcast_ints or self.float32 or self.categorize
+
+    def cache_variant(self):
+        # Загрузки с разными столбцами и типами хранятся в кэше отдельно
+        if self.usecols is None and not self.optimized:
+            return ""
+        usecols = sorted(map(str, self.usecols)) if self.usecols is not None else None
+        return json.dumps([usecols, self.downcast_ints, self.float32, self.categorize])
+
+    def _run(self):
+        if self.cache is not None:
+            with span("load.cache_load"):
+                df = self.cache.load(self.file_path, self.cache_variant())
+            if df is not None:
+                self.messages.put(("progress", len(df), self.total_bytes))
+                self.messages.put(("done", df, True, (None, memory_bytes(df))))
+                return
+        try:
+            with span("load.parse", file=os.path.basename(self.file_path)):
+                df = self._read()
+        except Exception as e:
+            self.messages.put(("error", e))
+            return
+        if df is None:
+            self.messages.put(("cancelled",))
+            return
+        self.messages.put(("done", df, False, (self.memory_before, memory_bytes(df))))
+        if self.cache is not None:
+            # Запись в кэш идёт уже после передачи данных в интерфейс
+            with span("load.cache_store"):
+                self.cache.store(self.file_path, df, self.cache_variant())
+
+    def _read(self):
+        chunks = []
+        rows = 0
+        if self.optimized:
+            self.memory_before = 0
+        with open(self.file_path, "rb") as f:
+            # usecols: ненужные столбцы не разбираются вовсе
+            with pd.read_csv(f, chunksize=self.chunksize, usecols=self.usecols) as reader:
+                for chunk in reader:
+                    if self.cancelled:
+                        return None
+                    if self.optimized:
+                        # Каждая часть ужимается сразу, чтобы не держать в памяти исходные типы
+                        self.memory_before += memory_bytes(chunk)
+                        chunk = downcast_frame(chunk, self.downcast_ints, self.float32)
+                    chunks.append(chunk)
+                    rows += len(chunk)
+                    # f.tell() отстаёт от парсера не больше чем на размер буфера
+                    self.messages.put(("progress", rows, f.tell()))
+        if self.cancelled:
+            return None
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+        if self.categorize:
+            # Категории назначаются по всей таблице: у частей они были бы разными
+            df = categorize_frame(df)
+        return df
+
+
+class StreamingStatsLoader(CSVLoader):
+    # Для файлов больше памяти: таблица не собирается, каждая часть сворачивается
+    # в накопители StreamingTableStats и сразу освобождается.
+    # Вместо ("done", ...) присылает ("streamed", rows, stats_by_column)
+    def __init__(self, file_path, chunksize=100_000):
+        super().__init__(file_path, chunksize=chunksize)
+
+    def _run(self):
+        try:
+            with span("load.stream", file=os.path.basename(self.file_path)):
+                table = self._stream()
+        except Exception as e:
+            self.messages.put(("error", e))
+            return
+        if table is None:
+            self.messages.put(("cancelled",))
+            return
+        self.messages.put(("streamed", table.rows, table.result()))
+
+    def _stream(self):
+        table = StreamingTableStats()
+        with open(self.file_path, "rb") as f:
+            with pd.read_csv(f, chunksize=self.chunksize) as reader:
+                for chunk in reader:
+                    if self.cancelled:
+                        return None
+                    table.update(chunk)
+                    self.messages.put(("progress", table.rows, f.tell()))
+        return table
+
+
+class ColumnStoreLoader(CSVLoader):
+    # Для данных больше памяти: числовые столбцы один раз переводятся в ColumnStore
+    # внутри кэша и открываются через memory map. Повторное открытие не разбирает CSV,
+    # а окна и процессы, открывшие один файл, делят одни и те же страницы.
+    # Текстовые столбцы в хранилище не попадают. memory в сообщении "done" - None.
+    def __init__(self, file_path, cache, chunksize=100_000, usecols=None):
+        super().__init__(file_path, chunksize=chunksize, cache=cache, usecols=usecols)
+
+    def cache_variant(self):
+        usecols = sorted(map(str, self.usecols)) if self.usecols is not None else None
+        return json.dumps([STORE_VARIANT, usecols])
+
+    def _run(self):
+        try:
+            key = self.cache.key(self.file_path, self.cache_variant())
+            store_dir = os.path.join(self.cache.cache_dir, key)
+            try:
+                store = ColumnStore(store_dir)
+                os.utime(os.path.join(store_dir, "meta.json"))  # время доступа для LRU, как в DatasetCache.load
+                from_cache = True
+            except (OSError, ValueError, KeyError):
+                with span("load.column_store", file=os.path.basename(self.file_path)):
+                    store = build_store(self.file_path, store_dir, self.chunksize, self.usecols,
+                                        progress=lambda rows, position: self.messages.put(("progress", rows, position)),
+                                        cancelled=lambda: self.cancelled)
+                if store is None:
+                    self.messages.put(("cancelled",))
+                    return
+                self.cache.evict(keep=key)
+                from_cache = False
+            df = store.frame()
+        except Exception as e:
+            self.messages.put(("error", e))
+            return
+        self.messages.put(("progress", store.rows, self.total_bytes))
+        self.messages.put(("done", df, from_cache, None))
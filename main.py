@@ -1,14 +1,47 @@
+import startup  # Первым: от него отсчитывается время запуска
+import argparse
 import tkinter as tk
 from tkinter import filedialog, colorchooser, messagebox, Toplevel, ttk
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
 import numpy as np
-from scipy.stats import gmean, hmean
-import statistics
-import seaborn as sns  # Import seaborn
+import queue
+import time
+# pandas (через loader и cache) и seaborn импортируются при первом использовании:
+# окно появляется, не дожидаясь их загрузки
+from startup import timed_import
+from diagnostics import PROFILER, span
+from stats_engine import HISTOGRAM_BIN_RULES, compute_statistics, column_values, histogram, numeric_array, parse_bins
+from summary_cache import SummaryCache
+from filters import FilterSet, SortedIndex
+from outliers import METHODS as OUTLIER_METHODS, SAMPLE_ROWS as OUTLIER_SAMPLE_ROWS, detect_outliers, numeric_columns
+from overview import ColumnStatisticsRunner
+from scheduler import RecomputeScheduler
+from correlation import METHODS as CORRELATION_METHODS, correlation_matrix
+from plotting import EXACT_POINT_LIMIT, PlotPanel, decimate_minmax, density_grid, draw_density
 
 plt.style.use('seaborn-v0_8')  # Set default plot style
+startup.REPORT.mark("imports")
+
+# Показатели в таблице обзора, по ключам результата compute_statistics
+OVERVIEW_STATISTICS = ("count", "mean", "median", "mode", "std_dev", "variance", "min", "max", "range",
+                       "geometric_mean", "harmonic_mean", "quadratic_mean", "outliers")
+SCATTER_WINDOW_SIZE = (6, 4)  # дюймы окна графика расхождений
+CORRELATION_TICK_LIMIT = 40  # при большем числе столбцов подписи осей не помещаются
+DIAGNOSTICS_RECENT_SPANS = 500  # строк в таблице последних интервалов панели диагностики
+DIAGNOSTICS_REFRESH_MS = 1000
+
+
+def is_export_key(key):
+    # Ключ планировщика задачи "Export All Plots": (вкладка, "export")
+    return isinstance(key, tuple) and key[1:] == ("export",)
+
+
+def format_statistic(value):
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.6g}"
+    return str(value)
 
 class ScrollableFrame(tk.Frame):
     def __init__(self, master, **kwargs):
@@ -54,14 +87,33 @@ class DataAnalyzerApp:
         master.title("Data Analysis")  # Default title in English
 
         self.df = None
-        self.filtered_df = None
+        self.filter_set = None  # Tab 2 range filters, one per column
+        self.sorted_indexes = {}  # Column -> SortedIndex, built on first filter by that column
         self.selected_column = None
         self.scatter_visible = tk.BooleanVar(value=True)
         self.boxplot_visible = tk.BooleanVar(value=True)
+        self.scatter_mode = tk.StringVar(value="auto")  # "auto" decimates large data, "exact" draws every point, "density" draws a 2D histogram
         self.scatter_color = "blue"
         self.boxplot_color = "green"
         self.current_language = "en"  # Default language is English
         self.histogram_color = "skyblue"  # Default histogram color
+        self.loader = None  # Active background CSV loader
+        self.dataset_cache = None  # On-disk columnar cache of parsed CSV files, created on first load
+        self.summary_cache = SummaryCache()  # Memoized per-column statistics
+        self.dataset_id = 0  # Incremented on every load, part of summary cache keys
+        self.filter_key = None  # FilterSet.key() of the active tab 2 filters
+        self.histogram_windows = []  # (stairs, canvas) of open histogram windows
+        self.streamed_stats = None  # Column -> sketch-based statistics when a file was streamed instead of loaded
+        self.overview_runner = None  # Active background computation of the overview table
+        self.overview_rows = {}  # Overview tree item -> statistics of its column
+        self.overview_total = 0  # Numeric columns expected in the overview table
+        self.overview_sort = (None, False)  # (statistic, descending) of the overview table
+        self.correlation_columns = []  # Columns of the correlation heatmap on display
+        self.correlation_status = (None, {})  # Translation key and values of the correlation status line
+        self.busy_labels = {}  # Panel name -> label shown while its computations run
+        self.correlation_values = None  # Correlation matrix on display
+        self.load_started = None  # perf_counter() when the active loader was started
+        self.diagnostics_window = None  # Hidden profiling panel, opened with Ctrl+Shift+D
 
         # Translations dictionary
         self.translations = {
@@ -99,7 +151,94 @@ class DataAnalyzerApp:
                 "max_value": "Max Value:",
                 "apply_filter": "Apply Filter",
                 "histogram": "Histogram",
-                "histogram_color": "Histogram Color"
+                "histogram_color": "Histogram Color",
+                "cancel_load": "Cancel",
+                "loading": "Loading: {rows} rows, {read} of {total} MB",
+                "loaded": "Loaded {rows} rows",
+                "loaded_cached": "Loaded {rows} rows (from cache)",
+                "load_cancelled": "Loading cancelled",
+                "clear_cache": "Clear Cache",
+                "cache_cleared": "Cache cleared, {size} MB freed.",
+                "scatter_rendering": "Scatter rendering:",
+                "render_auto": "Auto (decimate large data)",
+                "render_exact": "Exact",
+                "render_density": "Density (very large data)",
+                "outliers_count": "Outliers: {count}",
+                "outliers_sampled": "Outliers: {shown} of {count} shown",
+                "bins": "Bins:",
+                "active_filters": "Active filters:",
+                "remove_filter": "Remove Filter",
+                "clear_filters": "Clear Filters",
+                "detect_outliers": "Detect Outliers",
+                "method": "Method:",
+                "method_iqr": "IQR fences (1.5 x IQR)",
+                "method_zscore": "Z-score (|z| > 3)",
+                "method_mad": "Modified z-score (MAD)",
+                "column": "Column",
+                "lower_bound": "Lower bound",
+                "upper_bound": "Upper bound",
+                "outliers": "Outliers",
+                "outliers_percent": "% of values",
+                "apply_bounds": "Apply Bounds",
+                "apply_bounds_hint": "Applies the selected rows, or every column with outliers if none is selected.",
+                "bounds_sampled": "Bounds estimated from a random sample of {rows} rows.",
+                "load_options": "Load Options",
+                "columns_to_load": "Columns to load:",
+                "select_all": "Select All",
+                "select_none": "Select None",
+                "downcast_ints": "Store integers in the smallest type",
+                "float32": "Store decimals as float32 (less precise)",
+                "categorize": "Encode repeated text as categories",
+                "memory_map": "Memory-map numeric columns (data larger than RAM, text columns are skipped)",
+                "ok": "OK",
+                "no_columns_selected": "Select at least one column.",
+                "memory_usage": "{after} MB in memory",
+                "memory_saved": "{after} MB in memory instead of {before} MB",
+                "stream_data": "Stream Large CSV (approximate)",
+                "streamed": "Streamed {rows} rows, statistics are approximate",
+                "approximate_note": "\u2248 approximate: the file was streamed, median, quartiles and mode come from sketches",
+                "tab3": "Overview",
+                "count": "Count:",
+                "overview_progress": "Computed {done} of {total} numeric columns",
+                "overview_done": "{total} numeric columns",
+                "tab4": "Correlation",
+                "computing": "Computing\u2026",
+                "export_plots": "Export All Plots",
+                "export_options": "Export Plots",
+                "export_formats": "File formats:",
+                "export_filtered": "Also plot the rows kept by the tab 2 filters",
+                "export_no_format": "Choose at least one file format.",
+                "export_running": "An export is already running.",
+                "export_done": "Exported {count} plots of {columns} columns to {path}.",
+                "method_pearson": "Pearson",
+                "method_spearman": "Spearman (rank)",
+                "correlation_rows": "{columns} numeric columns, {rows} rows",
+                "correlation_filtered": "{columns} numeric columns, {rows} rows (tab 2 filters applied)",
+                "correlation_streamed": "Correlation needs the rows in memory: load the file instead of streaming it.",
+                "correlation_too_few": "At least two numeric columns are needed.",
+                "correlation_value": "{x} / {y}: {value}",
+                "diagnostics": "Diagnostics",
+                "span_name": "Span",
+                "span_count": "Calls",
+                "span_total": "Total, ms",
+                "span_mean": "Mean, ms",
+                "span_max": "Max, ms",
+                "span_start": "Start, s",
+                "span_duration": "Duration, ms",
+                "span_thread": "Thread",
+                "span_details": "Details",
+                "trace_memory": "Trace Python allocations (slower)",
+                "peak_rss": "Peak process memory: {size} MB",
+                "traced_memory": "Python allocations: {current} MB now, {peak} MB peak",
+                "summary_cache_info": "Summary cache: {hits} hits, {misses} misses, {entries} entries",
+                "refresh": "Refresh",
+                "clear": "Clear",
+                "export_json": "Export JSON",
+                "export_trace": "Export Chrome Trace",
+                "profile_next": "Profile Next Action",
+                "profile_armed": "The next action will run under cProfile...",
+                "profile_result": "cProfile: {name}",
+                "save_profile": "Save Profile"
             },
             "ru": {
                 "title": "Анализ Данных",
@@ -135,10 +274,107 @@ class DataAnalyzerApp:
                 "max_value": "Макс. значение:",
                 "apply_filter": "Применить фильтр",
                 "histogram": "Гистограмма",
-                "histogram_color": "Цвет гистограммы"
+                "histogram_color": "Цвет гистограммы",
+                "cancel_load": "Отмена",
+                "loading": "Загрузка: {rows} строк, {read} из {total} МБ",
+                "loaded": "Загружено строк: {rows}",
+                "loaded_cached": "Загружено строк: {rows} (из кэша)",
+                "load_cancelled": "Загрузка отменена",
+                "clear_cache": "Очистить кэш",
+                "cache_cleared": "Кэш очищен, освобождено {size} МБ.",
+                "scatter_rendering": "Отрисовка графика:",
+                "render_auto": "Авто (прореживание больших данных)",
+                "render_exact": "Точная",
+                "render_density": "Плотность (очень большие данные)",
+                "outliers_count": "Выбросов: {count}",
+                "outliers_sampled": "Выбросов: {count}, показано {shown}",
+                "bins": "Интервалы:",
+                "active_filters": "Активные фильтры:",
+                "remove_filter": "Удалить фильтр",
+                "clear_filters": "Сбросить фильтры",
+                "detect_outliers": "Найти выбросы",
+                "method": "Метод:",
+                "method_iqr": "Границы IQR (1.5 x IQR)",
+                "method_zscore": "Z-оценка (|z| > 3)",
+                "method_mad": "Модифицированная z-оценка (MAD)",
+                "column": "Столбец",
+                "lower_bound": "Нижняя граница",
+                "upper_bound": "Верхняя граница",
+                "outliers": "Выбросы",
+                "outliers_percent": "% значений",
+                "apply_bounds": "Применить границы",
+                "apply_bounds_hint": "Применяются выбранные строки или, если ничего не выбрано, все столбцы с выбросами.",
+                "bounds_sampled": "Границы оценены по случайной выборке из {rows} строк.",
+                "load_options": "Параметры загрузки",
+                "columns_to_load": "Загружаемые столбцы:",
+                "select_all": "Выбрать все",
+                "select_none": "Снять выбор",
+                "downcast_ints": "Хранить целые в наименьшем типе",
+                "float32": "Хранить дробные как float32 (менее точно)",
+                "categorize": "Кодировать повторяющийся текст категориями",
+                "memory_map": "Отображать числовые столбцы в память (данные больше ОЗУ, текстовые столбцы пропускаются)",
+                "ok": "ОК",
+                "no_columns_selected": "Выберите хотя бы один столбец.",
+                "memory_usage": "в памяти {after} МБ",
+                "memory_saved": "в памяти {after} МБ вместо {before} МБ",
+                "stream_data": "Потоковый анализ большого CSV (приближённо)",
+                "streamed": "Обработано потоком строк: {rows}, статистика приближённая",
+                "approximate_note": "\u2248 приближённо: файл обработан потоком, медиана, квартили и мода получены из эскизов",
+                "tab3": "Обзор",
+                "count": "Количество:",
+                "overview_progress": "Посчитано {done} из {total} числовых столбцов",
+                "overview_done": "Числовых столбцов: {total}",
+                "tab4": "Корреляция",
+                "computing": "Вычисление\u2026",
+                "export_plots": "Экспорт всех графиков",
+                "export_options": "Экспорт графиков",
+                "export_formats": "Форматы файлов:",
+                "export_filtered": "Также строки, оставленные фильтрами вкладки 2",
+                "export_no_format": "Выберите хотя бы один формат файлов.",
+                "export_running": "Экспорт уже выполняется.",
+                "export_done": "Сохранено графиков: {count} для столбцов: {columns} в {path}.",
+                "method_pearson": "Пирсон",
+                "method_spearman": "Спирмен (ранговая)",
+                "correlation_rows": "Числовых столбцов: {columns}, строк: {rows}",
+                "correlation_filtered": "Числовых столбцов: {columns}, строк: {rows} (с фильтрами вкладки 2)",
+                "correlation_streamed": "Для корреляции нужны строки в памяти: загрузите файл вместо потоковой обработки.",
+                "correlation_too_few": "Нужно хотя бы два числовых столбца.",
+                "correlation_value": "{x} / {y}: {value}",
+                "diagnostics": "Диагностика",
+                "span_name": "Интервал",
+                "span_count": "Вызовов",
+                "span_total": "Всего, мс",
+                "span_mean": "Среднее, мс",
+                "span_max": "Макс., мс",
+                "span_start": "Начало, с",
+                "span_duration": "Длительность, мс",
+                "span_thread": "Поток",
+                "span_details": "Подробности",
+                "trace_memory": "Отслеживать выделения памяти Python (медленнее)",
+                "peak_rss": "Пиковая память процесса: {size} МБ",
+                "traced_memory": "Память Python: сейчас {current} МБ, пик {peak} МБ",
+                "summary_cache_info": "Кэш сводок: попаданий {hits}, промахов {misses}, записей {entries}",
+                "refresh": "Обновить",
+                "clear": "Очистить",
+                "export_json": "Экспорт JSON",
+                "export_trace": "Экспорт Chrome Trace",
+                "profile_next": "Профилировать следующее действие",
+                "profile_armed": "Следующее действие будет выполнено под cProfile...",
+                "profile_result": "cProfile: {name}",
+                "save_profile": "Сохранить профиль"
             }
         }
 
+        # Строка состояния загрузки (внизу окна, общая для обеих вкладок)
+        self.status_frame = tk.Frame(master)
+        self.status_frame.pack(side=tk.BOTTOM, fill="x")
+        self.progress_bar = ttk.Progressbar(self.status_frame, mode="determinate")
+        self.progress_bar.pack(side=tk.LEFT, fill="x", expand=True, padx=5, pady=2)
+        self.status_label = tk.Label(self.status_frame, text="")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        self.cancel_load_button = tk.Button(self.status_frame, text=self.translations[self.current_language]["cancel_load"], command=self.cancel_load, state=tk.DISABLED)
+        self.cancel_load_button.pack(side=tk.RIGHT, padx=5)
+
         # Notebook для вкладок
         self.notebook = ttk.Notebook(master)
         self.notebook.pack(fill="both", expand=True)
@@ -151,9 +387,44 @@ class DataAnalyzerApp:
         # Вкладка 2: Анализ выбросов
         self.tab2 = tk.Frame(self.notebook)
         self.notebook.add(self.tab2, text=self.translations[self.current_language]["tab2"])
+
+        # Вкладка 3: Обзор всех столбцов
+        self.tab3 = tk.Frame(self.notebook)
+        self.notebook.add(self.tab3, text=self.translations[self.current_language]["tab3"])
+
+        # Вкладка 4: Корреляционная матрица
+        self.tab4 = tk.Frame(self.notebook)
+        self.notebook.add(self.tab4, text=self.translations[self.current_language]["tab4"])
+
+        # Содержимое вкладок 2-4 строится при первом открытии
+        self.tab_builders = {str(self.tab2): self.build_tab2, str(self.tab3): self.build_tab3, str(self.tab4): self.build_tab4}
+        self.tab_panels = {str(self.tab1): self.plot_panel}
+        self.dirty_tabs = {}  # Tab widget name -> "data" (recompute) or "style" (restyle only)
+        self.scheduler = RecomputeScheduler(master, on_busy=self.on_busy_changed)  # Debounced refreshes, heavy part on worker threads
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        # Панель диагностики скрыта: открывается только сочетанием клавиш
+        master.bind("<Control-D>", self.open_diagnostics)
+
+    def tab_built(self, tab):
+        return str(tab) not in self.tab_builders
+
+    def ensure_tab_built(self, tab):
+        builder = self.tab_builders.pop(str(tab), None)
+        if builder is not None:
+            builder()
+
+    def build_tab2(self):
         self.create_tab2_content(self.tab2)
+        self.tab_panels[str(self.tab2)] = self.plot_panel_tab2
+        if self.df is not None:
+            self.update_filter_list()
+            self.update_column_dropdown_tab2(list(self.df.columns))
+
+    def build_tab3(self):
+        self.create_tab3_content(self.tab3)
 
-        self.notebook.bind("<<NotebookTabChanged>>", self.update_tab_text)
+    def build_tab4(self):
+        self.create_tab4_content(self.tab4)
 
     def create_tab1_content(self, tab):
         # Frame для элементов управления и статистики
@@ -181,20 +452,38 @@ class DataAnalyzerApp:
         self.load_data_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["load_data"], command=self.load_data)
         self.load_data_button.pack()
 
+        # Файлы больше памяти: только статистика, таблица не загружается
+        self.stream_data_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["stream_data"], command=self.stream_data)
+        self.stream_data_button.pack()
+
+        # Кнопка для очистки кэша загруженных файлов
+        self.clear_cache_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["clear_cache"], command=self.clear_cache)
+        self.clear_cache_button.pack()
+
         # Выпадающий список для выбора столбца
         self.column_label = tk.Label(self.inner_control_frame, text=self.translations[self.current_language]["select_column"])
         self.column_label.pack()
         self.column_var = tk.StringVar(self.master)
         self.column_dropdown = tk.OptionMenu(self.inner_control_frame, self.column_var, "")
         self.column_dropdown.pack()
-        self.column_var.trace("w", self.update_plots_and_stats)
+        self.column_var.trace("w", self.on_column_changed)
 
         # Чекбоксы для включения/выключения графиков
-        self.scatter_check = tk.Checkbutton(self.inner_control_frame, text=self.translations[self.current_language]["scatter_plot"], variable=self.scatter_visible, command=self.update_plots_and_stats)
+        self.scatter_check = tk.Checkbutton(self.inner_control_frame, text=self.translations[self.current_language]["scatter_plot"], variable=self.scatter_visible, command=self.on_plot_options_changed)
         self.scatter_check.pack()
-        self.boxplot_check = tk.Checkbutton(self.inner_control_frame, text=self.translations[self.current_language]["box_plot"], variable=self.boxplot_visible, command=self.update_plots_and_stats)
+        self.boxplot_check = tk.Checkbutton(self.inner_control_frame, text=self.translations[self.current_language]["box_plot"], variable=self.boxplot_visible, command=self.on_plot_options_changed)
         self.boxplot_check.pack()
 
+        # Режим отрисовки графика расхождений
+        self.scatter_mode_label = tk.Label(self.inner_control_frame, text=self.translations[self.current_language]["scatter_rendering"])
+        self.scatter_mode_label.pack()
+        self.scatter_auto_radio = tk.Radiobutton(self.inner_control_frame, text=self.translations[self.current_language]["render_auto"], variable=self.scatter_mode, value="auto", command=self.on_plot_options_changed)
+        self.scatter_auto_radio.pack()
+        self.scatter_exact_radio = tk.Radiobutton(self.inner_control_frame, text=self.translations[self.current_language]["render_exact"], variable=self.scatter_mode, value="exact", command=self.on_plot_options_changed)
+        self.scatter_exact_radio.pack()
+        self.scatter_density_radio = tk.Radiobutton(self.inner_control_frame, text=self.translations[self.current_language]["render_density"], variable=self.scatter_mode, value="density", command=self.on_plot_options_changed)
+        self.scatter_density_radio.pack()
+
         # Кнопки для выбора цвета
         self.scatter_color_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["scatter_color"], command=self.choose_scatter_color)
         self.scatter_color_button.pack()
@@ -206,6 +495,8 @@ class DataAnalyzerApp:
         self.save_scatter_button.pack()
         self.save_boxplot_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["save_box"], command=self.save_boxplot)
         self.save_boxplot_button.pack()
+        self.export_plots_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["export_plots"], command=self.export_all_plots)
+        self.export_plots_button.pack()
 
         # Кнопки для открытия графиков в новом окне
         self.open_scatter_button = tk.Button(self.inner_control_frame, text=self.translations[self.current_language]["open_scatter"], command=self.open_scatter_plot)
@@ -225,6 +516,8 @@ class DataAnalyzerApp:
         self.fig, (self.ax_scatter, self.ax_boxplot) = plt.subplots(2, 1, figsize=(4, 4))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
         self.canvas.get_tk_widget().pack()
+        self.plot_panel = PlotPanel(self.canvas, self.ax_scatter, self.ax_boxplot)
+        self.add_busy_label(str(tab), self.canvas.get_tk_widget())
 
         # Текстовые поля для отображения статистики
         self.mean_label = tk.Label(self.inner_control_frame, text=self.translations[self.current_language]["mean"])
@@ -282,6 +575,17 @@ class DataAnalyzerApp:
         self.mode_text = tk.Text(self.inner_control_frame, height=1, width=30)
         self.mode_text.pack()
 
+        self.approximate_label = tk.Label(self.inner_control_frame, text="", wraplength=250, fg="gray25")
+        self.approximate_label.pack()
+
+        # Поля статистики по ключам результата compute_statistics
+        self.stat_texts = {
+            "mean": self.mean_text, "variance": self.variance_text, "range": self.range_text,
+            "max": self.max_text, "min": self.min_text, "geometric_mean": self.geometric_mean_text,
+            "harmonic_mean": self.harmonic_mean_text, "quadratic_mean": self.quadratic_mean_text,
+            "median": self.median_text, "std_dev": self.std_dev_text, "mode": self.mode_text,
+        }
+
     def create_tab2_content(self, tab):
         # Frame для элементов управления и статистики
         self.control_frame_tab2 = ScrollableFrame(tab)  # Use ScrollableFrame
@@ -303,14 +607,24 @@ class DataAnalyzerApp:
         self.column_var_tab2 = tk.StringVar(self.master)
         self.column_dropdown_tab2 = tk.OptionMenu(self.inner_control_frame_tab2, self.column_var_tab2, "")
         self.column_dropdown_tab2.pack()
-        self.column_var_tab2.trace("w", self.update_plots_and_stats_tab2)
+        self.column_var_tab2.trace("w", self.on_column_changed_tab2)
 
         # Чекбоксы для включения/выключения графиков
-        self.scatter_check_tab2 = tk.Checkbutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["scatter_plot"], variable=self.scatter_visible, command=self.update_plots_and_stats_tab2)
+        self.scatter_check_tab2 = tk.Checkbutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["scatter_plot"], variable=self.scatter_visible, command=self.on_plot_options_changed)
         self.scatter_check_tab2.pack()
-        self.boxplot_check_tab2 = tk.Checkbutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["box_plot"], variable=self.boxplot_visible, command=self.update_plots_and_stats_tab2)
+        self.boxplot_check_tab2 = tk.Checkbutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["box_plot"], variable=self.boxplot_visible, command=self.on_plot_options_changed)
         self.boxplot_check_tab2.pack()
 
+        # Режим отрисовки графика расхождений
+        self.scatter_mode_label_tab2 = tk.Label(self.inner_control_frame_tab2, text=self.translations[self.current_language]["scatter_rendering"])
+        self.scatter_mode_label_tab2.pack()
+        self.scatter_auto_radio_tab2 = tk.Radiobutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["render_auto"], variable=self.scatter_mode, value="auto", command=self.on_plot_options_changed)
+        self.scatter_auto_radio_tab2.pack()
+        self.scatter_exact_radio_tab2 = tk.Radiobutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["render_exact"], variable=self.scatter_mode, value="exact", command=self.on_plot_options_changed)
+        self.scatter_exact_radio_tab2.pack()
+        self.scatter_density_radio_tab2 = tk.Radiobutton(self.inner_control_frame_tab2, text=self.translations[self.current_language]["render_density"], variable=self.scatter_mode, value="density", command=self.on_plot_options_changed)
+        self.scatter_density_radio_tab2.pack()
+
         # Кнопки для выбора цвета
         self.scatter_color_button_tab2 = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["scatter_color"], command=self.choose_scatter_color)
         self.scatter_color_button_tab2.pack()
@@ -322,6 +636,8 @@ class DataAnalyzerApp:
         self.save_scatter_button_tab2.pack()
         self.save_boxplot_button_tab2 = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["save_box"], command=self.save_boxplot)
         self.save_boxplot_button_tab2.pack()
+        self.export_plots_button_tab2 = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["export_plots"], command=self.export_all_plots)
+        self.export_plots_button_tab2.pack()
 
         # Кнопки для открытия графиков в новом окне
         self.open_scatter_button_tab2 = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["open_scatter"], command=self.open_scatter_plot)
@@ -352,10 +668,25 @@ class DataAnalyzerApp:
         self.apply_filter_button = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["apply_filter"], command=self.apply_outlier_filter)
         self.apply_filter_button.pack()
 
+        # Список активных фильтров: выбор строки подставляет её границы для правки
+        self.active_filters_label = tk.Label(self.inner_control_frame_tab2, text=self.translations[self.current_language]["active_filters"])
+        self.active_filters_label.pack()
+        self.filter_listbox = tk.Listbox(self.inner_control_frame_tab2, height=5, width=40, exportselection=False)
+        self.filter_listbox.pack()
+        self.filter_listbox.bind("<<ListboxSelect>>", self.on_filter_selected)
+        self.remove_filter_button = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["remove_filter"], command=self.remove_filter)
+        self.remove_filter_button.pack()
+        self.clear_filters_button = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["clear_filters"], command=self.clear_filters)
+        self.clear_filters_button.pack()
+        self.detect_outliers_button = tk.Button(self.inner_control_frame_tab2, text=self.translations[self.current_language]["detect_outliers"], command=self.open_outlier_detection)
+        self.detect_outliers_button.pack()
+
         # Область для графиков (уменьшенные размеры)
         self.fig_tab2, (self.ax_scatter_tab2, self.ax_boxplot_tab2) = plt.subplots(2, 1, figsize=(4, 4))
         self.canvas_tab2 = FigureCanvasTkAgg(self.fig_tab2, master=self.plot_frame_tab2)
         self.canvas_tab2.get_tk_widget().pack()
+        self.plot_panel_tab2 = PlotPanel(self.canvas_tab2, self.ax_scatter_tab2, self.ax_boxplot_tab2)
+        self.add_busy_label(str(tab), self.canvas_tab2.get_tk_widget())
 
         # Текстовые поля для отображения статистики
         self.mean_label_tab2 = tk.Label(self.inner_control_frame_tab2, text=self.translations[self.current_language]["mean"])
@@ -413,21 +744,343 @@ class DataAnalyzerApp:
         self.mode_text_tab2 = tk.Text(self.inner_control_frame_tab2, height=1, width=30)
         self.mode_text_tab2.pack()
 
+        self.stat_texts_tab2 = {
+            "mean": self.mean_text_tab2, "variance": self.variance_text_tab2, "range": self.range_text_tab2,
+            "max": self.max_text_tab2, "min": self.min_text_tab2, "geometric_mean": self.geometric_mean_text_tab2,
+            "harmonic_mean": self.harmonic_mean_text_tab2, "quadratic_mean": self.quadratic_mean_text_tab2,
+            "median": self.median_text_tab2, "std_dev": self.std_dev_text_tab2, "mode": self.mode_text_tab2,
+        }
+
+    def create_tab3_content(self, tab):
+        self.overview_status_label = tk.Label(tab, text="", anchor=tk.W)
+        self.overview_status_label.pack(side=tk.TOP, fill="x", padx=5, pady=2)
+
+        # Таблица: строка на числовой столбец, щелчок по заголовку сортирует
+        self.overview_tree = ttk.Treeview(tab, columns=("column",) + OVERVIEW_STATISTICS, show="headings")
+        for name in ("column",) + OVERVIEW_STATISTICS:
+            self.overview_tree.heading(name, command=lambda name=name: self.sort_overview(name))
+            self.overview_tree.column(name, width=140 if name == "column" else 100, anchor=tk.W if name == "column" else tk.E)
+        self.update_overview_headings()
+        y_scrollbar = ttk.Scrollbar(tab, orient="vertical", command=self.overview_tree.yview)
+        x_scrollbar = ttk.Scrollbar(tab, orient="horizontal", command=self.overview_tree.xview)
+        self.overview_tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        x_scrollbar.pack(side=tk.BOTTOM, fill="x")
+        y_scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.overview_tree.pack(side=tk.LEFT, fill="both", expand=True)
+
+    def create_tab4_content(self, tab):
+        texts = self.translations[self.current_language]
+        controls = tk.Frame(tab)
+        controls.pack(side=tk.TOP, fill="x", padx=5, pady=2)
+        self.correlation_method_label = tk.Label(controls, text=texts["method"])
+        self.correlation_method_label.pack(side=tk.LEFT)
+        self.correlation_method_var = tk.StringVar(value=texts["method_pearson"])
+        self.correlation_method_box = ttk.Combobox(controls, textvariable=self.correlation_method_var, state="readonly", width=20,
+                                                   values=[texts[f"method_{method}"] for method in CORRELATION_METHODS])
+        self.correlation_method_box.pack(side=tk.LEFT)
+        self.correlation_method_box.bind("<<ComboboxSelected>>", lambda event: self.mark_dirty(self.tab4))
+        self.correlation_status_label = tk.Label(controls, text="", anchor=tk.W)
+        self.correlation_status_label.pack(side=tk.LEFT, padx=10)
+        self.correlation_value_label = tk.Label(tab, text="", anchor=tk.W)
+        self.correlation_value_label.pack(side=tk.BOTTOM, fill="x", padx=5)
+
+        # Вся матрица - одно изображение; при смене данных меняются только его пиксели и подписи
+        self.fig_tab4, self.ax_correlation = plt.subplots(figsize=(6, 5))
+        self.ax_correlation.grid(False)
+        cmap = plt.get_cmap("RdBu_r").with_extremes(bad="#d9d9d9")
+        self.correlation_image = self.ax_correlation.imshow(np.full((1, 1), np.nan), cmap=cmap, vmin=-1, vmax=1,
+                                                            interpolation="nearest", aspect="auto")
+        self.fig_tab4.colorbar(self.correlation_image, ax=self.ax_correlation)
+        self.canvas_tab4 = FigureCanvasTkAgg(self.fig_tab4, master=tab)
+        self.canvas_tab4.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas_tab4.mpl_connect("motion_notify_event", self.on_correlation_hover)
+        self.add_busy_label(str(tab), self.canvas_tab4.get_tk_widget())
+
+    def correlation_method(self):
+        # Подпись могла остаться на прежнем языке, поэтому ищем во всех переводах
+        value = self.correlation_method_var.get()
+        for texts in self.translations.values():
+            for method in CORRELATION_METHODS:
+                if texts[f"method_{method}"] == value:
+                    return method
+        return CORRELATION_METHODS[0]
+
+    def update_correlation(self):
+        if self.df is None:
+            self.set_correlation_status("correlation_streamed" if self.streamed_stats is not None else None)
+            self.show_correlation([], None)
+            return
+        # Матрица кэшируется на (набор данных, фильтр вкладки 2, метод) и считается в фоновом
+        # потоке; строки берутся из того же FilterSet, что и статистика вкладки 2
+        df, method, filter_key = self.df, self.correlation_method(), self.filter_key
+        rows = self.filter_set.rows() if self.filter_set is not None else None
+
+        def compute():
+            columns = numeric_columns(df)
+            with span("correlation", method=method, columns=len(columns)):
+                # Блоками строк: для ColumnStore вся таблица в float64 не поднимается в память
+                return columns, len(df) if rows is None else len(rows), correlation_matrix(df, columns, rows, method)
+
+        def apply(result):
+            columns, row_count, values = result
+            if len(columns) < 2:
+                self.set_correlation_status("correlation_too_few")
+                self.show_correlation([], None)
+                return
+            self.set_correlation_status("correlation_filtered" if filter_key else "correlation_rows", columns=len(columns), rows=row_count)
+            self.show_correlation(columns, values)
+
+        key = (self.dataset_id, None, filter_key, ("correlation", method))
+        self.scheduler.submit(str(self.tab4), lambda: self.summary_cache.get(key, compute), apply)
+
+    def set_correlation_status(self, key, **values):
+        # Ключ перевода и числа запоминаются, чтобы смена языка перевела строку без пересчёта
+        self.correlation_status = (key, values)
+        self.correlation_status_label.config(text=self.translations[self.current_language][key].format(**values) if key else "")
+
+    def restyle_correlation(self):
+        key, values = self.correlation_status
+        self.set_correlation_status(key, **values)
+        self.ax_correlation.set_title(self.correlation_method_var.get() if self.correlation_columns else "")
+        self.correlation_value_label.config(text="")
+        self.canvas_tab4.draw_idle()
+
+    def show_correlation(self, columns, values):
+        self.correlation_columns = columns
+        self.correlation_values = values
+        ax = self.ax_correlation
+        size = len(columns)
+        self.correlation_image.set_data(values if values is not None else np.full((1, 1), np.nan))
+        self.correlation_image.set_extent((-0.5, max(size, 1) - 0.5, max(size, 1) - 0.5, -0.5))
+        ticks = list(range(size)) if size <= CORRELATION_TICK_LIMIT else []
+        labels = [str(columns[i]) for i in ticks]
+        ax.set_xticks(ticks, labels, rotation=90, fontsize=7)
+        ax.set_yticks(ticks, labels, fontsize=7)
+        ax.set_title(self.correlation_method_var.get() if size else "")
+        self.correlation_value_label.config(text="")
+        self.fig_tab4.tight_layout()
+        self.canvas_tab4.draw_idle()
+
+    def on_correlation_hover(self, event):
+        # Значение под курсором вместо подписей в каждой клетке
+        if event.inaxes is not self.ax_correlation or self.correlation_values is None:
+            return
+        i, j = int(round(event.ydata)), int(round(event.xdata))
+        if 0 <= i < len(self.correlation_columns) and 0 <= j < len(self.correlation_columns):
+            self.correlation_value_label.config(text=self.translations[self.current_language]["correlation_value"].format(
+                x=self.correlation_columns[j], y=self.correlation_columns[i], value=format_statistic(self.correlation_values[i, j])))
+
     def load_data(self):
         file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if file_path:
+            options = self.ask_load_options(file_path)
+            if options is not None:
+                loader = timed_import("loader")
+                if options.pop("memory_map"):
+                    self.start_loader(lambda: loader.ColumnStoreLoader(file_path, self.get_dataset_cache(), usecols=options["usecols"]))
+                else:
+                    self.start_loader(lambda: loader.CSVLoader(file_path, cache=self.get_dataset_cache(), **options))
+
+    def ask_load_options(self, file_path):
+        # Модальный диалог перед разбором: выбор столбцов (usecols) и сжатие типов.
+        # Типы столбцов показываются по первым строкам файла.
+        pd = timed_import("pandas")
+        try:
+            preview = pd.read_csv(file_path, nrows=1000)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return None
+        texts = self.translations[self.current_language]
+        dialog = Toplevel(self.master)
+        dialog.title(texts["load_options"])
+        dialog.transient(self.master)
+
+        tk.Label(dialog, text=texts["columns_to_load"]).pack(anchor=tk.W, padx=5)
+        list_frame = tk.Frame(dialog)
+        list_frame.pack(fill="both", expand=True, padx=5)
+        column_list = tk.Listbox(list_frame, selectmode=tk.MULTIPLE, height=min(max(len(preview.columns), 5), 20), width=50, exportselection=False)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=column_list.yview)
+        column_list.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill="y")
+        column_list.pack(side=tk.LEFT, fill="both", expand=True)
+        for column in preview.columns:
+            column_list.insert(tk.END, f"{column} ({preview[column].dtype})")
+        column_list.select_set(0, tk.END)
+
+        selection_buttons = tk.Frame(dialog)
+        selection_buttons.pack(fill="x", padx=5)
+        tk.Button(selection_buttons, text=texts["select_all"], command=lambda: column_list.select_set(0, tk.END)).pack(side=tk.LEFT)
+        tk.Button(selection_buttons, text=texts["select_none"], command=lambda: column_list.select_clear(0, tk.END)).pack(side=tk.LEFT)
+
+        # Целые и категории сжимаются без потерь, float32 - только по выбору
+        downcast_ints = tk.BooleanVar(dialog, value=True)
+        float32 = tk.BooleanVar(dialog, value=False)
+        categorize = tk.BooleanVar(dialog, value=True)
+        # Хранилище в отображаемых файлах вместо таблицы в памяти: сжатие типов к нему не относится
+        memory_map = tk.BooleanVar(dialog, value=False)
+        for variable, key in ((downcast_ints, "downcast_ints"), (float32, "float32"), (categorize, "categorize"), (memory_map, "memory_map")):
+            tk.Checkbutton(dialog, text=texts[key], variable=variable).pack(anchor=tk.W, padx=5)
+
+        result = {}
+
+        def on_ok():
+            selected = column_list.curselection()
+            if not selected:
+                messagebox.showerror("Error", texts["no_columns_selected"], parent=dialog)
+                return
+            columns = list(preview.columns)
+            result.update(usecols=None if len(selected) == len(columns) else [columns[i] for i in selected],
+                          downcast_ints=downcast_ints.get(), float32=float32.get(), categorize=categorize.get(),
+                          memory_map=memory_map.get())
+            dialog.destroy()
+
+        buttons = tk.Frame(dialog)
+        buttons.pack(fill="x", padx=5, pady=5)
+        tk.Button(buttons, text=texts["cancel_load"], command=dialog.destroy).pack(side=tk.RIGHT)
+        tk.Button(buttons, text=texts["ok"], command=on_ok).pack(side=tk.RIGHT)
+
+        dialog.grab_set()
+        self.master.wait_window(dialog)
+        return result or None
+
+    def stream_data(self):
+        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if file_path:
+            loader = timed_import("loader")
+            self.start_loader(lambda: loader.StreamingStatsLoader(file_path))
+
+    def start_loader(self, create_loader):
+        if self.loader is not None:
+            self.loader.cancel()
+        try:
+            self.loader = create_loader()
+        except OSError as e:
+            self.loader = None
+            messagebox.showerror("Error", str(e))
+            return
+        self.progress_bar.config(maximum=max(self.loader.total_bytes, 1), value=0)
+        self.status_label.config(text="")
+        self.cancel_load_button.config(state=tk.NORMAL)
+        self.load_started = time.perf_counter()
+        self.loader.start()
+        self.master.after(50, self.poll_loader, self.loader)
+
+    def get_dataset_cache(self):
+        if self.dataset_cache is None:
+            self.dataset_cache = timed_import("cache").DatasetCache()
+        return self.dataset_cache
+
+    def clear_cache(self):
+        freed = self.get_dataset_cache().clear()
+        messagebox.showinfo(self.translations[self.current_language]["info"],
+                            self.translations[self.current_language]["cache_cleared"].format(size=round(freed / 2**20, 1)))
+
+    def cancel_load(self):
+        if self.loader is not None:
+            self.loader.cancel()
+
+    def poll_loader(self, loader):
+        # Загрузчик, заменённый новым, больше не опрашиваем
+        if loader is not self.loader:
+            return
+        try:
+            while True:
+                message = loader.messages.get_nowait()
+                if message[0] == "progress":
+                    _, rows, bytes_read = message
+                    self.progress_bar.config(value=bytes_read)
+                    self.status_label.config(text=self.translations[self.current_language]["loading"].format(
+                        rows=rows, read=round(bytes_read / 2**20, 1), total=round(loader.total_bytes / 2**20, 1)))
+                else:
+                    self.finish_load(message)
+                    return
+        except queue.Empty:
+            pass
+        self.master.after(50, self.poll_loader, loader)
+
+    def finish_load(self, message):
+        self.loader = None
+        # Загрузка целиком, от запуска потока до сообщения о готовности
+        PROFILER.record("load_data", self.load_started, time.perf_counter() - self.load_started, 0, {"result": message[0]})
+        self.cancel_load_button.config(state=tk.DISABLED)
+        if message[0] == "cancelled":
+            self.progress_bar.config(value=0)
+            self.status_label.config(text=self.translations[self.current_language]["load_cancelled"])
+        elif message[0] == "error":
+            self.progress_bar.config(value=0)
+            self.status_label.config(text="")
+            messagebox.showerror("Error", str(message[1]))
+        elif message[0] == "streamed":
+            with span("load.set_data"):
+                self.set_streamed_data(message[1], message[2])
+        else:
             try:
-                self.df = pd.read_csv(file_path)
-                self.filtered_df = self.df.copy()  # Initialize filtered_df with a copy of the original DataFrame
-                columns = list(self.df.columns)
-                # Update dropdowns in both tabs
-                self.update_column_dropdown(columns)
-                self.update_column_dropdown_tab2(columns)
-                self.update_plots_and_stats()
-                self.update_plots_and_stats_tab2()
+                with span("load.set_data"):
+                    self.set_data(message[1], from_cache=message[2], memory=message[3])
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
+    def set_data(self, df, from_cache=False, memory=None):
+        self.df = df
+        self.streamed_stats = None
+        self.approximate_label.config(text="")
+        self.dataset_id += 1
+        self.filter_key = None
+        self.summary_cache.clear()
+        # Экспорт работает со снимком прежней таблицы и доводится до конца со своим сообщением
+        self.scheduler.cancel(keep=is_export_key)
+        self.cancel_overview()
+        self.sorted_indexes = {}
+        self.filter_set = FilterSet(len(df), self.sorted_index)
+        columns = list(self.df.columns)
+        self.progress_bar.config(value=self.progress_bar.cget("maximum"))
+        status_key = "loaded_cached" if from_cache else "loaded"
+        status = self.translations[self.current_language][status_key].format(rows=len(self.df))
+        if memory is not None:
+            before, after = memory
+            memory_key = "memory_saved" if before is not None and before != after else "memory_usage"
+            status += ", " + self.translations[self.current_language][memory_key].format(
+                before=round((before or 0) / 2**20, 1), after=round(after / 2**20, 1))
+        self.status_label.config(text=status)
+        # Update dropdowns in both tabs
+        self.update_column_dropdown(columns)
+        if self.tab_built(self.tab2):
+            self.update_filter_list()
+            self.update_column_dropdown_tab2(columns)
+        self.mark_dirty(self.tab1)
+        self.mark_dirty(self.tab2)
+        self.mark_dirty(self.tab3)
+        self.mark_dirty(self.tab4)
+
+    def set_streamed_data(self, rows, stats):
+        # Строк в памяти нет: доступны статистика, ящик с усами, гистограмма и обзор,
+        # а график расхождений и фильтры вкладки 2 - нет
+        self.df = None
+        self.streamed_stats = stats
+        self.dataset_id += 1
+        self.filter_key = None
+        self.summary_cache.clear()
+        # Экспорт работает со снимком прежней таблицы и доводится до конца со своим сообщением
+        self.scheduler.cancel(keep=is_export_key)
+        self.cancel_overview()
+        self.sorted_indexes = {}
+        self.filter_set = None
+        self.progress_bar.config(value=self.progress_bar.cget("maximum"))
+        self.status_label.config(text=self.translations[self.current_language]["streamed"].format(rows=rows))
+        if self.tab_built(self.tab2):
+            self.filter_listbox.delete(0, tk.END)
+            self.show_statistics(self.stat_texts_tab2, {})
+            self.plot_panel_tab2.data_key = None
+            self.plot_panel_tab2.set_scatter_points([], [])
+            self.plot_panel_tab2.set_box(None)
+            self.plot_panel_tab2.set_titles("", "")
+            self.plot_panel_tab2.redraw()
+        if stats:
+            self.update_column_dropdown(list(stats))
+        self.mark_dirty(self.tab1)
+        self.mark_dirty(self.tab3)
+        self.mark_dirty(self.tab4)
+
     def update_column_dropdown(self, columns):
         self.column_var.set(columns[0])  # set the default value
         self.column_dropdown['menu'].delete(0, 'end')
@@ -442,45 +1095,136 @@ class DataAnalyzerApp:
 
     def choose_scatter_color(self):
         color_code = colorchooser.askcolor(title=self.translations[self.current_language]["scatter_color"])
-        if color_code:
+        if color_code[1]:
             self.scatter_color = color_code[1]
-            self.update_plots_and_stats()
-            self.update_plots_and_stats_tab2()
+            self.restyle_plot_panels()
 
     def choose_boxplot_color(self):
         color_code = colorchooser.askcolor(title=self.translations[self.current_language]["box_color"])
-        if color_code:
+        if color_code[1]:
             self.boxplot_color = color_code[1]
-            self.update_plots_and_stats()
-            self.update_plots_and_stats_tab2()
+            self.restyle_plot_panels()
 
     def save_scatter_plot(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
-        if file_path:
-            self.fig.savefig(file_path)
-            self.fig_tab2.savefig(file_path)
+        # Сохраняется панель видимой вкладки; раньше панели обеих вкладок писались в один файл
+        panel = self.tab_panels.get(self.notebook.select())
+        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png"), ("SVG files", "*.svg")])
+        if panel is not None and file_path:
+            panel.savefig(file_path, panel.ax_scatter)
 
     def save_boxplot(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
-        if file_path:
-            self.fig.savefig(file_path)
-            self.fig_tab2.savefig(file_path)
+        panel = self.tab_panels.get(self.notebook.select())
+        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png"), ("SVG files", "*.svg")])
+        if panel is not None and file_path:
+            panel.savefig(file_path, panel.ax_box)
+
+    def export_all_plots(self):
+        # Графики расхождений, ящики и гистограммы всех числовых столбцов (и отфильтрованных строк)
+        # рисуются в пуле процессов batch.export_plots; главный поток только ждёт результата
+        texts = self.translations[self.current_language]
+        if self.df is None:
+            messagebox.showinfo(texts["info"], texts["load_data_first"])
+            return
+        if any(map(is_export_key, self.scheduler.running_keys())):
+            messagebox.showinfo(texts["info"], texts["export_running"])
+            return
+        options = self.ask_export_options()
+        if options is None:
+            return
+        out_dir = filedialog.askdirectory(mustexist=False)
+        if not out_dir:
+            return
+        df = self.df
+        rows = self.filter_set.rows() if options["filtered"] and self.filter_set is not None else None
+        colors = {"scatter": self.scatter_color, "box": self.boxplot_color, "histogram": self.histogram_color}
+        batch = timed_import("batch")
+
+        def compute():
+            with span("export.plots", formats=",".join(options["formats"])):
+                return batch.export_plots(df, out_dir, rows=rows, formats=options["formats"], colors=colors)
+
+        def apply(result):
+            entries, index_path = result
+            errors = [entry for entry in entries if "error" in entry]
+            if errors:
+                messagebox.showerror("Error", "\n".join(f"{entry['column']}: {entry['error']}" for entry in errors))
+            plots = sum(len(batch.PLOT_KINDS) for entry in entries if "error" not in entry)
+            columns = len({entry["column"] for entry in entries})
+            messagebox.showinfo(texts["info"], texts["export_done"].format(count=plots, columns=columns, path=index_path))
+
+        self.scheduler.submit((self.notebook.select(), "export"), compute, apply,
+                              on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    def ask_export_options(self):
+        texts = self.translations[self.current_language]
+        dialog = Toplevel(self.master)
+        dialog.title(texts["export_options"])
+        dialog.transient(self.master)
+
+        tk.Label(dialog, text=texts["export_formats"]).pack(anchor=tk.W, padx=5)
+        formats = {"png": tk.BooleanVar(dialog, value=True), "svg": tk.BooleanVar(dialog, value=False)}
+        for file_format, variable in formats.items():
+            tk.Checkbutton(dialog, text=file_format.upper(), variable=variable).pack(anchor=tk.W, padx=5)
+        # Отфильтрованный вариант имеет смысл, только если на вкладке 2 заданы фильтры
+        has_filters = self.filter_set is not None and bool(self.filter_set.ranges)
+        filtered = tk.BooleanVar(dialog, value=has_filters)
+        tk.Checkbutton(dialog, text=texts["export_filtered"], variable=filtered,
+                       state=tk.NORMAL if has_filters else tk.DISABLED).pack(anchor=tk.W, padx=5)
+
+        result = {}
+
+        def on_ok():
+            selected = tuple(file_format for file_format, variable in formats.items() if variable.get())
+            if not selected:
+                messagebox.showerror("Error", texts["export_no_format"], parent=dialog)
+                return
+            result.update(formats=selected, filtered=filtered.get())
+            dialog.destroy()
+
+        buttons = tk.Frame(dialog)
+        buttons.pack(fill="x", padx=5, pady=5)
+        tk.Button(buttons, text=texts["cancel_load"], command=dialog.destroy).pack(side=tk.RIGHT)
+        tk.Button(buttons, text=texts["ok"], command=on_ok).pack(side=tk.RIGHT)
+
+        dialog.grab_set()
+        self.master.wait_window(dialog)
+        return result or None
 
     def open_scatter_plot(self):
         if self.df is None or self.selected_column is None:
             messagebox.showinfo(self.translations[self.current_language]["info"], self.translations[self.current_language]["load_data_first"])
             return
 
-        data = self.df[self.selected_column].dropna()
+        df, column, dataset_id, mode = self.df, self.selected_column, self.dataset_id, self.scatter_mode.get()
+        # Точки готовятся в фоновом потоке под размер осей окна, окно появляется, когда они готовы.
+        # Размер берётся у такой же фигуры без pyplot: устаревший запрос не оставит открытой фигуры
+        probe = Figure(figsize=SCATTER_WINDOW_SIZE).subplots()
+        size = (int(probe.bbox.width), int(probe.bbox.height))
+
+        def compute():
+            data = df[column].dropna()
+            return data, self.scatter_data(column, None, data, size, mode, dataset_id)
+
+        def apply(result):
+            data, (drawn, points) = result
+            self.show_scatter_window(column, data, drawn, points)
+
+        self.scheduler.submit((str(self.tab1), "scatter_window"), compute, apply)
 
+    def show_scatter_window(self, column, data, drawn, points):
         # Создаем новое окно
         new_window = Toplevel(self.master)
         new_window.title(self.translations[self.current_language]["scatter_plot"])
 
         # Создаем новую фигуру и оси
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.scatterplot(x=data.index, y=data.values, color=self.scatter_color, ax=ax)  # Use seaborn
-        ax.set_title(f"{self.translations[self.current_language]['scatter_plot']} ({self.selected_column})")
+        with span("plot.scatter_window", column=str(column)):
+            fig, ax = plt.subplots(figsize=SCATTER_WINDOW_SIZE)
+            self.draw_scatter(ax, drawn, points)
+        if drawn == "density":
+            self.add_density_refresh(ax, data.index.to_numpy(), data.to_numpy())
+        elif drawn == "decimated":
+            self.add_lod_refresh(ax, data.index.to_numpy(), data.to_numpy())
+        ax.set_title(f"{self.translations[self.current_language]['scatter_plot']} ({column})")
         ax.set_xlabel("Index")
         ax.set_ylabel("Value")
 
@@ -493,7 +1237,8 @@ class DataAnalyzerApp:
         toolbar.update()
         toolbar.pack(side=tk.LEFT, fill=tk.Y)
 
-        canvas.draw()
+        with span("draw.window"):
+            canvas.draw()
 
         # Добавляем возможность перетаскивания графика
         self.add_pan_and_zoom(canvas, ax)
@@ -503,16 +1248,29 @@ class DataAnalyzerApp:
             messagebox.showinfo(self.translations[self.current_language]["info"], self.translations[self.current_language]["load_data_first"])
             return
 
-        data = self.df[self.selected_column].dropna()
+        df, column, dataset_id = self.df, self.selected_column, self.dataset_id
+
+        def compute():
+            return self.column_box_summary(column, None, df[column].dropna(), dataset_id)
+
+        self.scheduler.submit((str(self.tab1), "box_window"), compute,
+                              lambda summary: self.show_box_window(column, summary) if summary is not None else None)
 
+    def show_box_window(self, column, summary):
         # Создаем новое окно
         new_window = Toplevel(self.master)
         new_window.title(self.translations[self.current_language]["box_plot"])
 
-        # Создаем новую фигуру и оси
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.boxplot(y=data.values, color=self.boxplot_color, ax=ax)  # Use seaborn
-        ax.set_title(f"{self.translations[self.current_language]['box_plot']} ({self.selected_column})")
+        # Создаем новую фигуру и оси: ящик рисуется из готовой сводки, без сырых данных
+        with span("plot.box_window", column=str(column)):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            ax.bxp([summary], widths=0.5, patch_artist=True, showfliers=True,
+                   boxprops={"facecolor": self.boxplot_color, "edgecolor": ".25"},
+                   medianprops={"color": ".25"}, whiskerprops={"color": ".25"}, capprops={"color": ".25"},
+                   flierprops={"marker": "d", "markerfacecolor": ".25", "markeredgecolor": ".25", "markersize": 5})
+        ax.set_xticks([])
+        ax.text(0.98, 0.95, self.flier_label(summary), transform=ax.transAxes, ha="right", va="top", fontsize=8)
+        ax.set_title(f"{self.translations[self.current_language]['box_plot']} ({column})")
         ax.set_ylabel("Value")
 
         # Создаем canvas для отображения графика в окне
@@ -524,11 +1282,41 @@ class DataAnalyzerApp:
         toolbar.update()
         toolbar.pack(side=tk.LEFT, fill=tk.Y)
 
-        canvas.draw()
+        with span("draw.window"):
+            canvas.draw()
 
         # Добавляем возможность перетаскивания графика
         self.add_pan_and_zoom(canvas, ax)
 
+    def add_lod_refresh(self, ax, x, y):
+        # При масштабировании видимый участок прореживается заново из исходных данных
+        def on_xlim_changed(ax):
+            low, high = ax.get_xlim()
+            start, stop = np.searchsorted(x, [low, high])
+            visible_x, visible_y = decimate_minmax(x[max(start - 1, 0):stop + 1], y[max(start - 1, 0):stop + 1],
+                                                   ax.bbox.width, ax.bbox.height)
+            ax.collections[0].set_offsets(np.column_stack([visible_x, visible_y]))
+
+        ax.callbacks.connect("xlim_changed", on_xlim_changed)
+
+    def add_density_refresh(self, ax, x, y):
+        # При масштабировании сетка плотности пересчитывается для видимой области
+        def on_limits_changed(ax):
+            x0, x1 = sorted(ax.get_xlim())
+            y0, y1 = sorted(ax.get_ylim())
+            start, stop = np.searchsorted(x, [x0, x1])
+            counts, extent = density_grid(x[start:stop + 1], y[start:stop + 1], ax.bbox.width, ax.bbox.height,
+                                          extent=(x0, x1, y0, y1))
+            image = ax.images[0]
+            image.set_data(np.ma.masked_equal(counts, 0))
+            image.set_extent(extent)
+            image.norm.vmax = max(int(counts.max()), 2)
+
+        # Иначе set_extent сам меняет пределы осей и снова вызывает обработчик
+        ax.set_autoscale_on(False)
+        ax.callbacks.connect("xlim_changed", on_limits_changed)
+        ax.callbacks.connect("ylim_changed", on_limits_changed)
+
     def add_pan_and_zoom(self, canvas, ax):
         def on_press(event):
             if event.inaxes == ax:
@@ -550,48 +1338,515 @@ class DataAnalyzerApp:
         try:
             min_value = float(self.min_value_entry.get())
             max_value = float(self.max_value_entry.get())
+            # float() принимает "nan" и "inf", но границей фильтра они быть не могут
+            if not (np.isfinite(min_value) and np.isfinite(max_value)):
+                raise ValueError
         except ValueError:
             messagebox.showerror("Error", "Invalid min or max value.")
             return
 
         selected_column = self.column_var_tab2.get()
-        if selected_column not in self.df.columns:
+        if self.df is None or selected_column not in self.df.columns:
             messagebox.showerror("Error", "Select a column first.")
             return
 
-        # Apply the filter
-        self.filtered_df = self.df[(self.df[selected_column] >= min_value) & (self.df[selected_column] <= max_value)]
-        self.update_plots_and_stats_tab2()
+        # Диапазон добавляется к набору или заменяет прежний для этого столбца;
+        # пересчитывается только маска этого столбца
+        def apply_range():
+            self.filter_set.set_range(selected_column, min_value, max_value)
+            self.on_filters_changed()
+        self.with_sorted_indexes([selected_column], apply_range)
+
+    def remove_filter(self):
+        selection = self.filter_listbox.curselection()
+        if self.filter_set is None or not selection:
+            return
+        self.filter_set.remove(list(self.filter_set.ranges)[selection[0]])
+        self.on_filters_changed()
+
+    def clear_filters(self):
+        if self.filter_set is None or not self.filter_set.ranges:
+            return
+        self.filter_set.clear()
+        self.on_filters_changed()
+
+    def on_filters_changed(self):
+        # Сводки для прежнего набора фильтров больше не понадобятся
+        filter_key = self.filter_set.key()
+        if self.filter_key is not None and self.filter_key != filter_key:
+            self.summary_cache.invalidate(self.dataset_id, self.filter_key)
+        self.filter_key = filter_key
+        self.update_filter_list()
+        self.mark_dirty(self.tab2)
+        self.mark_dirty(self.tab4)
+
+    def update_filter_list(self):
+        self.filter_listbox.delete(0, tk.END)
+        for column, (low, high) in self.filter_set.ranges.items():
+            self.filter_listbox.insert(tk.END, f"{column}: [{low:g}, {high:g}]")
+
+    def on_filter_selected(self, event):
+        selection = self.filter_listbox.curselection()
+        if self.filter_set is None or not selection:
+            return
+        column = list(self.filter_set.ranges)[selection[0]]
+        low, high = self.filter_set.ranges[column]
+        self.column_var_tab2.set(column)
+        self.min_value_entry.delete(0, tk.END)
+        self.min_value_entry.insert(0, f"{low:g}")
+        self.max_value_entry.delete(0, tk.END)
+        self.max_value_entry.insert(0, f"{high:g}")
+
+    def outlier_bounds(self, df, method, dataset_id):
+        # Границы считаются по всему набору (без фильтров), один раз на метод; вызывается в фоновом потоке
+        return self.summary_cache.get((dataset_id, None, None, ("outliers", method)),
+                                      lambda: detect_outliers(df, method))
+
+    def open_outlier_detection(self):
+        if self.df is None:
+            messagebox.showinfo(self.translations[self.current_language]["info"], self.translations[self.current_language]["load_data_first"])
+            return
+        texts = self.translations[self.current_language]
+
+        new_window = Toplevel(self.master)
+        new_window.title(texts["detect_outliers"])
+
+        controls = tk.Frame(new_window)
+        controls.pack(side=tk.TOP, fill=tk.X)
+        tk.Label(controls, text=texts["method"]).pack(side=tk.LEFT)
+        method_names = [texts[f"method_{method}"] for method in OUTLIER_METHODS]
+        method_var = tk.StringVar(new_window, value=method_names[0])
+        method_box = ttk.Combobox(controls, textvariable=method_var, values=method_names, state="readonly", width=32)
+        method_box.pack(side=tk.LEFT)
+
+        table_columns = ("column", "lower_bound", "upper_bound", "outliers", "outliers_percent")
+        table = ttk.Treeview(new_window, columns=table_columns, show="headings", selectmode="extended", height=15)
+        for name in table_columns:
+            table.heading(name, text=texts[name])
+            table.column(name, width=140 if name == "column" else 110, anchor=tk.W if name == "column" else tk.E)
+        scrollbar = ttk.Scrollbar(new_window, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+
+        footer = tk.Frame(new_window)
+        footer.pack(side=tk.BOTTOM, fill=tk.X)
+        note_label = tk.Label(footer, text="", anchor=tk.W)
+        note_label.pack(side=tk.TOP, fill=tk.X)
+        tk.Label(footer, text=texts["apply_bounds_hint"], anchor=tk.W).pack(side=tk.LEFT)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        results = {}
+        df, dataset_id = self.df, self.dataset_id
+        self.add_busy_label(str(new_window), table)
+
+        def on_method_changed(event=None):
+            if self.dataset_id != dataset_id:
+                return
+            method = OUTLIER_METHODS[method_names.index(method_var.get())]
+            self.scheduler.submit(str(new_window), lambda: self.outlier_bounds(df, method, dataset_id), show_rows)
+
+        def show_rows(rows):
+            if not new_window.winfo_exists():
+                return
+            table.delete(*table.get_children())
+            results.clear()
+            for result in rows:
+                percent = 100.0 * result["outliers"] / result["count"] if result["count"] else 0.0
+                item = table.insert("", tk.END, values=(result["column"], f"{result['low']:g}", f"{result['high']:g}",
+                                                        result["outliers"], f"{percent:.2f}"))
+                results[item] = result
+            approximate = any(result["approximate"] for result in rows)
+            note_label.config(text=texts["bounds_sampled"].format(rows=OUTLIER_SAMPLE_ROWS) if approximate else "")
+
+        def apply_bounds():
+            items = table.selection() or [item for item, result in results.items() if result["outliers"]]
+            if not items or self.dataset_id != dataset_id:
+                return
+            # Все границы добавляются в набор фильтров, а перерисовка - одна на всё
+            bounds = [results[item] for item in items if np.isfinite(results[item]["low"]) and np.isfinite(results[item]["high"])]
+
+            def apply_ranges():
+                for result in bounds:
+                    self.filter_set.set_range(result["column"], result["low"], result["high"])
+                self.on_filters_changed()
+            self.with_sorted_indexes([result["column"] for result in bounds], apply_ranges)
+
+        tk.Button(footer, text=texts["apply_bounds"], command=apply_bounds).pack(side=tk.RIGHT)
+        method_box.bind("<<ComboboxSelected>>", on_method_changed)
+        on_method_changed()
+
+    def with_sorted_indexes(self, columns, callback):
+        # Индекс для первого фильтра по столбцу (argsort всего столбца) строится в фоновом
+        # потоке; callback вызывается в главном, когда индексы всех столбцов готовы
+        missing = [column for column in columns if column not in self.sorted_indexes]
+        if not missing:
+            callback()
+            return
+        df = self.df
+
+        def compute():
+            with span("filter.index", columns=len(missing)):
+                return {column: SortedIndex(numeric_array(df[column])) for column in missing}
+
+        def apply(indexes):
+            self.sorted_indexes.update(indexes)
+            callback()
+
+        self.scheduler.submit((str(self.tab2), "index", tuple(missing)), compute, apply,
+                              on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    def add_busy_label(self, key, parent):
+        # Индикатор занятости поверх панели: виден, пока у её задач есть расчёт в работе
+        label = tk.Label(parent, text=self.translations[self.current_language]["computing"], bg="#fff3c4")
+        self.busy_labels[key] = label
+        label.bind("<Destroy>", lambda event: self.busy_labels.pop(key, None) if self.busy_labels.get(key) is label else None)
+        return label
+
+    def on_busy_changed(self, key, busy):
+        # Ключ задачи - имя панели или кортеж, начинающийся с него
+        name = key if isinstance(key, str) else key[0]
+        label = self.busy_labels.get(name)
+        if label is None:
+            return
+        if any((running if isinstance(running, str) else running[0]) == name for running in self.scheduler.running_keys()):
+            label.place(relx=1.0, rely=0.0, anchor="ne")
+            label.lift()
+        else:
+            label.place_forget()
+
+    def sorted_index(self, column):
+        if column not in self.sorted_indexes:
+            self.sorted_indexes[column] = SortedIndex(numeric_array(self.df[column]))
+        return self.sorted_indexes[column]
+
+    def filtered_column(self, column):
+        # Значения столбца в строках, прошедших фильтр вкладки 2
+        series = self.df[column]
+        rows = self.filter_set.rows() if self.filter_set is not None else None
+        if rows is not None:
+            series = series.iloc[rows]
+        return series.dropna()
+
+    def column_statistics(self, column, filter_key, data, dataset_id=None):
+        # Все показатели считаются одним проходом в stats_engine и кэшируются.
+        # Из фонового потока dataset_id передаётся явно: набор мог смениться за время расчёта
+        def compute():
+            try:
+                with span("statistics", column=str(column)):
+                    return compute_statistics(column_values(data))
+            except (TypeError, ValueError):
+                return {}  # Нечисловой столбец
+        dataset_id = self.dataset_id if dataset_id is None else dataset_id
+        return self.summary_cache.get((dataset_id, column, filter_key, "stats"), compute)
+
+    def show_statistics(self, texts, stats):
+        # Значения, полученные из эскизов потокового режима, помечаются знаком ≈
+        approximate = stats.get("approximate", ())
+        for key, text in texts.items():
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, ("\u2248 " if key in approximate else "") + str(stats.get(key, "N/A")))
+
+    def scatter_points(self, column, filter_key, data, size, mode, dataset_id=None):
+        # Точки для графика расхождений: большие наборы прореживаются до разрешения осей (size в пикселях)
+        x = data.index.to_numpy()
+        y = data.to_numpy()
+        if mode == "exact" or len(y) <= EXACT_POINT_LIMIT or y.dtype.kind not in "iufb":
+            return x, y
+        width, height = size
+
+        def compute():
+            with span("plot.decimate", column=str(column), points=len(y)):
+                return decimate_minmax(x, y, width, height)
+        dataset_id = self.dataset_id if dataset_id is None else dataset_id
+        return self.summary_cache.get((dataset_id, column, filter_key, ("scatter", width, height)), compute)
+
+    def density_counts(self, size, column, filter_key, data, dataset_id=None):
+        width, height = size
+
+        def compute():
+            with span("plot.density", column=str(column), points=len(data)):
+                return density_grid(data.index.to_numpy(), data.to_numpy(), width, height)
+        dataset_id = self.dataset_id if dataset_id is None else dataset_id
+        return self.summary_cache.get((dataset_id, column, filter_key, ("density", width, height)), compute)
+
+    def column_box_summary(self, column, filter_key, data, dataset_id=None):
+        # Сводка ящика с усами считается вместе со статистикой и делит с ней кэш
+        return self.column_statistics(column, filter_key, data, dataset_id).get("box")
+
+    def flier_label(self, summary):
+        if summary is None or not summary["flier_count"]:
+            return ""
+        if len(summary["fliers"]) < summary["flier_count"]:
+            return self.translations[self.current_language]["outliers_sampled"].format(
+                shown=len(summary["fliers"]), count=summary["flier_count"])
+        return self.translations[self.current_language]["outliers_count"].format(count=summary["flier_count"])
+
+    def scatter_data(self, column, filter_key, data, size, mode, dataset_id=None):
+        # Фоновый поток: точки или плотность для окна графика расхождений.
+        # Возвращает ("density" | "decimated" | "exact", данные для draw_scatter)
+        y = data.to_numpy()
+        if mode == "density" and y.dtype.kind in "iufb" and len(y):
+            return "density", self.density_counts(size, column, filter_key, data, dataset_id)
+        x, y = self.scatter_points(column, filter_key, data, size, mode, dataset_id)
+        return ("decimated" if len(y) < len(data) else "exact"), (x, y)
+
+    def draw_scatter(self, ax, drawn, points):
+        # Главный поток: рисует подготовленные scatter_data точки или плотность
+        if drawn == "density":
+            draw_density(ax, *points, self.scatter_color)
+            return
+        x, y = points
+        with span("plot.seaborn_scatter", points=len(y)):
+            timed_import("seaborn").scatterplot(x=x, y=y, color=self.scatter_color, ax=ax)  # Use seaborn
+
+    def plot_options(self, panel):
+        # Снимок настроек для фонового потока: переменные Tk и оси читаются только в главном
+        return {"scatter": self.scatter_visible.get(), "box": self.boxplot_visible.get(), "mode": self.scatter_mode.get(),
+                "size": (int(panel.ax_scatter.bbox.width), int(panel.ax_scatter.bbox.height))}
+
+    def panel_data(self, column, filter_key, data, options, dataset_id):
+        # Фоновый поток: статистика и точки (или плотность) встроенной панели
+        result = {"stats": self.column_statistics(column, filter_key, data, dataset_id), "scatter": None, "density": None}
+        numeric = data.to_numpy().dtype.kind in "iufb"
+        if options["scatter"] and numeric:
+            if options["mode"] == "density" and len(data):
+                result["density"] = self.density_counts(options["size"], column, filter_key, data, dataset_id)
+            else:
+                result["scatter"] = self.scatter_points(column, filter_key, data, options["size"], options["mode"], dataset_id)
+        return result
+
+    def refresh_plot_panel(self, panel, column, filter_key, options, result):
+        # Главный поток: обновляет уже созданные артисты встроенных графиков, оси не пересоздаются
+        with span("plot.panel", column=str(column)):
+            relayout = panel.set_axes_visible(options["scatter"], options["box"])
+            if panel.data_key != (column, filter_key):
+                panel.data_key = (column, filter_key)
+                relayout = True
+            if options["scatter"]:
+                if result["density"] is not None:
+                    panel.set_scatter_density(*result["density"], self.scatter_color)
+                elif result["scatter"] is not None:
+                    panel.set_scatter_points(*result["scatter"])
+                else:
+                    panel.set_scatter_points([], [])
+            if options["box"]:
+                panel.set_box(result["stats"].get("box"))
+            panel.set_colors(self.scatter_color, self.boxplot_color)
+            self.set_panel_titles(panel)
+            panel.redraw(relayout=relayout)
+
+    def submit_panel_update(self, tab, panel, texts, column, filter_key, select_data):
+        # Тяжёлая часть (выборка строк, статистика, прореживание) - в фоновом потоке;
+        # результат применяется, только если за это время не пришёл более новый запрос
+        options = self.plot_options(panel)
+        dataset_id = self.dataset_id
+
+        def compute():
+            return self.panel_data(column, filter_key, select_data(), options, dataset_id)
+
+        def apply(result):
+            self.show_statistics(texts, result["stats"])
+            self.refresh_plot_panel(panel, column, filter_key, options, result)
+
+        self.scheduler.submit(str(tab), compute, apply)
+
+    def set_panel_titles(self, panel):
+        if panel.data_key is None:
+            return
+        column = panel.data_key[0]
+        panel.set_titles(f"{self.translations[self.current_language]['scatter_plot']} ({column})",
+                         f"{self.translations[self.current_language]['box_plot']} ({column})",
+                         self.flier_label(panel.box_summary))
+
+    def restyle_plot_panels(self):
+        # Смена цвета: без пересчёта данных, только перерисовка артистов поверх фона.
+        # Скрытая вкладка перерисуется, когда её откроют.
+        visible = self.notebook.select()
+        for tab, panel in self.tab_panels.items():
+            panel.set_colors(self.scatter_color, self.boxplot_color)
+            if tab == visible:
+                panel.blit()
+            else:
+                self.mark_dirty(tab, "style")
+
+    def mark_dirty(self, tab, level="data"):
+        # Вкладка запоминает, что её нужно обновить; считается только видимая вкладка
+        tab = str(tab)
+        if self.dirty_tabs.get(tab) != "data":
+            self.dirty_tabs[tab] = level
+        if tab == self.notebook.select():
+            # Всплеск изменений (прокрутка списка столбцов, серия флажков) объединяется
+            # в одно обновление; смена оформления не ждёт окна склейки
+            self.scheduler.debounce("refresh", self.refresh_visible_tab, 0 if level == "style" else None)
+
+    def refresh_visible_tab(self):
+        tab = self.notebook.select()
+        level = self.dirty_tabs.pop(tab, None)
+        if level is None:
+            return
+        # Одно обновление вкладки - одно действие для панели диагностики. Тяжёлая часть
+        # уходит в планировщик, поэтому cProfile достаётся его интервалу "compute"
+        with span("refresh_tab", profile=False, tab=self.notebook.tab(tab, "text"), level=level):
+            if level == "data":
+                if tab == str(self.tab1):
+                    self.update_plots_and_stats()
+                elif tab == str(self.tab2):
+                    self.update_plots_and_stats_tab2()
+                elif tab == str(self.tab3):
+                    self.start_overview()
+                elif tab == str(self.tab4):
+                    self.update_correlation()
+            elif tab == str(self.tab4):
+                self.restyle_correlation()
+            elif tab in self.tab_panels:
+                panel = self.tab_panels[tab]
+                panel.set_colors(self.scatter_color, self.boxplot_color)
+                self.set_panel_titles(panel)
+                panel.redraw()
+
+    def cancel_overview(self):
+        if self.overview_runner is not None:
+            self.overview_runner.cancel()
+            self.overview_runner = None
+
+    def start_overview(self):
+        # Столбцы, уже посчитанные для других вкладок, берутся из кэша сводок,
+        # остальные считаются в пуле потоков и появляются в таблице по мере готовности
+        self.cancel_overview()
+        self.overview_tree.delete(*self.overview_tree.get_children())
+        self.overview_rows = {}
+        if self.df is None:
+            if self.streamed_stats is not None:
+                self.overview_total = len(self.streamed_stats)
+                for column, stats in self.streamed_stats.items():
+                    self.add_overview_row(column, stats)
+                self.update_overview_status()
+            return
+        columns = numeric_columns(self.df)
+        pending = []
+        for column in columns:
+            stats = self.summary_cache.peek((self.dataset_id, column, None, "stats"))
+            if stats is None:
+                pending.append(column)
+            else:
+                self.add_overview_row(column, stats)
+        self.overview_total = len(columns)
+        self.update_overview_status()
+        if pending:
+            self.overview_runner = ColumnStatisticsRunner(self.df, pending)
+            self.overview_runner.start()
+            self.master.after(50, self.poll_overview, self.overview_runner)
+
+    def poll_overview(self, runner):
+        # Расчёт, отменённый загрузкой новых данных, больше не опрашиваем
+        if runner is not self.overview_runner:
+            return
+        try:
+            while True:
+                message = runner.messages.get_nowait()
+                if message[0] == "column":
+                    _, column, stats = message
+                    self.summary_cache.put((self.dataset_id, column, None, "stats"), stats)
+                    self.add_overview_row(column, stats)
+                else:
+                    self.add_overview_row(message[1], {})
+        except queue.Empty:
+            pass
+        self.update_overview_status()
+        if len(self.overview_rows) < self.overview_total:
+            self.master.after(50, self.poll_overview, runner)
+        else:
+            self.overview_runner = None
+
+    def add_overview_row(self, column, stats):
+        row = dict(stats)
+        approximate = set(row.get("approximate", ()))
+        if "box" in row:
+            row["outliers"] = row["box"]["flier_count"] if row["box"] is not None else 0
+            if "box" in approximate:
+                approximate.add("outliers")
+        values = [column] + [("\u2248 " if key in approximate else "") + format_statistic(row.get(key, "N/A"))
+                             for key in OVERVIEW_STATISTICS]
+        item = self.overview_tree.insert("", tk.END, values=values)
+        self.overview_rows[item] = dict(row, column=column)
+        if self.overview_sort[0] is not None:
+            self.sort_overview(self.overview_sort[0], toggle=False)
+
+    def update_overview_status(self):
+        done, total = len(self.overview_rows), self.overview_total
+        key = "overview_progress" if done < total else "overview_done"
+        self.overview_status_label.config(text=self.translations[self.current_language][key].format(done=done, total=total))
+
+    def sort_overview(self, name, toggle=True):
+        # Числа сортируются по значению, текст ("N/A ...") всегда в конце
+        descending = self.overview_sort[1]
+        if toggle:
+            descending = not descending if self.overview_sort[0] == name else False
+        self.overview_sort = (name, descending)
+
+        def sort_key(item):
+            value = self.overview_rows[item].get(name)
+            if name == "column":
+                return (0, str(value))
+            if isinstance(value, (int, float, np.number)) and not np.isnan(value):
+                return (0, value if not descending else -value)
+            return (1, 0)
+
+        items = sorted(self.overview_tree.get_children(), key=sort_key, reverse=descending and name == "column")
+        for index, item in enumerate(items):
+            self.overview_tree.move(item, "", index)
+
+    def update_overview_headings(self):
+        texts = self.translations[self.current_language]
+        for name in ("column",) + OVERVIEW_STATISTICS:
+            self.overview_tree.heading(name, text=texts[name].rstrip(":"))
+
+    def on_column_changed(self, *args):
+        self.selected_column = self.column_var.get()
+        self.mark_dirty(self.tab1)
+
+    def on_column_changed_tab2(self, *args):
+        self.mark_dirty(self.tab2)
+
+    def on_plot_options_changed(self):
+        # Флажки и режим отрисовки общие для обеих вкладок
+        self.mark_dirty(self.tab1)
+        self.mark_dirty(self.tab2)
 
     def update_plots_and_stats(self, *args):
         if self.df is None:
+            if self.streamed_stats is not None:
+                self.update_streamed_stats()
             return
 
         self.selected_column = self.column_var.get()
         if self.selected_column not in self.df.columns:
             return
 
-        data = self.df[self.selected_column].dropna()
+        df, column = self.df, self.selected_column
+        self.submit_panel_update(self.tab1, self.plot_panel, self.stat_texts, column, None, lambda: df[column].dropna())
 
-        # График расхождений
-        self.ax_scatter.clear()
-        if self.scatter_visible.get():
-            sns.scatterplot(x=data.index, y=data.values, color=self.scatter_color, ax=self.ax_scatter)  # Use seaborn
-            self.ax_scatter.set_title(f"{self.translations[self.current_language]['scatter_plot']} ({self.selected_column})")
-            self.ax_scatter.set_xlabel("Index")
-            self.ax_scatter.set_ylabel("Value")
-        self.ax_scatter.set_visible(self.scatter_visible.get())
-
-        # Ящик с усами
-        self.ax_boxplot.clear()
+    def update_streamed_stats(self):
+        column = self.column_var.get()
+        stats = self.streamed_stats.get(column)
+        if stats is None:
+            return
+        self.selected_column = column
+        self.show_statistics(self.stat_texts, stats)
+        self.approximate_label.config(text=self.translations[self.current_language]["approximate_note"] if stats["approximate"] else "")
+
+        # Без строк график расхождений пуст; ящик с усами - из сводки эскиза
+        panel = self.plot_panel
+        relayout = panel.set_axes_visible(self.scatter_visible.get(), self.boxplot_visible.get())
+        if panel.data_key != (column, "streamed"):
+            panel.data_key = (column, "streamed")
+            relayout = True
+        panel.set_scatter_points([], [])
         if self.boxplot_visible.get():
-            sns.boxplot(y=data.values, color=self.boxplot_color, ax=self.ax_boxplot)  # Use seaborn
-            self.ax_boxplot.set_title(f"{self.translations[self.current_language]['box_plot']} ({self.selected_column})")
-            self.ax_boxplot.set_ylabel("Value")
-        self.ax_boxplot.set_visible(self.boxplot_visible.get())
-
-        self.fig.tight_layout()
-        self.canvas.draw()
+            panel.set_box(stats["box"])
+        panel.set_colors(self.scatter_color, self.boxplot_color)
+        self.set_panel_titles(panel)
+        panel.redraw(relayout=relayout)
 
     def update_plots_and_stats_tab2(self, *args):
         if self.df is None:
@@ -601,92 +1856,13 @@ class DataAnalyzerApp:
         if selected_column not in self.df.columns:
             return
 
-        if self.filtered_df is None:
-            data = self.df[selected_column].dropna()
-        else:
-            data = self.filtered_df[selected_column].dropna()
-
-        # Calculate statistics
-        mean_val = data.mean()
-        variance_val = data.var()
-        range_val = data.max() - data.min()
-        max_val = data.max()
-        min_val = data.min()
-
-        try:
-            geometric_mean_val = gmean(data)
-        except ValueError:
-            geometric_mean_val = "N/A (negative values)"
-        try:
-            harmonic_mean_val = hmean(data)
-        except ValueError:
-            harmonic_mean_val = "N/A (zero values)"
-            
-        try:
-            quadratic_mean_val = np.sqrt(np.mean(data**2))
-        except ValueError:
-            quadratic_mean_val = "N/A"
-
-        median_val = data.median()
-        std_dev_val = data.std()
-        try:
-            mode_val = statistics.mode(data)
-        except statistics.StatisticsError:
-            mode_val = "N/A (no unique mode)"
-
-        # Update text fields with statistics
-        self.mean_text_tab2.delete("1.0", tk.END)
-        self.mean_text_tab2.insert(tk.END, str(mean_val))
-
-        self.variance_text_tab2.delete("1.0", tk.END)
-        self.variance_text_tab2.insert(tk.END, str(variance_val))
+        # Строки фильтра берутся в главном потоке: FilterSet меняется только здесь
+        series = self.df[selected_column]
+        rows = self.filter_set.rows()
 
-        self.range_text_tab2.delete("1.0", tk.END)
-        self.range_text_tab2.insert(tk.END, str(range_val))
-
-        self.max_text_tab2.delete("1.0", tk.END)
-        self.max_text_tab2.insert(tk.END, str(max_val))
-
-        self.min_text_tab2.delete("1.0", tk.END)
-        self.min_text_tab2.insert(tk.END, str(min_val))
-
-        self.geometric_mean_text_tab2.delete("1.0", tk.END)
-        self.geometric_mean_text_tab2.insert(tk.END, str(geometric_mean_val))
-
-        self.harmonic_mean_text_tab2.delete("1.0", tk.END)
-        self.harmonic_mean_text_tab2.insert(tk.END, str(harmonic_mean_val))
-        
-        self.quadratic_mean_text_tab2.delete("1.0", tk.END)
-        self.quadratic_mean_text_tab2.insert(tk.END, str(quadratic_mean_val))
-
-        self.median_text_tab2.delete("1.0", tk.END)
-        self.median_text_tab2.insert(tk.END, str(median_val))
-
-        self.std_dev_text_tab2.delete("1.0", tk.END)
-        self.std_dev_text_tab2.insert(tk.END, str(std_dev_val))
-
-        self.mode_text_tab2.delete("1.0", tk.END)
-        self.mode_text_tab2.insert(tk.END, str(mode_val))
-
-        # График расхождений
-        self.ax_scatter_tab2.clear()
-        if self.scatter_visible.get():
-            sns.scatterplot(x=data.index, y=data.values, color=self.scatter_color, ax=self.ax_scatter_tab2)  # Use seaborn
-            self.ax_scatter_tab2.set_title(f"{self.translations[self.current_language]['scatter_plot']} ({selected_column})")
-            self.ax_scatter_tab2.set_xlabel("Index")
-            self.ax_scatter_tab2.set_ylabel("Value")
-        self.ax_scatter_tab2.set_visible(self.scatter_visible.get())
-
-        # Ящик с усами
-        self.ax_boxplot_tab2.clear()
-        if self.boxplot_visible.get():
-            sns.boxplot(y=data.values, color=self.boxplot_color, ax=self.ax_boxplot_tab2)  # Use seaborn
-            self.ax_boxplot_tab2.set_title(f"{self.translations[self.current_language]['box_plot']} ({selected_column})")
-            self.ax_boxplot_tab2.set_ylabel("Value")
-        self.ax_boxplot_tab2.set_visible(self.boxplot_visible.get())
-
-        self.fig_tab2.tight_layout()
-        self.canvas_tab2.draw()
+        def select_data():
+            return (series if rows is None else series.iloc[rows]).dropna()
+        self.submit_panel_update(self.tab2, self.plot_panel_tab2, self.stat_texts_tab2, selected_column, self.filter_key, select_data)
 
     def change_language(self, language):
         if language == self.translations[self.current_language]["russian"]:
@@ -707,135 +1883,358 @@ class DataAnalyzerApp:
         for lang in [self.translations[self.current_language]["english"], self.translations[self.current_language]["russian"]]:
             menu.add_command(label=lang, command=tk._setit(self.language_var, lang))
         self.load_data_button.config(text=self.translations[self.current_language]["load_data"])
-        self.load_data_button_tab2.config(text=self.translations[self.current_language]["load_data"])
+        self.stream_data_button.config(text=self.translations[self.current_language]["stream_data"])
+        if self.approximate_label.cget("text"):
+            self.approximate_label.config(text=self.translations[self.current_language]["approximate_note"])
+        self.clear_cache_button.config(text=self.translations[self.current_language]["clear_cache"])
         self.column_label.config(text=self.translations[self.current_language]["select_column"])
-        self.column_label_tab2.config(text=self.translations[self.current_language]["select_column"])
         self.scatter_check.config(text=self.translations[self.current_language]["scatter_plot"])
-        self.scatter_check_tab2.config(text=self.translations[self.current_language]["scatter_plot"])
         self.boxplot_check.config(text=self.translations[self.current_language]["box_plot"])
-        self.boxplot_check_tab2.config(text=self.translations[self.current_language]["box_plot"])
+        self.scatter_mode_label.config(text=self.translations[self.current_language]["scatter_rendering"])
+        self.scatter_auto_radio.config(text=self.translations[self.current_language]["render_auto"])
+        self.scatter_exact_radio.config(text=self.translations[self.current_language]["render_exact"])
+        self.scatter_density_radio.config(text=self.translations[self.current_language]["render_density"])
         self.scatter_color_button.config(text=self.translations[self.current_language]["scatter_color"])
-        self.scatter_color_button_tab2.config(text=self.translations[self.current_language]["scatter_color"])
         self.boxplot_color_button.config(text=self.translations[self.current_language]["box_color"])
-        self.boxplot_color_button_tab2.config(text=self.translations[self.current_language]["box_color"])
         self.save_scatter_button.config(text=self.translations[self.current_language]["save_scatter"])
-        self.save_scatter_button_tab2.config(text=self.translations[self.current_language]["save_scatter"])
         self.save_boxplot_button.config(text=self.translations[self.current_language]["save_box"])
-        self.save_boxplot_button_tab2.config(text=self.translations[self.current_language]["save_box"])
+        self.export_plots_button.config(text=self.translations[self.current_language]["export_plots"])
         self.open_scatter_button.config(text=self.translations[self.current_language]["open_scatter"])
-        self.open_scatter_button_tab2.config(text=self.translations[self.current_language]["open_box"])
         self.open_boxplot_button.config(text=self.translations[self.current_language]["open_box"])
-        self.open_boxplot_button_tab2.config(text=self.translations[self.current_language]["open_box"])
         self.mean_label.config(text=self.translations[self.current_language]["mean"])
-        self.mean_label_tab2.config(text=self.translations[self.current_language]["mean"])
         self.variance_label.config(text=self.translations[self.current_language]["variance"])
-        self.variance_label_tab2.config(text=self.translations[self.current_language]["variance"])
         self.range_label.config(text=self.translations[self.current_language]["range"])
-        self.range_label_tab2.config(text=self.translations[self.current_language]["range"])
         self.max_label.config(text=self.translations[self.current_language]["max"])
-        self.max_label_tab2.config(text=self.translations[self.current_language]["max"])
         self.min_label.config(text=self.translations[self.current_language]["min"])
-        self.min_label_tab2.config(text=self.translations[self.current_language]["min"])
         self.geometric_mean_label.config(text=self.translations[self.current_language]["geometric_mean"])
-        self.geometric_mean_label_tab2.config(text=self.translations[self.current_language]["geometric_mean"])
         self.harmonic_mean_label.config(text=self.translations[self.current_language]["harmonic_mean"])
-        self.harmonic_mean_label_tab2.config(text=self.translations[self.current_language]["harmonic_mean"])
         self.quadratic_mean_label.config(text=self.translations[self.current_language]["quadratic_mean"])
-        self.quadratic_mean_label_tab2.config(text=self.translations[self.current_language]["quadratic_mean"])
         self.median_label.config(text=self.translations[self.current_language]["median"])
-        self.median_label_tab2.config(text=self.translations[self.current_language]["median"])
         self.std_dev_label.config(text=self.translations[self.current_language]["std_dev"])
-        self.std_dev_label_tab2.config(text=self.translations[self.current_language]["std_dev"])
         self.mode_label.config(text=self.translations[self.current_language]["mode"])
-        self.mode_label_tab2.config(text=self.translations[self.current_language]["mode"])
         self.histogram_button.config(text=self.translations[self.current_language]["histogram"])
-        self.histogram_button_tab2.config(text=self.translations[self.current_language]["histogram"])
         self.histogram_color_button.config(text=self.translations[self.current_language]["histogram_color"])
-        self.histogram_color_button_tab2.config(text=self.translations[self.current_language]["histogram_color"])
+        self.cancel_load_button.config(text=self.translations[self.current_language]["cancel_load"])
         self.notebook.tab(0, text=self.translations[self.current_language]["tab1"])
         self.notebook.tab(1, text=self.translations[self.current_language]["tab2"])
-        self.update_plots_and_stats()
-        self.update_plots_and_stats_tab2()
-
-    def update_tab_text(self, event):
-        self.update_text()
+        self.notebook.tab(2, text=self.translations[self.current_language]["tab3"])
+        self.notebook.tab(3, text=self.translations[self.current_language]["tab4"])
+        for label in self.busy_labels.values():
+            label.config(text=self.translations[self.current_language]["computing"])
+        if self.tab_built(self.tab2):
+            self.update_text_tab2()
+        if self.tab_built(self.tab3):
+            self.update_overview_headings()
+            if self.df is not None or self.streamed_stats is not None:
+                self.update_overview_status()
+        if self.tab_built(self.tab4):
+            method = self.correlation_method()
+            names = [self.translations[self.current_language][f"method_{name}"] for name in CORRELATION_METHODS]
+            self.correlation_method_label.config(text=self.translations[self.current_language]["method"])
+            self.correlation_method_box.config(values=names)
+            self.correlation_method_var.set(names[CORRELATION_METHODS.index(method)])
+            self.mark_dirty(self.tab4, "style")
+        # Заголовки графиков зависят от языка: только перерисовка, без пересчёта
+        self.mark_dirty(self.tab1, "style")
+        self.mark_dirty(self.tab2, "style")
+
+    def update_text_tab2(self):
+        self.load_data_button_tab2.config(text=self.translations[self.current_language]["load_data"])
+        self.column_label_tab2.config(text=self.translations[self.current_language]["select_column"])
+        self.scatter_check_tab2.config(text=self.translations[self.current_language]["scatter_plot"])
+        self.boxplot_check_tab2.config(text=self.translations[self.current_language]["box_plot"])
+        self.scatter_mode_label_tab2.config(text=self.translations[self.current_language]["scatter_rendering"])
+        self.scatter_auto_radio_tab2.config(text=self.translations[self.current_language]["render_auto"])
+        self.scatter_exact_radio_tab2.config(text=self.translations[self.current_language]["render_exact"])
+        self.scatter_density_radio_tab2.config(text=self.translations[self.current_language]["render_density"])
+        self.scatter_color_button_tab2.config(text=self.translations[self.current_language]["scatter_color"])
+        self.boxplot_color_button_tab2.config(text=self.translations[self.current_language]["box_color"])
+        self.save_scatter_button_tab2.config(text=self.translations[self.current_language]["save_scatter"])
+        self.save_boxplot_button_tab2.config(text=self.translations[self.current_language]["save_box"])
+        self.export_plots_button_tab2.config(text=self.translations[self.current_language]["export_plots"])
+        self.open_scatter_button_tab2.config(text=self.translations[self.current_language]["open_box"])
+        self.open_boxplot_button_tab2.config(text=self.translations[self.current_language]["open_box"])
+        self.mean_label_tab2.config(text=self.translations[self.current_language]["mean"])
+        self.variance_label_tab2.config(text=self.translations[self.current_language]["variance"])
+        self.range_label_tab2.config(text=self.translations[self.current_language]["range"])
+        self.max_label_tab2.config(text=self.translations[self.current_language]["max"])
+        self.min_label_tab2.config(text=self.translations[self.current_language]["min"])
+        self.geometric_mean_label_tab2.config(text=self.translations[self.current_language]["geometric_mean"])
+        self.harmonic_mean_label_tab2.config(text=self.translations[self.current_language]["harmonic_mean"])
+        self.quadratic_mean_label_tab2.config(text=self.translations[self.current_language]["quadratic_mean"])
+        self.median_label_tab2.config(text=self.translations[self.current_language]["median"])
+        self.std_dev_label_tab2.config(text=self.translations[self.current_language]["std_dev"])
+        self.mode_label_tab2.config(text=self.translations[self.current_language]["mode"])
+        self.histogram_button_tab2.config(text=self.translations[self.current_language]["histogram"])
+        self.histogram_color_button_tab2.config(text=self.translations[self.current_language]["histogram_color"])
+        self.min_value_label.config(text=self.translations[self.current_language]["min_value"])
+        self.max_value_label.config(text=self.translations[self.current_language]["max_value"])
+        self.apply_filter_button.config(text=self.translations[self.current_language]["apply_filter"])
+        self.active_filters_label.config(text=self.translations[self.current_language]["active_filters"])
+        self.remove_filter_button.config(text=self.translations[self.current_language]["remove_filter"])
+        self.clear_filters_button.config(text=self.translations[self.current_language]["clear_filters"])
+        self.detect_outliers_button.config(text=self.translations[self.current_language]["detect_outliers"])
+
+    def on_tab_changed(self, event):
+        self.ensure_tab_built(self.notebook.select())
+        self.refresh_visible_tab()
 
     def plot_histogram(self):
+        if self.df is None and self.streamed_stats is not None and self.selected_column in self.streamed_stats:
+            self.open_histogram_window(self.selected_column, "streamed", None)
+            return
         if self.df is None or self.selected_column is None:
             messagebox.showinfo(self.translations[self.current_language]["info"], self.translations[self.current_language]["load_data_first"])
             return
 
         data = self.df[self.selected_column].dropna()
-
-        # Create a new window
-        new_window = Toplevel(self.master)
-        new_window.title(self.translations[self.current_language]["histogram"])
-
-        # Create a new figure and axes
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.histplot(data.values, kde=False, ax=ax, color=self.histogram_color)  # Use seaborn for histogram with color
-        ax.set_title(f"{self.translations[self.current_language]['histogram']} ({self.selected_column})")
-        ax.set_xlabel("Value")
-        ax.set_ylabel("Frequency")
-
-        # Create a canvas to display the plot in the window
-        canvas = FigureCanvasTkAgg(fig, master=new_window)
-        canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-
-        # Add navigation toolbar
-        toolbar = NavigationToolbar2Tk(canvas, new_window)
-        toolbar.update()
-        toolbar.pack(side=tk.LEFT, fill=tk.Y)
-
-        canvas.draw()
-
-        # Add pan and zoom functionality
-        self.add_pan_and_zoom(canvas, ax)
+        self.open_histogram_window(self.selected_column, None, data)
 
     def plot_histogram_tab2(self):
-        if self.df is None or self.column_var_tab2.get() is None:
+        selected_column = self.column_var_tab2.get()
+        if self.df is None or selected_column not in self.df.columns:
             messagebox.showinfo(self.translations[self.current_language]["info"], self.translations[self.current_language]["load_data_first"])
             return
 
-        selected_column = self.column_var_tab2.get()
+        data = self.filtered_column(selected_column)
+        self.open_histogram_window(selected_column, self.filter_key, data)
 
-        if self.filtered_df is None:
-            data = self.df[selected_column].dropna()
-        else:
-            data = self.filtered_df[selected_column].dropna()
+    def column_histogram(self, column, filter_key, data, bins, dataset_id=None):
+        # Частоты считаются один раз на (столбец, фильтр, правило интервалов)
+        if data is None:
+            return self.streamed_stats[column]["histogram"]  # Интервалы потокового режима фиксированы
+
+        def compute():
+            with span("plot.histogram_bins", column=str(column), bins=str(bins)):
+                return histogram(column_values(data), bins)
+        dataset_id = self.dataset_id if dataset_id is None else dataset_id
+        return self.summary_cache.get((dataset_id, column, filter_key, ("histogram", bins)), compute)
+
+    def open_histogram_window(self, column, filter_key, data):
+        # Частоты считаются в фоновом потоке; окно получает их, когда они готовы
+        dataset_id = self.dataset_id
+        self.scheduler.submit((self.notebook.select(), "histogram", column, filter_key), lambda: self.column_histogram(column, filter_key, data, "auto", dataset_id),
+                              lambda result: self.show_histogram_window(column, filter_key, data, result, dataset_id),
+                              on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    def show_histogram_window(self, column, filter_key, data, result, dataset_id):
+        counts, edges = result
 
         # Create a new window
         new_window = Toplevel(self.master)
         new_window.title(self.translations[self.current_language]["histogram"])
 
-        # Create a new figure and axes
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.histplot(data.values, kde=False, ax=ax, color=self.histogram_color)  # Use seaborn for histogram with color
-        ax.set_title(f"{self.translations[self.current_language]['histogram']} ({selected_column})")
+        # Create a new figure and axes: вся гистограмма - один артист StepPatch
+        with span("plot.histogram_window", column=str(column)):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            stairs = ax.stairs(counts, edges, fill=True, color=self.histogram_color)
+        ax.set_title(f"{self.translations[self.current_language]['histogram']} ({column})")
         ax.set_xlabel("Value")
         ax.set_ylabel("Frequency")
 
+        # Выбор числа интервалов без повторного открытия окна
+        controls = tk.Frame(new_window)
+        controls.pack(side=tk.TOP, fill=tk.X)
+        tk.Label(controls, text=self.translations[self.current_language]["bins"]).pack(side=tk.LEFT)
+        bins_var = tk.StringVar(new_window, value="auto")
+        bins_box = ttk.Combobox(controls, textvariable=bins_var, width=10,
+                                values=list(HISTOGRAM_BIN_RULES) + [10, 20, 50, 100, 200, 500])
+        bins_box.pack(side=tk.LEFT)
+        if data is None:
+            bins_box.config(state=tk.DISABLED)
+
         # Create a canvas to display the plot in the window
         canvas = FigureCanvasTkAgg(fig, master=new_window)
         canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.add_busy_label(str(new_window), canvas.get_tk_widget())
 
         # Add navigation toolbar
         toolbar = NavigationToolbar2Tk(canvas, new_window)
         toolbar.update()
         toolbar.pack(side=tk.LEFT, fill=tk.Y)
 
-        canvas.draw()
+        with span("draw.window"):
+            canvas.draw()
+
+        def on_bins_changed(event=None):
+            bins = parse_bins(bins_var.get())
+            if bins is None:
+                return
+            self.scheduler.submit(str(new_window), lambda: self.column_histogram(column, filter_key, data, bins, dataset_id), show_bins)
+
+        def show_bins(result):
+            if not new_window.winfo_exists():
+                return
+            counts, edges = result
+            stairs.set_data(counts, edges)
+            ax.set_xlim(edges[0], edges[-1])
+            ax.set_ylim(0, max(counts.max(), 1) * 1.05)
+            canvas.draw_idle()
+
+        bins_box.bind("<<ComboboxSelected>>", on_bins_changed)
+        bins_box.bind("<Return>", on_bins_changed)
+
+        window_entry = (stairs, canvas)
+        self.histogram_windows.append(window_entry)
+
+        def on_destroy(event):
+            if event.widget is new_window and window_entry in self.histogram_windows:
+                self.histogram_windows.remove(window_entry)
+
+        new_window.bind("<Destroy>", on_destroy)
 
         # Add pan and zoom functionality
         self.add_pan_and_zoom(canvas, ax)
 
     def choose_histogram_color(self):
         color_code = colorchooser.askcolor(title=self.translations[self.current_language]["histogram_color"])
-        if color_code:
+        if color_code[1]:
             self.histogram_color = color_code[1]
-            # No need to redraw the existing plot, just store the color
-            # The color will be used when a new histogram is plotted
+            # Открытые гистограммы перекрашиваются из готовых частот
+            for stairs, canvas in self.histogram_windows:
+                stairs.set_color(self.histogram_color)
+                canvas.draw_idle()
 
-root = tk.Tk()
-app = DataAnalyzerApp(root)
-root.mainloop()
+    def open_diagnostics(self, event=None):
+        # Скрытая панель: интервалы горячих участков, память, экспорт и захват cProfile
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        texts = self.translations[self.current_language]
+        new_window = Toplevel(self.master)
+        new_window.title(texts["diagnostics"])
+        self.diagnostics_window = new_window
+
+        controls = tk.Frame(new_window)
+        controls.pack(side=tk.TOP, fill=tk.X)
+        memory_label = tk.Label(controls, text="", anchor=tk.W, justify=tk.LEFT)
+        memory_label.pack(side=tk.LEFT, padx=5)
+        trace_memory = tk.BooleanVar(new_window, value=PROFILER.tracing_memory)
+        tk.Checkbutton(controls, text=texts["trace_memory"], variable=trace_memory,
+                       command=lambda: PROFILER.set_memory_tracing(trace_memory.get())).pack(side=tk.RIGHT)
+
+        summary_columns = ("span_name", "span_count", "span_total", "span_mean", "span_max")
+        summary_tree = ttk.Treeview(new_window, columns=summary_columns, show="headings", height=8)
+        for name in summary_columns:
+            summary_tree.heading(name, text=texts[name])
+            summary_tree.column(name, width=180 if name == "span_name" else 90, anchor=tk.W if name == "span_name" else tk.E)
+        summary_tree.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+
+        recent_columns = ("span_name", "span_start", "span_duration", "span_thread", "span_details")
+        recent_frame = tk.Frame(new_window)
+        recent_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5)
+        recent_tree = ttk.Treeview(recent_frame, columns=recent_columns, show="headings", height=10)
+        for name in recent_columns:
+            recent_tree.heading(name, text=texts[name])
+            recent_tree.column(name, width=260 if name == "span_details" else (180 if name == "span_name" else 90),
+                               anchor=tk.E if name in ("span_start", "span_duration") else tk.W)
+        recent_scrollbar = ttk.Scrollbar(recent_frame, orient="vertical", command=recent_tree.yview)
+        recent_tree.configure(yscrollcommand=recent_scrollbar.set)
+        recent_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        recent_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        profile_label = tk.Label(new_window, text="", anchor=tk.W)
+        profile_label.pack(side=tk.TOP, fill=tk.X, padx=5)
+        profile_text = tk.Text(new_window, height=12, wrap=tk.NONE, font=("Courier", 9))
+        profile_text.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5)
+
+        shown_profile = [None]
+
+        def refresh():
+            memory = PROFILER.memory()
+            lines = []
+            if memory["peak_rss_bytes"] is not None:
+                lines.append(texts["peak_rss"].format(size=round(memory["peak_rss_bytes"] / 2**20, 1)))
+            if "traced_peak_bytes" in memory:
+                lines.append(texts["traced_memory"].format(current=round(memory["traced_current_bytes"] / 2**20, 1),
+                                                           peak=round(memory["traced_peak_bytes"] / 2**20, 1)))
+            lines.append(texts["summary_cache_info"].format(**self.summary_cache.info()))
+            memory_label.config(text="\n".join(lines))
+
+            summary_tree.delete(*summary_tree.get_children())
+            totals = sorted(PROFILER.summary().items(), key=lambda item: item[1]["total"], reverse=True)
+            for name, entry in totals:
+                summary_tree.insert("", tk.END, values=(name, entry["count"], f"{entry['total'] * 1000:.1f}",
+                                                        f"{entry['mean'] * 1000:.2f}", f"{entry['max'] * 1000:.1f}"))
+            # Последние интервалы сверху, вложенные сдвинуты по глубине
+            recent_tree.delete(*recent_tree.get_children())
+            for item in reversed(list(PROFILER.spans)[-DIAGNOSTICS_RECENT_SPANS:]):
+                details = ", ".join(f"{key}={value}" for key, value in item.args.items())
+                recent_tree.insert("", tk.END, values=("  " * item.depth + item.name, f"{item.start:.3f}",
+                                                       f"{item.duration * 1000:.2f}", item.thread, details))
+
+            if PROFILER.profile_stats is not shown_profile[0]:
+                shown_profile[0] = PROFILER.profile_stats
+                profile_text.delete("1.0", tk.END)
+                if PROFILER.profile_stats is not None:
+                    profile_label.config(text=texts["profile_result"].format(name=PROFILER.profile_name))
+                    profile_text.insert(tk.END, PROFILER.profile_text())
+                    save_profile_button.config(state=tk.NORMAL)
+
+        def auto_refresh():
+            if new_window.winfo_exists():
+                refresh()
+                new_window.after(DIAGNOSTICS_REFRESH_MS, auto_refresh)
+
+        def clear():
+            PROFILER.clear()
+            refresh()
+
+        def export(chrome):
+            file_path = filedialog.asksaveasfilename(parent=new_window, defaultextension=".json",
+                                                     filetypes=[("JSON files", "*.json")])
+            if file_path:
+                try:
+                    PROFILER.export(file_path, chrome=chrome)
+                except OSError as e:
+                    messagebox.showerror("Error", str(e), parent=new_window)
+
+        def profile_next():
+            PROFILER.profile_next_action()
+            profile_label.config(text=texts["profile_armed"])
+            save_profile_button.config(state=tk.DISABLED)
+
+        def save_profile():
+            file_path = filedialog.asksaveasfilename(parent=new_window, defaultextension=".prof",
+                                                     filetypes=[("cProfile files", "*.prof")])
+            if file_path and PROFILER.profile_stats is not None:
+                PROFILER.profile_stats.dump_stats(file_path)
+
+        buttons = tk.Frame(new_window)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        tk.Button(buttons, text=texts["refresh"], command=refresh).pack(side=tk.LEFT)
+        tk.Button(buttons, text=texts["clear"], command=clear).pack(side=tk.LEFT)
+        tk.Button(buttons, text=texts["export_json"], command=lambda: export(False)).pack(side=tk.LEFT)
+        tk.Button(buttons, text=texts["export_trace"], command=lambda: export(True)).pack(side=tk.LEFT)
+        save_profile_button = tk.Button(buttons, text=texts["save_profile"], command=save_profile, state=tk.DISABLED)
+        save_profile_button.pack(side=tk.RIGHT)
+        tk.Button(buttons, text=texts["profile_next"], command=profile_next).pack(side=tk.RIGHT)
+
+        auto_refresh()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preliminary Big Data Analysis")
+    parser.add_argument("--startup-report", action="store_true", help="print import and startup timings to stderr")
+    parser.add_argument("--exit-after-startup", action="store_true", help="close the window once it is shown (with --startup-report)")
+    args = parser.parse_args(argv)
+    startup.REPORT.enabled = args.startup_report
+
+    root = tk.Tk()
+    app = DataAnalyzerApp(root)
+    startup.REPORT.mark("window built")
+
+    def on_first_idle():
+        startup.REPORT.finish()
+        if args.startup_report:
+            startup.REPORT.print()
+        if args.exit_after_startup:
+            root.destroy()
+
+    root.after_idle(lambda: root.after(0, on_first_idle))
+    root.mainloop()
+    app.scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import numpy as np
+
+METHODS = ("iqr", "zscore", "mad")
+SAMPLE_ROWS = 500_000  # выше этого числа строк квантили оцениваются по случайной выборке
+BLOCK_ROWS = 1 << 16
+IQR_FACTOR = 1.5
+ZSCORE_LIMIT = 3.0
+MAD_LIMIT = 3.5  # порог модифицированного z-score (Иглевич и Хоаглин)
+
+
+def numeric_columns(df):
+    return [column for column in df.columns if df[column].dtype.kind in "iuf"]
+
+
+def detect_outliers(df, method="iqr", sample_rows=SAMPLE_ROWS, seed=0):
+    # Границы выбросов для всех числовых столбцов сразу: статистики считаются
+    # по матрице строки x столбцы вдоль оси 0, выбросы - одним проходом по блокам строк
+    if method not in METHODS:
+        raise ValueError(f"Unknown outlier method: {method}")
+    columns = numeric_columns(df)
+    if not columns:
+        return []
+    n_rows = len(df)
+    approximate = n_rows > sample_rows
+    if approximate:
+        rows = np.sort(np.random.default_rng(seed).choice(n_rows, sample_rows, replace=False))
+        sample = df[columns].iloc[rows].to_numpy(dtype=np.float64)
+    else:
+        sample = df[columns].to_numpy(dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "iqr":
+            q1, q3 = np.nanpercentile(sample, [25, 75], axis=0)
+            low, high = q1 - IQR_FACTOR * (q3 - q1), q3 + IQR_FACTOR * (q3 - q1)
+        elif method == "zscore":
+            mean, std = np.nanmean(sample, axis=0), np.nanstd(sample, axis=0, ddof=1)
+            low, high = mean - ZSCORE_LIMIT * std, mean + ZSCORE_LIMIT * std
+        else:
+            median = np.nanmedian(sample, axis=0)
+            mad = np.nanmedian(np.abs(sample - median), axis=0)
+            spread = MAD_LIMIT * mad / 0.6745
+            low, high = median - spread, median + spread
+    del sample
+
+    outliers = np.zeros(len(columns), dtype=np.int64)
+    counts = np.zeros(len(columns), dtype=np.int64)
+    frame = df[columns]
+    for start in range(0, n_rows, BLOCK_ROWS):
+        block = frame.iloc[start:start + BLOCK_ROWS].to_numpy(dtype=np.float64)
+        outliers += np.count_nonzero((block < low) | (block > high), axis=0)
+        counts += np.count_nonzero(~np.isnan(block), axis=0)
+
+    return [
+        {"column": column, "low": float(low[i]), "high": float(high[i]), "outliers": int(outliers[i]),
+         "count": int(counts[i]), "approximate": approximate}
+        for i, column in enumerate(columns)
+    ]
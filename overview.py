@@ -0,0 +1,46 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from diagnostics import span
+from stats_engine import column_values, compute_statistics
+
+
+class ColumnStatisticsRunner:
+    # Считает полную статистику нескольких столбцов в пуле потоков: сортировка,
+    # bincount и редукции NumPy отпускают GIL, поэтому столбцы идут параллельно.
+    # Сообщения: ("column", column, stats), ("error", column, exc)
+    def __init__(self, df, columns, max_workers=None):
+        self.df = df
+        self.columns = list(columns)
+        self.max_workers = max_workers or min(len(self.columns), os.cpu_count() or 1) or 1
+        self.messages = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._executor = None
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="overview")
+        for column in self.columns:
+            self._executor.submit(self._run, column)
+        self._executor.shutdown(wait=False)
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _run(self, column):
+        if self.cancelled:
+            return
+        try:
+            with span("statistics", column=str(column)):
+                stats = compute_statistics(column_values(self.df[column]))
+        except Exception as e:
+            self.messages.put(("error", column, e))
+            return
+        self.messages.put(("column", column, stats))
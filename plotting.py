@@ -0,0 +1,258 @@
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, LogNorm
+from matplotlib.patches import Rectangle
+
+from diagnostics import span
+
+EXACT_POINT_LIMIT = 20_000  # до этого числа точек график рисуется без прореживания
+
+
+def decimate_minmax(x, y, width, height):
+    # Прореживание с сохранением огибающей: в каждом столбце пикселей остаются
+    # минимум и максимум, плюс выбросы за усами Тьюки (по одному на пиксель).
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    width = max(int(width), 1)
+    height = max(int(height), 1)
+    if n <= 2 * width:
+        return x, y
+    if np.any(x[1:] < x[:-1]):
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+
+    span = float(x[-1] - x[0]) or 1.0
+    bucket = np.minimum(((x - x[0]) * (width / span)).astype(np.int64), width - 1)
+    starts = np.concatenate(([0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1))
+    lengths = np.diff(np.append(starts, n))
+    segment = np.repeat(np.arange(len(starts)), lengths)
+    keep = [_first_per_segment(np.flatnonzero(y == np.minimum.reduceat(y, starts)[segment]), segment),
+            _first_per_segment(np.flatnonzero(y == np.maximum.reduceat(y, starts)[segment]), segment)]
+
+    q1, q3 = np.percentile(y, [25, 75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    outliers = np.flatnonzero((y < low) | (y > high))
+    if len(outliers):
+        y_min, y_max = y.min(), y.max()
+        rows = ((y[outliers] - y_min) * (height / ((y_max - y_min) or 1.0))).astype(np.int64)
+        _, first = np.unique(bucket[outliers] * (height + 1) + rows, return_index=True)
+        keep.append(outliers[first])
+
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+
+def _first_per_segment(indices, segment):
+    segments = segment[indices]
+    first = np.concatenate(([True], segments[1:] != segments[:-1]))
+    return indices[first]
+
+
+def density_grid(x, y, width, height, extent=None):
+    # Двумерная гистограмма индекс x значение на сетке пикселей через bincount
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    width = max(int(width), 1)
+    height = max(int(height), 1)
+    if extent is None:
+        extent = (x.min(), x.max(), y.min(), y.max()) if len(x) else (0.0, 1.0, 0.0, 1.0)
+    x0, x1, y0, y1 = extent
+    inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+    if not inside.all():
+        x, y = x[inside], y[inside]
+    columns = np.minimum(((x - x0) * (width / ((x1 - x0) or 1.0))).astype(np.int64), width - 1)
+    rows = np.minimum(((y - y0) * (height / ((y1 - y0) or 1.0))).astype(np.int64), height - 1)
+    counts = np.bincount(rows * width + columns, minlength=width * height).reshape(height, width)
+    return counts, extent
+
+
+def density_cmap(color):
+    cmap = LinearSegmentedColormap.from_list("density", ["#f0f0f0", color])
+    cmap.set_bad(alpha=0)
+    return cmap
+
+
+def draw_density(ax, counts, extent, color):
+    # Вся плотность рисуется одним изображением с логарифмической шкалой цвета
+    return ax.imshow(np.ma.masked_equal(counts, 0), origin="lower", extent=extent, aspect="auto",
+                     cmap=density_cmap(color), norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 2)),
+                     interpolation="nearest")
+
+
+def padded_limits(low, high, margin=0.05):
+    if not np.isfinite(low) or not np.isfinite(high):
+        return 0.0, 1.0
+    if low == high:
+        return low - 0.5, high + 0.5
+    pad = (high - low) * margin
+    return low - pad, high + pad
+
+
+class PlotPanel:
+    # Встроенная пара осей (график расхождений и ящик с усами), артисты которой
+    # создаются один раз и затем только обновляются. Артисты данных помечены
+    # animated: фон сохраняется после полной перерисовки, а смена цвета
+    # перерисовывает только их поверх фона (blitting).
+    BOX_WIDTH = 0.5
+
+    def __init__(self, canvas, ax_scatter, ax_box):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.ax_scatter = ax_scatter
+        self.ax_box = ax_box
+        self.background = None
+        self.data_key = None  # (column, filter_key) of the data on display
+        self._saving = False
+
+        ax_scatter.set_xlabel("Index")
+        ax_scatter.set_ylabel("Value")
+        ax_box.set_ylabel("Value")
+        ax_box.set_xlim(-0.5, 0.5)
+        ax_box.set_xticks([])
+        for ax in (ax_scatter, ax_box):
+            ax.set_autoscale_on(False)
+
+        self.scatter = ax_scatter.scatter(np.empty(0), np.empty(0), edgecolors="w", linewidths=0.75, animated=True)
+        self.density = None
+
+        half = self.BOX_WIDTH / 2
+        self.box = Rectangle((-half, 0), self.BOX_WIDTH, 0, edgecolor=".25", linewidth=1.25, animated=True)
+        ax_box.add_patch(self.box)
+        self.median, = ax_box.plot([], [], color=".25", linewidth=1.25, animated=True)
+        # Оба уса и обе засечки - по одной линии с разрывом NaN
+        self.whiskers, = ax_box.plot([], [], color=".25", linewidth=1.25, animated=True)
+        self.caps, = ax_box.plot([], [], color=".25", linewidth=1.25, animated=True)
+        self.fliers, = ax_box.plot([], [], linestyle="none", marker="d", markersize=5, color=".25", animated=True)
+        self.box_artists = [self.box, self.whiskers, self.caps, self.median, self.fliers]
+        self.box_summary = None
+        self.flier_label = ax_box.text(0.98, 0.95, "", transform=ax_box.transAxes, ha="right", va="top", fontsize=7)
+
+        canvas.mpl_connect("draw_event", self._on_draw)
+        # Полная перерисовка идёт из draw_idle в простое Tk, поэтому замер ставится на сам canvas.draw
+        self._canvas_draw = canvas.draw
+        canvas.draw = self._timed_draw
+
+    def animated_artists(self):
+        artists = [self.scatter] + self.box_artists
+        if self.density is not None:
+            artists.insert(0, self.density)
+        return artists
+
+    def set_scatter_points(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.scatter.set_offsets(np.column_stack([x, y]))
+        self.scatter.set_visible(True)
+        if self.density is not None:
+            self.density.set_visible(False)
+        if len(x):
+            self.ax_scatter.set_xlim(padded_limits(x.min(), x.max()))
+            self.ax_scatter.set_ylim(padded_limits(y.min(), y.max()))
+        else:
+            self.ax_scatter.set_xlim(0, 1)
+            self.ax_scatter.set_ylim(0, 1)
+
+    def set_scatter_density(self, counts, extent, color):
+        masked = np.ma.masked_equal(counts, 0)
+        if self.density is None:
+            self.density = draw_density(self.ax_scatter, counts, extent, color)
+            self.density.set_animated(True)
+        else:
+            self.density.set_data(masked)
+            self.density.set_extent(extent)
+            self.density.norm.vmax = max(int(counts.max()), 2)
+        self.density.set_visible(True)
+        self.scatter.set_visible(False)
+        self.ax_scatter.set_xlim(extent[0], extent[1])
+        self.ax_scatter.set_ylim(extent[2], extent[3])
+
+    def set_box(self, summary):
+        self.box_summary = summary
+        if summary is None:
+            for artist in self.box_artists:
+                artist.set_visible(False)
+            self.ax_box.set_ylim(0, 1)
+            return
+        half = self.BOX_WIDTH / 2
+        quarter = half / 2
+        self.box.set_y(summary["q1"])
+        self.box.set_height(summary["q3"] - summary["q1"])
+        self.median.set_data([-half, half], [summary["med"]] * 2)
+        self.whiskers.set_data([0, 0, np.nan, 0, 0],
+                               [summary["q1"], summary["whislo"], np.nan, summary["q3"], summary["whishi"]])
+        self.caps.set_data([-quarter, quarter, np.nan, -quarter, quarter],
+                           [summary["whislo"]] * 2 + [np.nan] + [summary["whishi"]] * 2)
+        fliers = summary["fliers"]
+        self.fliers.set_data(np.zeros(len(fliers)), fliers)
+        for artist in self.box_artists:
+            artist.set_visible(True)
+        low = min(summary["whislo"], fliers.min()) if len(fliers) else summary["whislo"]
+        high = max(summary["whishi"], fliers.max()) if len(fliers) else summary["whishi"]
+        self.ax_box.set_ylim(padded_limits(low, high))
+
+    def set_titles(self, scatter_title, box_title, flier_label=""):
+        self.ax_scatter.set_title(scatter_title)
+        self.ax_box.set_title(box_title)
+        self.flier_label.set_text(flier_label)
+
+    def set_colors(self, scatter_color, box_color):
+        self.scatter.set_facecolor(scatter_color)
+        if self.density is not None:
+            self.density.set_cmap(density_cmap(scatter_color))
+        self.box.set_facecolor(box_color)
+
+    def set_axes_visible(self, scatter_visible, box_visible):
+        changed = (self.ax_scatter.get_visible(), self.ax_box.get_visible()) != (scatter_visible, box_visible)
+        self.ax_scatter.set_visible(scatter_visible)
+        self.ax_box.set_visible(box_visible)
+        return changed
+
+    def redraw(self, relayout=False):
+        # Полная перерисовка откладывается до простоя Tk; tight_layout только при смене структуры
+        if relayout:
+            with span("draw.tight_layout"):
+                self.figure.tight_layout()
+        self.canvas.draw_idle()
+
+    def blit(self):
+        # Перерисовка только артистов данных поверх сохранённого фона
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        with span("draw.blit"):
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+
+    def savefig(self, file_path, ax=None):
+        # animated-артисты не попадают в savefig, поэтому на время сохранения снимаем флаг.
+        # С ax сохраняется только область этих осей вместе с подписями
+        artists = self.animated_artists()
+        self._saving = True
+        try:
+            for artist in artists:
+                artist.set_animated(False)
+            bbox = None
+            if ax is not None and ax.get_visible():
+                bbox = ax.get_tightbbox(self.canvas.get_renderer()).transformed(self.figure.dpi_scale_trans.inverted())
+            self.figure.savefig(file_path, bbox_inches=bbox)
+        finally:
+            for artist in artists:
+                artist.set_animated(True)
+            self._saving = False
+        self.canvas.draw_idle()
+
+    def _timed_draw(self, *args, **kwargs):
+        with span("draw.panel"):
+            return self._canvas_draw(*args, **kwargs)
+
+    def _on_draw(self, event):
+        if self._saving:
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.animated_artists():
+            if artist.axes.get_visible() and artist.get_visible():
+                self.figure.draw_artist(artist)
@@ -0,0 +1,116 @@
+import os
+import queue
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from diagnostics import span
+
+DEBOUNCE_MS = 120  # события интерфейса в этом окне склеиваются в одно обновление
+POLL_MS = 30
+
+
+class RecomputeScheduler:
+    # Отложенные обновления интерфейса и их тяжёлая часть в фоновом потоке.
+    # debounce: повторный вызов с тем же ключом в пределах окна откладывает обновление заново.
+    # submit: compute() выполняется в фоновом потоке, apply(result) - в главном потоке Tk.
+    # У каждого ключа есть номер поколения: новая задача делает все прежние устаревшими,
+    # ещё не начатые пропускаются, а результаты уже начатых отбрасываются.
+    # on_busy(key, busy) вызывается в главном потоке, когда у ключа появляются
+    # или заканчиваются задачи в работе (индикаторы занятости панелей).
+    def __init__(self, master, delay_ms=DEBOUNCE_MS, poll_ms=POLL_MS, max_workers=None, on_busy=None):
+        self.master = master
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self.generations = {}
+        self.results = queue.Queue()
+        self._timers = {}
+        self._in_flight = Counter()
+        self._polling = False
+        # Потоки, а не процессы: тяжёлые шаги - ядра NumPy, которые отпускают GIL,
+        # а передача таблицы в другой процесс стоила бы дороже самого расчёта
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                            thread_name_prefix="recompute")
+
+    def debounce(self, key, callback, delay_ms=None):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            self.master.after_cancel(timer)
+        self._timers[key] = self.master.after(self.delay_ms if delay_ms is None else delay_ms, self._fire, key, callback)
+
+    def submit(self, key, compute, apply, on_error=None):
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        self._in_flight[key] += 1
+        if self._in_flight[key] == 1 and self.on_busy is not None:
+            self.on_busy(key, True)
+        self._executor.submit(self._run, key, generation, compute, apply, on_error)
+        if not self._polling:
+            self._polling = True
+            self.master.after(self.poll_ms, self._poll)
+        return generation
+
+    def cancel(self, key=None, keep=None):
+        # Все задачи ключа (или вообще все, кроме ключей, для которых keep(key) истинно)
+        # становятся устаревшими
+        for name in [key] if key is not None else list(self.generations):
+            if key is None and keep is not None and keep(name):
+                continue
+            self.generations[name] = self.generations.get(name, 0) + 1
+
+    def is_current(self, key, generation):
+        return self.generations.get(key) == generation
+
+    def running(self, key):
+        return self._in_flight[key] > 0
+
+    def running_keys(self):
+        return [key for key, count in self._in_flight.items() if count]
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fire(self, key, callback):
+        self._timers.pop(key, None)
+        callback()
+
+    def _run(self, key, generation, compute, apply, on_error):
+        # Фоновый поток: Tk здесь не трогаем, только считаем
+        if not self.is_current(key, generation):
+            self.results.put((key, generation, None, None, None))
+            return
+        try:
+            # Интервал верхнего уровня в фоновом потоке: "Profile Next Action" захватывает
+            # именно расчёт, а не его постановку в очередь в главном потоке
+            with span("compute", key=str(key if isinstance(key, str) else key[0])):
+                result = compute()
+            self.results.put((key, generation, apply, result, None))
+        except Exception as e:
+            self.results.put((key, generation, on_error, None, e))
+
+    def _poll(self):
+        try:
+            while True:
+                key, generation, callback, result, error = self.results.get_nowait()
+                self._in_flight[key] -= 1
+                if not self._in_flight[key]:
+                    del self._in_flight[key]
+                    if self.on_busy is not None:
+                        self.on_busy(key, False)
+                if callback is None and error is None or not self.is_current(key, generation):
+                    continue
+                if error is None:
+                    callback(result)
+                elif callback is not None:
+                    callback(error)
+                else:
+                    self.master.report_callback_exception(type(error), error, error.__traceback__)
+        except queue.Empty:
+            pass
+        finally:
+            # Ошибка в apply не должна останавливать опрос остальных результатов
+            if self._in_flight:
+                self.master.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
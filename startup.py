@@ -0,0 +1,50 @@
+import importlib
+import sys
+import time
+
+STARTED = time.perf_counter()  # main.py импортирует этот модуль первым
+# Тяжёлые модули, которые не должны загружаться до появления окна
+DEFERRED_MODULES = ("pandas", "seaborn", "scipy")
+
+
+class StartupReport:
+    # Время импорта и запуска интерфейса: отметки от начала процесса и
+    # отложенные импорты, выполненные при первом использовании
+    def __init__(self):
+        self.enabled = False
+        self.marks = []
+        self.imports = {}
+        self.loaded_at_startup = ()
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - STARTED))
+
+    def timed_import(self, name):
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports[name] = time.perf_counter() - start
+        if self.enabled:
+            print(f"deferred import {name}: {self.imports[name] * 1000:.0f} ms", file=sys.stderr)
+        return module
+
+    def finish(self):
+        # Вызывается, когда окно уже показано и цикл событий простаивает
+        self.mark("first idle")
+        self.loaded_at_startup = tuple(name for name in DEFERRED_MODULES if name in sys.modules)
+
+    def lines(self):
+        lines = [f"{name}: {seconds * 1000:.0f} ms" for name, seconds in self.marks]
+        if self.loaded_at_startup:
+            lines.append("loaded before first use: " + ", ".join(self.loaded_at_startup))
+        lines.extend(f"deferred import {name}: {seconds * 1000:.0f} ms" for name, seconds in self.imports.items())
+        return lines
+
+    def print(self, file=None):
+        print("\n".join(["startup report:"] + ["  " + line for line in self.lines()]), file=file or sys.stderr)
+
+
+REPORT = StartupReport()
+timed_import = REPORT.timed_import
@@ -0,0 +1,243 @@
+import numpy as np
+
+BLOCK_SIZE = 1 << 16  # блок помещается в кэш процессора
+MAX_FLIERS = 200  # сколько выбросов рисуется на ящике с усами
+HISTOGRAM_BIN_RULES = ("auto", "fd", "sturges", "sqrt")
+MAX_HISTOGRAM_BINS = 10_000
+
+
+class MomentAccumulator:
+    # Однопроходный накопитель моментов: блоки складываются по формулам
+    # Уэлфорда/Чана, поэтому накопители можно сливать между собой.
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sum_sq = 0.0
+        self.log_sum = 0.0
+        self.reciprocal_sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.negatives = 0
+        self.zeros = 0
+
+    def update(self, block):
+        block = np.asarray(block, dtype=np.float64)
+        n = len(block)
+        if n == 0:
+            return
+        block_mean = block.sum() / n
+        deviations = block - block_mean
+        other = MomentAccumulator()
+        other.count = n
+        other.mean = block_mean
+        other.m2 = float(np.dot(deviations, deviations))
+        other.sum_sq = float(np.dot(block, block))
+        other.min = block.min()
+        other.max = block.max()
+        if other.min > 0:
+            other.log_sum = np.log(block).sum()
+            other.reciprocal_sum = np.reciprocal(block).sum()
+        else:
+            positive = block[block > 0]
+            other.log_sum = np.log(positive).sum()
+            other.reciprocal_sum = np.reciprocal(positive).sum()
+            other.negatives = int(np.count_nonzero(block < 0))
+            other.zeros = n - len(positive) - other.negatives
+        self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.sum_sq += other.sum_sq
+        self.log_sum += other.log_sum
+        self.reciprocal_sum += other.reciprocal_sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.negatives += other.negatives
+        self.zeros += other.zeros
+
+    def result(self):
+        if self.count == 0:
+            return {key: np.nan for key in ("mean", "variance", "range", "max", "min", "geometric_mean",
+                                            "harmonic_mean", "quadratic_mean", "std_dev")}
+        variance = self.m2 / (self.count - 1) if self.count > 1 else np.nan
+        if self.negatives:
+            geometric_mean = "N/A (negative values)"
+            harmonic_mean = "N/A (negative values)"
+        elif self.zeros:
+            geometric_mean = 0.0
+            harmonic_mean = 0.0
+        else:
+            geometric_mean = float(np.exp(self.log_sum / self.count))
+            harmonic_mean = float(self.count / self.reciprocal_sum)
+        return {
+            "mean": float(self.mean),
+            "variance": float(variance),
+            "range": float(self.max - self.min),
+            "max": float(self.max),
+            "min": float(self.min),
+            "geometric_mean": geometric_mean,
+            "harmonic_mean": harmonic_mean,
+            "quadratic_mean": float(np.sqrt(self.sum_sq / self.count)),
+            "std_dev": float(np.sqrt(variance)),
+        }
+
+
+def numeric_array(series):
+    # Столбец без копии, если это обычный массив numpy (в том числе memmap из ColumnStore);
+    # столбцы pandas с маской (Int64 из ColumnStore) - float64 с NaN на месте пропусков
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def column_values(series):
+    # Значения столбца без пропусков в виде numpy-массива
+    if not isinstance(series.dtype, np.dtype) and series.dtype.kind in "iub":
+        # Int64 с маской: пропуски отбрасываются, целые остаются целыми (без округления до float64)
+        series = series.dropna().astype(series.dtype.numpy_dtype)
+    values = series.to_numpy()
+    if values.dtype.kind == "f":
+        return values[~np.isnan(values)]
+    if values.dtype.kind in "iu":
+        return values
+    if values.dtype.kind == "b":
+        # np.percentile не принимает bool: считаем как 0/1
+        return values.astype(np.int64)
+    return series.dropna().to_numpy(dtype=np.float64)
+
+
+def median(values):
+    n = len(values)
+    if n == 0:
+        return np.nan
+    middle = n // 2
+    if n % 2:
+        return float(np.partition(values, middle)[middle])
+    part = np.partition(values, [middle - 1, middle])
+    return float((part[middle - 1] + part[middle]) / 2)
+
+
+def sorted_median(ordered):
+    n = len(ordered)
+    if n == 0:
+        return np.nan
+    middle = n // 2
+    if n % 2:
+        return float(ordered[middle])
+    return float((ordered[middle - 1] + ordered[middle]) / 2)
+
+
+def bincount_mode(values):
+    # Для целых с небольшим размахом мода считается через bincount без сортировки
+    if len(values) == 0 or values.dtype.kind not in "iub":
+        return None
+    low = int(values.min())
+    if int(values.max()) - low > 4 * len(values):
+        return None
+    counts = np.bincount(values.astype(np.int64) - low)
+    return first_occurrence(values, np.flatnonzero(counts == counts.max()) + low)
+
+
+def sorted_mode(ordered, values):
+    if len(ordered) == 0:
+        return "N/A (no unique mode)"
+    starts = np.concatenate(([0], np.flatnonzero(ordered[1:] != ordered[:-1]) + 1))
+    counts = np.diff(np.append(starts, len(ordered)))
+    return first_occurrence(values, ordered[starts[counts == counts.max()]])
+
+
+def first_occurrence(values, candidates):
+    # При равных частотах мода - значение, встреченное первым (как у statistics.mode)
+    if len(candidates) == 1:
+        return candidates[0].item()
+    if len(candidates) == len(values):
+        return values[0].item()
+    return values[np.argmax(np.isin(values, candidates))].item()
+
+
+def compute_statistics(values):
+    accumulator = MomentAccumulator()
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for start in range(0, len(values), BLOCK_SIZE):
+            accumulator.update(values[start:start + BLOCK_SIZE])
+    stats = accumulator.result()
+    stats["count"] = accumulator.count
+    stats["mode"] = bincount_mode(values)
+    if stats["mode"] is not None:
+        stats["box"] = box_summary(values)
+    else:
+        # Мода вещественных значений требует сортировки; медиана, квартили и
+        # выбросы для ящика с усами берутся из того же отсортированного массива
+        ordered = np.sort(values)
+        stats["box"] = box_summary(values, ordered)
+        stats["mode"] = sorted_mode(ordered, values)
+    stats["median"] = stats["box"]["med"] if stats["box"] is not None else np.nan
+    return stats
+
+
+def sorted_quantiles(ordered, quantiles):
+    # Линейная интерполяция, как у np.percentile
+    positions = np.asarray(quantiles) * (len(ordered) - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, len(ordered) - 1)
+    fraction = positions - lower
+    return ordered[lower] + fraction * (ordered[upper] - ordered[lower])
+
+
+def sample_fliers(fliers, limit=MAX_FLIERS):
+    # Равномерная выборка из отсортированных выбросов; крайние значения сохраняются
+    if len(fliers) <= limit:
+        return fliers
+    return fliers[np.unique(np.linspace(0, len(fliers) - 1, limit).round().astype(np.int64))]
+
+
+def box_summary(values, ordered=None, whis=1.5):
+    # Сводка для ящика с усами в формате matplotlib bxp: квартили, усы
+    # и не более MAX_FLIERS выбросов плюс их общее число
+    if len(values) == 0:
+        return None
+    if ordered is not None:
+        q1, med, q3 = sorted_quantiles(ordered, [0.25, 0.5, 0.75])
+    else:
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    if ordered is not None:
+        first = np.searchsorted(ordered, low, side="left")
+        last = np.searchsorted(ordered, high, side="right")
+        whislo, whishi = ordered[first], ordered[last - 1]
+        fliers = np.concatenate([ordered[:first], ordered[last:]])
+    else:
+        outside = (values < low) | (values > high)
+        inside = values[~outside]
+        whislo, whishi = inside.min(), inside.max()
+        fliers = np.sort(values[outside])
+    fliers = fliers.astype(np.float64)
+    return {
+        "q1": float(q1), "med": float(med), "q3": float(q3),
+        "whislo": float(whislo), "whishi": float(whishi),
+        "fliers": sample_fliers(fliers), "flier_count": len(fliers),
+    }
+
+
+def parse_bins(value):
+    # Правило numpy для интервалов гистограммы или их число; None, если значение некорректно
+    value = str(value).strip()
+    if value in HISTOGRAM_BIN_RULES:
+        return value
+    try:
+        bins = int(value)
+    except ValueError:
+        return None
+    return bins if 1 <= bins <= MAX_HISTOGRAM_BINS else None
+
+
+def histogram(values, bins="auto"):
+    counts, edges = np.histogram(values, bins=bins)
+    return counts, edges
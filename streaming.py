@@ -0,0 +1,280 @@
+import numpy as np
+
+from stats_engine import BLOCK_SIZE, MomentAccumulator, column_values, sample_fliers, sorted_quantiles
+
+SKETCH_SIZE = 4096  # элементов на уровень квантильного эскиза
+HEAVY_HITTERS = 1024  # счётчиков в эскизе частых значений
+HISTOGRAM_BINS = 512  # чётное: при расширении диапазона соседние интервалы сливаются попарно
+
+
+class QuantileSketch:
+    # Квантильный эскиз в духе KLL: уровень i хранит элементы с весом 2**i.
+    # Переполненный уровень сортируется, и каждый второй элемент (со случайным
+    # сдвигом) уходит на следующий уровень. Память O(k log(n/k)), эскизы сливаются.
+    def __init__(self, k=SKETCH_SIZE, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self):
+        # Пока ничего не сжато, эскиз хранит все значения
+        return len(self.levels) == 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other):
+        self.count += other.count
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep = items[len(items) - len(items) % 2:]  # нечётный остаток остаётся на уровне
+                promoted = items[self._rng.integers(2):len(items) - len(keep):2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def weighted_items(self):
+        # Все элементы эскиза по возрастанию и их веса
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** i, dtype=np.int64) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs):
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        if self.exact:
+            return sorted_quantiles(np.sort(self.levels[0]), qs)
+        items, weights = self.weighted_items()
+        ranks = np.cumsum(weights)
+        positions = np.searchsorted(ranks, np.asarray(qs) * ranks[-1], side="left")
+        return items[np.minimum(positions, len(items) - 1)]
+
+
+class HeavyHitters:
+    # Эскиз Мисры-Гриса для частых значений: не больше k счётчиков, каждый
+    # занижен не больше чем на error. Сводки частей складываются между собой.
+    def __init__(self, k=HEAVY_HITTERS):
+        self.k = k
+        self.keys = None  # тип ключей берётся из первой части
+        self.counts = np.empty(0, dtype=np.int64)
+        self.error = 0
+
+    def update(self, values):
+        keys, counts = np.unique(values, return_counts=True)
+        self._add(keys, counts)
+
+    def merge(self, other):
+        self.error += other.error
+        if other.keys is not None:
+            self._add(other.keys, other.counts)
+
+    def _add(self, keys, counts):
+        if self.keys is not None:
+            keys = np.concatenate((self.keys, keys))
+            counts = np.concatenate((self.counts, counts))
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+        if len(keys) > self.k:
+            # Все счётчики уменьшаются на (k+1)-й по величине, остаются не больше k
+            threshold = np.partition(counts, len(counts) - self.k - 1)[len(counts) - self.k - 1]
+            counts -= threshold
+            keep = counts > 0
+            keys, counts = keys[keep], counts[keep]
+            self.error += int(threshold)
+        self.keys, self.counts = keys, counts
+
+    def mode(self):
+        # None, если частое значение не отличить от погрешности: на непрерывных данных
+        # счётчики обнуляются или не превышают error
+        if self.keys is None or len(self.keys) == 0 or self.counts.max() <= self.error:
+            return None
+        return self.keys[np.argmax(self.counts)].item()
+
+
+class StreamingHistogram:
+    # Гистограмма с фиксированным числом интервалов одинаковой ширины. Когда
+    # значение выходит за диапазон, интервалы сливаются попарно и диапазон
+    # удваивается в нужную сторону, поэтому память не зависит от объёма данных.
+    def __init__(self, bins=HISTOGRAM_BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.low = None
+        self.width = None
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.all():
+            # NaN и бесконечности не попадают ни в один интервал и не растягивают диапазон
+            values = values[finite]
+            weights = None if weights is None else np.asarray(weights)[finite]
+        if len(values) == 0:
+            return
+        low, high = values.min(), values.max()
+        if self.low is None:
+            self.low = low
+            self.width = (high - low) / self.bins or 1.0 / self.bins
+        self._cover(low, high)
+        index = np.clip(((values - self.low) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(index, weights=weights, minlength=self.bins).astype(np.int64)
+
+    def merge(self, other):
+        if other.low is None:
+            return
+        filled = np.flatnonzero(other.counts)
+        self.update(other.low + (filled + 0.5) * other.width, other.counts[filled])
+
+    def _cover(self, low, high):
+        half = self.bins // 2
+        while low < self.low or high > self.low + self.width * self.bins:
+            merged = self.counts.reshape(half, 2).sum(axis=1)
+            self.width *= 2
+            if low < self.low:
+                self.low -= half * self.width
+                self.counts = np.concatenate((np.zeros(half, dtype=np.int64), merged))
+            else:
+                self.counts = np.concatenate((merged, np.zeros(half, dtype=np.int64)))
+
+    def densest(self):
+        # Середина самого заполненного интервала или None, если значений не было
+        if self.low is None:
+            return None
+        return float(self.low + (np.argmax(self.counts) + 0.5) * self.width)
+
+    def result(self):
+        # (counts, edges) без пустых интервалов по краям, как у stats_engine.histogram
+        filled = np.flatnonzero(self.counts)
+        if len(filled) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(1)
+        first, last = filled[0], filled[-1] + 1
+        return self.counts[first:last], self.low + self.width * np.arange(first, last + 1)
+
+
+class StreamingColumnStats:
+    # Все показатели панели статистики одного столбца за один проход по частям файла
+    def __init__(self):
+        self.moments = MomentAccumulator()
+        self.quantiles = QuantileSketch()
+        self.heavy_hitters = HeavyHitters()
+        self.histogram = StreamingHistogram()
+
+    def update(self, values):
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for start in range(0, len(values), BLOCK_SIZE):
+                self.moments.update(values[start:start + BLOCK_SIZE])
+        self.quantiles.update(values)
+        self.heavy_hitters.update(values)
+        self.histogram.update(values)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.histogram.merge(other.histogram)
+
+    def result(self):
+        # Словарь в формате compute_statistics плюс "histogram" и "approximate" -
+        # ключи, значения которых получены из эскизов приближённо
+        stats = self.moments.result()
+        stats["count"] = self.moments.count
+        stats["box"] = self.box_summary()
+        stats["median"] = stats["box"]["med"] if stats["box"] is not None else np.nan
+        stats["mode"] = self.heavy_hitters.mode()
+        stats["histogram"] = self.histogram.result()
+        approximate = []
+        if not self.quantiles.exact:
+            approximate += ["median", "box"]
+        if stats["mode"] is None:
+            # Частых значений нет (непрерывные данные): мода - середина самого плотного интервала
+            stats["mode"] = self.histogram.densest()
+            if stats["mode"] is None:
+                stats["mode"] = "N/A (no frequent value)"
+            else:
+                approximate.append("mode")
+        elif self.heavy_hitters.error:
+            approximate.append("mode")
+        stats["approximate"] = tuple(approximate)
+        return stats
+
+    def box_summary(self, whis=1.5):
+        # Квартили из эскиза; усы и выбросы - из его элементов (это реальные
+        # значения столбца), число выбросов - сумма их весов
+        if self.moments.count == 0:
+            return None
+        if self.quantiles.exact:
+            items = np.sort(self.quantiles.levels[0])
+            weights = np.ones(len(items), dtype=np.int64)
+        else:
+            items, weights = self.quantiles.weighted_items()
+        q1, med, q3 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        first = np.searchsorted(items, low, side="left")
+        last = np.searchsorted(items, high, side="right")
+        outside = np.concatenate((np.arange(first), np.arange(last, len(items))))
+        # Крайние значения известны точно из накопителя моментов
+        whislo = self.moments.min if self.moments.min >= low else items[first]
+        whishi = self.moments.max if self.moments.max <= high else items[last - 1]
+        fliers = items[outside]
+        if self.moments.min < low and (len(fliers) == 0 or fliers[0] != self.moments.min):
+            fliers = np.concatenate(([self.moments.min], fliers))
+        if self.moments.max > high and (len(fliers) == 0 or fliers[-1] != self.moments.max):
+            fliers = np.concatenate((fliers, [self.moments.max]))
+        return {
+            "q1": float(q1), "med": float(med), "q3": float(q3),
+            "whislo": float(whislo), "whishi": float(whishi),
+            "fliers": sample_fliers(fliers.astype(np.float64)), "flier_count": int(weights[outside].sum()),
+        }
+
+
+class StreamingTableStats:
+    # Накопители по каждому столбцу таблицы, которая читается частями. Столбец,
+    # в какой-либо части оказавшийся нечисловым, исключается.
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+        self.non_numeric = set()
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for column in chunk.columns:
+            if column in self.non_numeric:
+                continue
+            try:
+                values = column_values(chunk[column])
+            except (TypeError, ValueError):
+                self.non_numeric.add(column)
+                self.columns.pop(column, None)
+                continue
+            self.columns.setdefault(column, StreamingColumnStats()).update(values)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.non_numeric |= other.non_numeric
+        for column, stats in other.columns.items():
+            if column in self.non_numeric:
+                self.columns.pop(column, None)
+            elif column in self.columns:
+                self.columns[column].merge(stats)
+            else:
+                self.columns[column] = stats
+
+    def result(self):
+        return {column: stats.result() for column, stats in self.columns.items()}
@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+
+
+class SummaryCache:
+    # LRU-кэш вычисленных сводок столбцов (статистика, квантили, интервалы гистограмм).
+    # Ключ: (идентификатор набора данных, столбец, границы фильтра, вид сводки)
+    # Доступ из главного и фонового потоков; compute выполняется вне блокировки
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        # Сводка, посчитанная вне get (например, в фоновом потоке)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def peek(self, key, default=None):
+        # Без учёта в hits/misses и без изменения порядка LRU
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def invalidate(self, dataset_id, filter_key=None):
+        # Удаляет сводки набора данных; с filter_key - только для этого фильтра
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset_id and (filter_key is None or key[2] == filter_key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        # Показывается в панели диагностики
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
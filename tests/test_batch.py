@@ -0,0 +1,26 @@
+import os
+
+import pandas as pd
+
+import batch
+
+
+def test_profile_file_keeps_other_columns_and_unique_plot_names(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a b": [1.0, 2.0, 3.0], "a_b": [4.0, 5.0, 6.0], "flag": [True, False, True],
+                  "bad": [1.0, 2.0, 4.0]}).to_csv(path, index=False)
+    compute = batch.compute_statistics
+
+    def failing(values):
+        if values.max() == 4.0:
+            raise ValueError("boom")
+        return compute(values)
+
+    monkeypatch.setattr(batch, "compute_statistics", failing)
+    report = batch.profile_file(str(path), str(tmp_path / "plots"))
+    assert "error" not in report
+    columns = {entry["column"]: entry for entry in report["columns"]}
+    assert columns["flag"]["count"] == 3
+    assert columns["bad"]["error"] == "ValueError: boom"
+    assert columns["a b"]["plot"] != columns["a_b"]["plot"]
+    assert all(os.path.exists(columns[name]["plot"]) for name in ("a b", "a_b", "flag"))
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache import DatasetCache
+
+
+def write_csv(path, text="a\n1\n"):
+    path.write_text(text)
+    return str(path)
+
+
+def test_store_load_round_trip(tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    path = write_csv(tmp_path / "data.csv")
+    df = pd.DataFrame({
+        "int": np.arange(5, dtype=np.int64),
+        "float": [0.5, np.nan, 2.5, 3.5, np.inf],
+        "flag": [True, False, True, True, False],
+        "name": ["x", None, "y", "x", "z"],
+    })
+    cache.store(path, df)
+    loaded = cache.load(path)
+    pd.testing.assert_frame_equal(loaded, df)
+    assert isinstance(loaded["name"][0], str)
+    assert cache.load(path, variant="other") is None
+
+
+def test_mixed_object_column_is_not_cached(tmp_path):
+    # Число и строка в одном столбце не должны вернуться из кэша строками
+    cache = DatasetCache(str(tmp_path / "cache"))
+    path = write_csv(tmp_path / "data.csv")
+    cache.store(path, pd.DataFrame({"value": pd.Series([1, "a", 2.5], dtype=object)}))
+    assert cache.load(path) is None
+    assert cache.entries() == []
+
+
+def test_evict_keeps_newest_entry_within_limit(tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    df = pd.DataFrame({"a": np.arange(1000, dtype=np.float64)})
+    paths = [write_csv(tmp_path / f"{i}.csv", f"a\n{i}\n") for i in range(3)]
+    cache.store(paths[0], df)
+    entry_bytes = cache.total_bytes()
+    cache.max_bytes = entry_bytes * 2
+    for path in paths[1:]:
+        # Время доступа задаётся явно: записи, созданные подряд, могут получить одинаковое mtime
+        for _, _, entry_dir in cache.entries():
+            meta_path = os.path.join(entry_dir, "meta.json")
+            older = os.path.getmtime(meta_path) - 10
+            os.utime(meta_path, (older, older))
+        cache.store(path, df)
+    # Первая запись - самая давняя, она и удаляется
+    assert cache.load(paths[0]) is None
+    assert cache.load(paths[1]) is not None and cache.load(paths[2]) is not None
+    assert cache.total_bytes() <= cache.max_bytes
+    assert cache.clear() == entry_bytes * 2
+    assert cache.entries() == []
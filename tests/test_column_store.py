@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from column_store import ColumnStore, build_store
+
+
+def test_int_column_stays_int_when_later_chunk_has_nulls(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": pd.array([1, 2, 3, 4, 5, 6, 7, 8, None, 10], dtype="Int64"), "b": [0.5] * 10,
+                  "name": list("abcdefghij")}).to_csv(path, index=False)
+    store = build_store(str(path), str(tmp_path / "store"), chunksize=8)
+    frame = store.frame()
+    assert store.skipped == ["name"]
+    assert frame["a"].dtype == "Int64"
+    assert frame["a"].tolist() == [1, 2, 3, 4, 5, 6, 7, 8, pd.NA, 10]
+    assert frame["b"].dtype == np.float64
+    assert ColumnStore(str(tmp_path / "store")).rows == 10
+
+
+def test_cancelled_build_leaves_nothing_behind(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": range(10)}).to_csv(path, index=False)
+    assert build_store(str(path), str(tmp_path / "store"), chunksize=3, cancelled=lambda: True) is None
+    assert os.listdir(tmp_path) == ["data.csv"]
+
+
+def test_int_column_with_gaps_keeps_values_and_dtype(tmp_path):
+    path = tmp_path / "data.csv"
+    big = 2**53 + 1
+    pd.DataFrame({"a": pd.array([1, None, big, 4, None, 6, 7, 8, 9, None], dtype="Int64")}).to_csv(path, index=False)
+    store = build_store(str(path), str(tmp_path / "store"), chunksize=8)
+    column = store.frame()["a"]
+    assert column.dtype == "Int64"
+    assert column.array._data.dtype == np.int64
+    assert column.tolist() == [1, pd.NA, big, 4, pd.NA, 6, 7, 8, 9, pd.NA]
+    assert store.null_count("a") == 3
+    np.testing.assert_array_equal(store.null_mask("a"), column.isna().to_numpy())
+
+
+def test_fractions_promote_to_float_and_keep_earlier_gaps(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n" + "\n".join(f"{value},0" for value in ["1", "", "3", "4", "5", "6", "7", "8", "9.5", "10"]) + "\n")
+    store = build_store(str(path), str(tmp_path / "store"), chunksize=8)
+    frame = store.frame()
+    assert frame["a"].dtype == np.float64
+    np.testing.assert_array_equal(frame["a"].to_numpy(), [1, np.nan, 3, 4, 5, 6, 7, 8, 9.5, 10])
+
+
+def test_mapped_store_is_not_evicted(tmp_path):
+    from cache import DatasetCache
+
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": range(100)}).to_csv(path, index=False)
+    cache = DatasetCache(str(tmp_path / "cache"), max_bytes=0)
+    frame = build_store(str(path), os.path.join(cache.cache_dir, "used")).frame()
+    build_store(str(path), os.path.join(cache.cache_dir, "unused"))
+    cache.evict()
+    assert sorted(os.listdir(cache.cache_dir)) == ["used"]
+    assert frame["a"].sum() == sum(range(100))
+    del frame
+    cache.evict()
+    assert os.listdir(cache.cache_dir) == []
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+import correlation
+from correlation import correlation_matrix
+
+
+def frame(rows=2_000):
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=rows)
+    return pd.DataFrame({
+        "a": a,
+        "b": 2 * a + rng.normal(size=rows),
+        "c": np.exp(a) + rng.normal(scale=0.1, size=rows),
+        "d": rng.integers(0, 10, rows),
+    })
+
+
+def test_pearson_matches_pandas_across_blocks():
+    df = frame()
+    columns = list(df.columns)
+    result = correlation_matrix(df, columns, block_rows=300)
+    np.testing.assert_allclose(result, df.corr().to_numpy(), atol=1e-12)
+
+
+def test_pearson_with_gaps_uses_pairwise_complete_rows():
+    df = frame()
+    rng = np.random.default_rng(1)
+    for column in ("a", "b", "c"):
+        df.loc[rng.choice(len(df), 300, replace=False), column] = np.nan
+    columns = list(df.columns)
+    result = correlation_matrix(df, columns, block_rows=300)
+    np.testing.assert_allclose(result, df.corr().to_numpy(), atol=1e-12)
+
+
+def test_spearman_matches_pandas(monkeypatch):
+    df = frame()
+    columns = list(df.columns)
+    expected = df.corr(method="spearman").to_numpy()
+    np.testing.assert_allclose(correlation_matrix(df, columns, method="spearman", block_rows=300), expected, atol=1e-12)
+    # Ранги во временном файле дают тот же результат
+    monkeypatch.setattr(correlation, "RANKS_IN_MEMORY_BYTES", 0)
+    np.testing.assert_allclose(correlation_matrix(df, columns, method="spearman", block_rows=300), expected, atol=1e-12)
+
+
+def test_selected_rows_constant_and_masked_columns():
+    df = frame()
+    df["constant"] = 1.0
+    df["masked"] = pd.array(df["d"].where(df["d"] > 2), dtype="Int64")
+    rows = np.arange(0, len(df), 3)
+    columns = ["a", "d", "constant", "masked"]
+    result = correlation_matrix(df, columns, rows=rows)
+    expected = df.iloc[rows][columns].astype(np.float64).corr().to_numpy()
+    np.testing.assert_allclose(result, expected, atol=1e-12)
+    assert np.isnan(result[2]).all() and np.isnan(result[:, 2]).all()
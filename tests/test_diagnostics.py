@@ -0,0 +1,39 @@
+import threading
+
+from diagnostics import PROFILER, span
+from scheduler import RecomputeScheduler
+
+
+class FakeMaster:
+    def __init__(self):
+        self.calls = []
+
+    def after(self, delay, callback, *args):
+        self.calls.append((callback, args))
+        return len(self.calls)
+
+    def after_cancel(self, timer):
+        pass
+
+
+def heavy_compute():
+    return sum(i * i for i in range(10_000))
+
+
+def test_profile_next_action_captures_scheduled_compute():
+    master = FakeMaster()
+    scheduler = RecomputeScheduler(master, max_workers=1)
+    done = threading.Event()
+    PROFILER.profile_next_action()
+    try:
+        # Постановка в очередь в главном потоке не забирает профиль у расчёта
+        with span("refresh_tab", profile=False):
+            scheduler.submit("tab", heavy_compute, lambda result: done.set())
+        while not done.wait(0.01):
+            for callback, args in list(master.calls):
+                master.calls.remove((callback, args))
+                callback(*args)
+    finally:
+        scheduler.shutdown()
+    assert PROFILER.profile_name == "compute"
+    assert any(function == "heavy_compute" for _, _, function in PROFILER.profile_stats.stats)
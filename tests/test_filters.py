@@ -0,0 +1,50 @@
+import numpy as np
+
+from filters import FilterSet, SortedIndex
+
+
+def test_range_excludes_nan_rows():
+    index = SortedIndex(np.array([3.0, np.nan, 1.0, 2.0, np.nan]))
+    np.testing.assert_array_equal(index.range(1.0, 2.5), [2, 3])
+    np.testing.assert_array_equal(index.range(-np.inf, np.inf), [0, 2, 3])
+    assert len(index.range(1.0, np.nan)) == 0
+    assert len(index.range(np.nan, 3.0)) == 0
+
+
+def test_range_nan_bounds_on_int_column():
+    index = SortedIndex(np.array([5, 1, 3], dtype=np.int64))
+    assert len(index.range(np.nan, 4.0)) == 0
+    np.testing.assert_array_equal(index.range(1.0, 4.0), [1, 2])
+
+
+def test_range_on_bool_column():
+    index = SortedIndex(np.array([True, False, True, False]))
+    np.testing.assert_array_equal(index.range(0.5, 1.0), [0, 2])
+    np.testing.assert_array_equal(index.range(0.0, 0.0), [1, 3])
+    np.testing.assert_array_equal(index.range(-np.inf, np.inf), [0, 1, 2, 3])
+
+
+def test_filter_set_intersects_cached_masks():
+    columns = {"a": np.array([1.0, 2.0, 3.0, 4.0, np.nan]), "b": np.array([10, 20, 30, 40, 50])}
+    built = []
+
+    def index_for_column(column):
+        built.append(column)
+        return SortedIndex(columns[column])
+
+    filters = FilterSet(5, index_for_column)
+    assert filters.rows() is None and filters.key() is None
+    filters.set_range("a", 2.0, 4.0)
+    np.testing.assert_array_equal(filters.rows(), [1, 2, 3])
+    filters.set_range("b", 0, 30)
+    np.testing.assert_array_equal(filters.rows(), [1, 2])
+    assert filters.rows() is filters.rows()  # пересечение считается один раз до следующего изменения
+    # Новая граница одного столбца пересчитывает только его маску
+    filters.set_range("b", 30, 50)
+    assert built == ["a", "b", "b"]
+    np.testing.assert_array_equal(filters.rows(), [2, 3])
+    assert filters.key() == (("a", (2.0, 4.0)), ("b", (30, 50)))
+    filters.remove("a")
+    np.testing.assert_array_equal(filters.rows(), [2, 3, 4])
+    filters.clear()
+    assert filters.rows() is None
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from outliers import detect_outliers
+
+
+def frame():
+    rng = np.random.default_rng(0)
+    values = rng.normal(10, 2, 1_000)
+    values[:5] = [40, -30, 35, np.nan, 50]
+    return pd.DataFrame({"a": values, "b": rng.integers(0, 100, 1_000), "name": ["x"] * 1_000})
+
+
+def test_iqr_bounds():
+    df = frame()
+    (result,) = [row for row in detect_outliers(df, "iqr") if row["column"] == "a"]
+    q1, q3 = df["a"].quantile([0.25, 0.75])
+    assert np.isclose(result["low"], q1 - 1.5 * (q3 - q1))
+    assert np.isclose(result["high"], q3 + 1.5 * (q3 - q1))
+    values = df["a"].dropna()
+    assert result["outliers"] == ((values < result["low"]) | (values > result["high"])).sum()
+    assert result["count"] == 999
+    assert not result["approximate"]
+
+
+def test_zscore_bounds():
+    df = frame()
+    result = detect_outliers(df, "zscore")[0]
+    mean, std = df["a"].mean(), df["a"].std()
+    assert np.isclose(result["low"], mean - 3 * std)
+    assert np.isclose(result["high"], mean + 3 * std)
+
+
+def test_mad_bounds():
+    df = frame()
+    result = detect_outliers(df, "mad")[0]
+    median = df["a"].median()
+    spread = 3.5 * (df["a"] - median).abs().median() / 0.6745
+    assert np.isclose(result["low"], median - spread)
+    assert np.isclose(result["high"], median + spread)
+    assert result["outliers"] >= 4
+
+
+def test_only_numeric_columns_and_sampling():
+    df = frame()
+    assert [row["column"] for row in detect_outliers(df)] == ["a", "b"]
+    sampled = detect_outliers(df, sample_rows=200)
+    assert all(row["approximate"] for row in sampled)
+    assert sampled[0]["count"] == 999  # выборка - только для границ, выбросы считаются по всем строкам
+    with pytest.raises(ValueError):
+        detect_outliers(df, "unknown")
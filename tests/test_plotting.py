@@ -0,0 +1,50 @@
+import numpy as np
+
+from plotting import decimate_minmax, density_grid
+
+
+def test_decimate_keeps_envelope_and_outliers():
+    rng = np.random.default_rng(0)
+    x = np.arange(100_000)
+    y = rng.normal(size=len(x))
+    y[[10, 50_000, 99_999]] = [40.0, -35.0, 30.0]
+    width, height = 200, 100
+    xs, ys = decimate_minmax(x, y, width, height)
+    assert len(xs) < 4 * width + 400
+    assert np.all(np.diff(xs) > 0)
+    np.testing.assert_array_equal(ys, y[xs])
+    # Минимум и максимум каждого столбца пикселей на месте
+    bucket = np.minimum((x * (width / x[-1])).astype(np.int64), width - 1)
+    kept = bucket[xs]
+    for column in range(width):
+        values = y[bucket == column]
+        assert values.min() in ys[kept == column] and values.max() in ys[kept == column]
+    for outlier in (10, 50_000, 99_999):
+        assert outlier in xs
+
+
+def test_decimate_sorts_unordered_x_and_skips_small_inputs():
+    x = np.array([3.0, 1.0, 2.0])
+    xs, ys = decimate_minmax(x, [30.0, 10.0, 20.0], 10, 10)
+    np.testing.assert_array_equal(xs, x)
+    xs, ys = decimate_minmax(np.arange(1000)[::-1], np.arange(1000.0)[::-1], 10, 10)
+    assert np.all(np.diff(xs) >= 0) and ys[0] == 0.0 and ys[-1] == 999.0
+
+
+def test_density_grid_matches_histogram2d():
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(size=50_000), rng.uniform(-1, 1, 50_000)
+    counts, extent = density_grid(x, y, 40, 30)
+    assert counts.shape == (30, 40)
+    assert counts.sum() == len(x)
+    assert extent == (x.min(), x.max(), y.min(), y.max())
+    expected, _, _ = np.histogram2d(y, x, bins=(30, 40), range=(extent[2:], extent[:2]))
+    # Точки на границах интервалов могут уйти в соседний пиксель из-за округления
+    assert np.abs(counts - expected).sum() <= 10
+
+
+def test_density_grid_drops_points_outside_extent():
+    counts, extent = density_grid([0.0, 0.5, 1.0, 2.0], [0.0, 0.5, 1.0, 0.5], 2, 2, extent=(0.0, 1.0, 0.0, 1.0))
+    np.testing.assert_array_equal(counts, [[1, 0], [0, 2]])
+    counts, extent = density_grid([], [], 4, 4)
+    assert counts.sum() == 0 and extent == (0.0, 1.0, 0.0, 1.0)
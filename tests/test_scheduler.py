@@ -0,0 +1,20 @@
+from scheduler import RecomputeScheduler
+
+
+class FakeMaster:
+    def after(self, delay, callback, *args):
+        return None
+
+    def after_cancel(self, timer):
+        pass
+
+
+def test_cancel_keeps_selected_keys():
+    scheduler = RecomputeScheduler(FakeMaster(), max_workers=1)
+    try:
+        scheduler.generations.update({"tab": 1, ("tab", "export"): 1})
+        scheduler.cancel(keep=lambda key: isinstance(key, tuple))
+        assert not scheduler.is_current("tab", 1)
+        assert scheduler.is_current(("tab", "export"), 1)
+    finally:
+        scheduler.shutdown()
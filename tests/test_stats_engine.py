@@ -0,0 +1,84 @@
+import statistics
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.stats import gmean, hmean
+
+from stats_engine import column_values, compute_statistics
+
+
+def test_bool_column_statistics():
+    series = pd.Series([True, False, True, True])
+    values = column_values(series)
+    assert values.dtype.kind == "i"
+    stats = compute_statistics(values)
+    assert stats["count"] == 4
+    assert stats["mean"] == 0.75
+    assert stats["mode"] == 1
+    assert stats["box"] is not None
+    assert np.isclose(stats["median"], 1.0)
+
+
+def baseline_statistics(series):
+    # Расчёт панели статистики до stats_engine: pandas, scipy и statistics.mode
+    data = series.dropna()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # scipy предупреждает о нулях и отрицательных
+        geometric_mean, harmonic_mean = gmean(data), hmean(data)
+    try:
+        mode = statistics.mode(data)
+    except statistics.StatisticsError:
+        mode = "N/A (no unique mode)"
+    return {"mean": data.mean(), "variance": data.var(), "std_dev": data.std(), "median": data.median(),
+            "max": data.max(), "min": data.min(), "range": data.max() - data.min(),
+            "quadratic_mean": np.sqrt(np.mean(data ** 2)), "geometric_mean": geometric_mean,
+            "harmonic_mean": harmonic_mean, "mode": mode}
+
+
+def assert_matches_baseline(series, means=True):
+    stats = compute_statistics(column_values(series))
+    expected = baseline_statistics(series)
+    for key in ("mean", "variance", "std_dev", "median", "max", "min", "range", "quadratic_mean"):
+        assert np.isclose(stats[key], expected[key], rtol=1e-9), key
+    if means:
+        assert np.isclose(stats["geometric_mean"], expected["geometric_mean"], rtol=1e-9)
+        assert np.isclose(stats["harmonic_mean"], expected["harmonic_mean"], rtol=1e-9)
+    assert stats["mode"] == expected["mode"]
+    return stats
+
+
+def test_statistics_match_baseline_on_floats_with_nan():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(3.0, 0.5, 10_000).round(2)
+    values[rng.choice(len(values), 500, replace=False)] = np.nan
+    stats = assert_matches_baseline(pd.Series(values))
+    assert stats["count"] == 9_500
+
+
+def test_statistics_match_baseline_with_zero():
+    # Ноль: среднее геометрическое и гармоническое равны нулю
+    assert_matches_baseline(pd.Series([0.0, 1.5, 2.5, 2.5, 4.0]))
+
+
+def test_statistics_match_baseline_with_negative_values():
+    stats = assert_matches_baseline(pd.Series([-3.0, -1.0, 2.0, 2.0, 7.5, np.nan]), means=False)
+    assert stats["geometric_mean"] == "N/A (negative values)"
+    assert stats["harmonic_mean"] == "N/A (negative values)"
+
+
+def test_statistics_match_baseline_on_integer_ranges():
+    rng = np.random.default_rng(1)
+    # Небольшой размах - мода через bincount, огромный - через сортировку
+    # (до 2**30: у старого расчёта data ** 2 переполняет int64 на больших числах)
+    assert_matches_baseline(pd.Series(rng.integers(1, 50, 5_000)))
+    assert_matches_baseline(pd.Series(rng.integers(1, 2**30, 5_000)))
+    assert_matches_baseline(pd.Series(rng.integers(-20, 20, 5_000)), means=False)
+
+
+def test_mode_ties_return_first_encountered_value():
+    # Как statistics.mode: из равных по частоте значений - первое в порядке строк
+    assert compute_statistics(np.array([5, 3, 3, 5, 1]))["mode"] == 5
+    assert compute_statistics(np.array([5, 3, 3, 5, 2**40]))["mode"] == 5
+    assert compute_statistics(np.array([2.5, 0.5, 0.5, 2.5]))["mode"] == 2.5
+    assert compute_statistics(np.array([9.0, 1.0, 4.0]))["mode"] == 9.0
@@ -0,0 +1,103 @@
+import numpy as np
+
+from streaming import HeavyHitters, QuantileSketch, StreamingColumnStats, StreamingHistogram
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def rank_error(values, estimates, qs):
+    # Насколько доля значений не больше оценки отличается от запрошенного квантиля
+    ordered = np.sort(values)
+    return np.abs(np.searchsorted(ordered, estimates, side="right") / len(ordered) - qs).max()
+
+
+def test_quantile_sketch_compaction_and_merge_keep_rank_error_small():
+    values = np.random.default_rng(0).standard_normal(200_000)
+    sketch = QuantileSketch(k=1024)
+    for start in range(0, len(values), 10_000):
+        sketch.update(values[start:start + 10_000])
+    assert not sketch.exact
+    assert rank_error(values, sketch.quantiles(QS), QS) < 0.01
+
+    left, right = QuantileSketch(k=1024, seed=1), QuantileSketch(k=1024, seed=2)
+    left.update(values[:120_000])
+    right.update(values[120_000:])
+    left.merge(right)
+    assert left.count == len(values)
+    assert rank_error(values, left.quantiles(QS), QS) < 0.01
+
+
+def check_heavy_hitters(sketch, values):
+    # Гарантия Мисры-Гриса: счётчик занижен не больше чем на error,
+    # а каждое значение чаще error отслеживается
+    keys, counts = np.unique(values, return_counts=True)
+    exact = dict(zip(keys.tolist(), counts.tolist()))
+    tracked = dict(zip(sketch.keys.tolist(), sketch.counts.tolist()))
+    for key, count in tracked.items():
+        assert exact[key] - sketch.error <= count <= exact[key]
+    for key, count in exact.items():
+        if count > sketch.error:
+            assert key in tracked
+
+
+def test_heavy_hitters_compaction_and_merge_error_bounds():
+    rng = np.random.default_rng(3)
+    values = np.concatenate((rng.zipf(1.3, 50_000) % 5_000, np.full(5_000, 7)))
+    rng.shuffle(values)
+    sketch = HeavyHitters(k=64)
+    for start in range(0, len(values), 5_000):
+        sketch.update(values[start:start + 5_000])
+    assert sketch.error > 0
+    check_heavy_hitters(sketch, values)
+    assert sketch.mode() == np.bincount(values).argmax()
+
+    left, right = HeavyHitters(k=64), HeavyHitters(k=64)
+    left.update(values[:20_000])
+    right.update(values[20_000:])
+    left.merge(right)
+    check_heavy_hitters(left, values)
+
+
+def test_histogram_merge_keeps_counts_within_one_bin():
+    rng = np.random.default_rng(4)
+    first, second = rng.normal(0, 1, 30_000), rng.normal(10, 3, 30_000)
+    single = StreamingHistogram(bins=64)
+    single.update(first)
+    single.update(second)
+    counts, edges = single.result()
+    values = np.concatenate((first, second))
+    assert counts.sum() == len(values)
+    assert np.abs(counts - np.histogram(values, edges)[0]).max() <= 2
+
+    merged, other = StreamingHistogram(bins=64), StreamingHistogram(bins=64)
+    merged.update(first)
+    other.update(second)
+    merged.merge(other)
+    counts, edges = merged.result()
+    assert counts.sum() == len(values)
+    # Интервал слитой гистограммы может сдвинуть значения не дальше соседнего интервала
+    exact = np.histogram(values, edges)[0]
+    drift = np.abs(np.cumsum(counts) - np.cumsum(exact))
+    assert (drift <= np.maximum(exact, np.roll(exact, -1))).all()
+
+
+def test_histogram_ignores_non_finite_values():
+    histogram = StreamingHistogram(bins=8)
+    histogram.update(np.array([1.0, np.nan, 2.0, np.inf, 3.0, -np.inf]))
+    counts, edges = histogram.result()
+    assert counts.sum() == 3
+    assert np.isfinite(edges).all() and edges[0] <= 1.0 and edges[-1] >= 3.0
+
+
+def test_continuous_mode_falls_back_to_densest_bin():
+    values = np.random.default_rng(5).normal(50, 5, 100_000)
+    stats = StreamingColumnStats()
+    for start in range(0, len(values), 10_000):
+        stats.update(values[start:start + 10_000])
+    result = stats.result()
+    assert "mode" in result["approximate"]
+    assert abs(result["mode"] - 50) < 2
+
+    empty = StreamingColumnStats()
+    empty.update(np.empty(0))
+    assert empty.result()["mode"] == "N/A (no frequent value)"
@@ -0,0 +1,52 @@
+from summary_cache import SummaryCache
+
+
+def test_get_computes_once_and_counts_hits():
+    cache = SummaryCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get(("data", "a", None, "stats"), compute) == 1
+    assert cache.get(("data", "a", None, "stats"), compute) == 1
+    assert calls == [1]
+    assert cache.info() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_least_recently_used_entry_is_dropped():
+    cache = SummaryCache(max_entries=2)
+    cache.put(("data", "a", None, "stats"), 1)
+    cache.put(("data", "b", None, "stats"), 2)
+    cache.get(("data", "a", None, "stats"), lambda: None)  # "a" становится свежей
+    cache.put(("data", "c", None, "stats"), 3)
+    assert cache.peek(("data", "b", None, "stats")) is None
+    assert cache.peek(("data", "a", None, "stats")) == 1
+    assert cache.peek(("data", "c", None, "stats")) == 3
+
+
+def test_peek_does_not_touch_order_or_counters():
+    cache = SummaryCache(max_entries=2)
+    cache.put(("data", "a", None, "stats"), 1)
+    cache.put(("data", "b", None, "stats"), 2)
+    assert cache.peek(("data", "a", None, "stats")) == 1
+    cache.put(("data", "c", None, "stats"), 3)
+    assert cache.peek(("data", "a", None, "stats")) is None
+    assert cache.info()["hits"] == 0 and cache.info()["misses"] == 0
+
+
+def test_invalidate_by_dataset_and_filter():
+    cache = SummaryCache()
+    filtered = (("a", (0.0, 1.0)),)
+    cache.put(("one", "a", None, "stats"), 1)
+    cache.put(("one", "a", filtered, "stats"), 2)
+    cache.put(("two", "a", filtered, "stats"), 3)
+    cache.invalidate("one", filtered)
+    assert cache.peek(("one", "a", filtered, "stats")) is None
+    assert cache.peek(("one", "a", None, "stats")) == 1
+    assert cache.peek(("two", "a", filtered, "stats")) == 3
+    cache.invalidate("one")
+    assert cache.info()["entries"] == 1
+    cache.clear()
+    assert cache.info()["entries"] == 0